@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class EmployeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.employe'
+
+    def ready(self):
+        import apps.employe.signals
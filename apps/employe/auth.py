@@ -9,7 +9,7 @@ from rest_framework_simplejwt.exceptions import TokenError
 from django.contrib.auth.hashers import check_password
 from django.utils import timezone
 from datetime import datetime, timedelta
-import os, traceback, random, string
+import os, random, string
 from dotenv import load_dotenv
 
 from apps.employe.models import Employe, EmployeOtp, EmployeCompte, Profession, EmployeOutstandingToken
@@ -22,6 +22,7 @@ from apps.employe.tokens import EmployeRefreshToken
 from apps.employe.permissions import IsAuthenticatedEmploye
 from helpers.services.emails import envoyer_email
 from helpers.helper import generate_jwt_token, enc_dec, decode_jwt_token
+from helpers.reponses import erreur, erreur_serveur
 
 load_dotenv()
 
@@ -136,11 +137,7 @@ class EmployeLoginView(APIView):
             }, status=status.HTTP_200_OK)
 
         except Exception as e:
-            return Response({
-                'message': f"Erreur serveur: {str(e)}",
-                'success': False,
-                'donnees': {}
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
 class EmployeCreateByEntrepriseView(APIView):
     permission_classes = [IsAuthenticatedEntreprise]
@@ -244,11 +241,7 @@ class EmployeCreateByEntrepriseView(APIView):
             }, status=status.HTTP_201_CREATED)
 
         except Exception as e:
-            return Response({
-                "message": f"Erreur serveur: {str(e)}",
-                "success": False,
-                "donnees": {}
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
 class EmployeSetPasswordView(APIView):
     permission_classes = [AllowAny]
@@ -397,11 +390,7 @@ class EmployeConfirmOtpView(APIView):
             }, status=status.HTTP_200_OK)
 
         except Exception as e:
-            return Response({
-                "message": f"Erreur serveur: {str(e)}",
-                "success": False,
-                "donnees": {}
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
 class EmployeForgotPasswordView(APIView):
     permission_classes = [AllowAny]
@@ -501,11 +490,7 @@ class EmployeForgotPasswordView(APIView):
             }, status=status.HTTP_200_OK)
 
         except Exception as e:
-            return Response({
-                "message": f"{str(e)}: {str(traceback.format_exc())}",
-                "success": False,
-                "donnees": {}
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
 
 class EmployeResetPasswordView(APIView):
@@ -614,11 +599,7 @@ class EmployeResetPasswordView(APIView):
             }, status=status.HTTP_200_OK)
 
         except Exception as e:
-            return Response({
-                "message": f"{str(e)}: {str(traceback.format_exc())}",
-                "success": False,
-                "donnees": {}
-            }, status=status.HTTP_400_BAD_REQUEST)
+            return erreur(str(e))
 
 
 class EmployeLogoutView(APIView):
@@ -719,8 +700,4 @@ class EmployeLogoutView(APIView):
             }, status=status.HTTP_200_OK)
 
         except Exception as e:
-            return Response({
-                "message": f"{str(e)}: {str(traceback.format_exc())}",
-                "success": False,
-                "donnees": {}
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
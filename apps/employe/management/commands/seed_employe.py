@@ -1,19 +1,18 @@
 # apps/entreprise/management/commands/seed_employe.py
 from django.core.management.base import BaseCommand
-from django.contrib.auth.hashers import make_password
-from apps.entreprise.models import (
-    Acces, Profession, Employe, EmployeCompte, PrefixTelephone, 
-    Devise, Entreprise
-)
-from faker import Faker
-import random
-from datetime import datetime, timedelta
+from apps.employe.models import Acces, Profession, Employe, EmployeCompte
+from apps.entreprise.models import Entreprise
+from helpers.generateur import GenerateurTenant, ecriture_rapide
 
 class Command(BaseCommand):
     help = 'Seed employés, accès, professions'
 
-    def handle(self, *args, **kwargs):
-        fake = Faker('fr_FR')
+    def add_arguments(self, parser):
+        parser.add_argument('--entreprises', type=int, default=5, help='Entreprises actives à peupler')
+        parser.add_argument('--employes', type=int, help='Employés par entreprise (défaut : 3 à 8 au hasard)')
+        parser.add_argument('--graine', type=int, default=0, help='Graine du générateur (données reproductibles)')
+
+    def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS('Starting employe seed...'))
 
         # Nettoyage
@@ -24,19 +23,20 @@ class Command(BaseCommand):
 
         # 1. ACCES (Permissions)
         acces_data = [
-            'Dashboard', 'Employés', 'Clients', 'Factures', 'Stocks', 
-            'Commandes', 'Rapports', 'Paramètres', 'Comptabilité', 
+            'Dashboard', 'Employés', 'Clients', 'Factures', 'Stocks',
+            'Commandes', 'Rapports', 'Paramètres', 'Comptabilité',
             'Configuration', 'Export', 'Import', 'Notifications'
         ]
-        
-        acces_list = []
-        for titre in acces_data:
-            acces = Acces.objects.create(
+
+        acces_list = Acces.objects.bulk_create([
+            Acces(
                 titre=titre,
                 description=f"Accès au module {titre.lower()}",
                 permissions={'read': True, 'write': True, 'delete': False}
             )
-            acces_list.append(acces)
+            for titre in acces_data
+        ])
+        acces_par_titre = {acces.titre: acces for acces in acces_list}
 
         # 2. PROFESSIONS avec accès associés
         professions_data = [
@@ -70,52 +70,34 @@ class Command(BaseCommand):
             }
         ]
 
-        professions = []
-        for prof_data in professions_data:
-            profession = Profession.objects.create(
+        professions = Profession.objects.bulk_create([
+            Profession(
                 nom=prof_data['nom'],
                 description=f"Profession {prof_data['nom']}",
                 couleur='#3B82F6' if 'Directeur' in prof_data['nom'] else '#10B981'
             )
-            # Associer accès
-            for acces_titre in prof_data['acces']:
-                acces = Acces.objects.get(titre=acces_titre)
-                profession.acces.add(acces)
-            professions.append(profession)
+            for prof_data in professions_data
+        ])
+        # Associer accès (table de liaison en une requête)
+        Profession.acces.through.objects.bulk_create([
+            Profession.acces.through(profession_id=profession.id, acces_id=acces_par_titre[titre].id)
+            for profession, prof_data in zip(professions, professions_data)
+            for titre in prof_data['acces']
+        ])
 
-        # 3. Obtenir entreprises et préfixes pour seed
-        entreprises = Entreprise.objects.filter(est_actif=True)[:5]
-        mg_prefix = PrefixTelephone.objects.filter(prefix='+261').first()
+        # 3. Obtenir entreprises pour seed
+        entreprises = list(Entreprise.objects.filter(est_actif=True).order_by('id')[:options['entreprises']])
 
-        if not entreprises.exists():
+        if not entreprises:
             self.stdout.write(self.style.WARNING('Aucune entreprise active pour seed employés'))
             return
 
-        # 4. Créer employés (5 par entreprise)
-        for entreprise in entreprises:
-            for i in range(random.randint(3, 8)):
-                employe = Employe.objects.create(
-                    entreprise=entreprise,
-                    nom_complet=fake.name(),
-                    email=fake.email(),
-                    date_naissance=fake.date_of_birth(minimum_age=18, maximum_age=65),
-                    cin=f"300{random.randint(100000, 999999)}",
-                    prefix_telephone=mg_prefix,
-                    numero_telephone=f"34{random.randint(10000000, 99999999)}",
-                    adresse=fake.address(),
-                    etat_civil=random.choice(['celibataire', 'marie', 'divorce']),
-                    fonction=fake.job(),
-                    profession=random.choice(professions),
-                    date_embauche=fake.date_this_decade()
-                )
-                
-                # 30% ont un compte
-                if random.random() < 0.3:
-                    EmployeCompte.objects.create(
-                        employe=employe,
-                        mot_de_passe=make_password('password123'),
-                        est_actif=random.choice([True, False])
-                    )
+        # 4. Créer employés en masse, 30% avec un compte dont la moitié actifs (un seul hachage de mot de passe)
+        generateur = GenerateurTenant(graine=options['graine'], mot_de_passe='password123')
+        with ecriture_rapide():
+            for entreprise in entreprises:
+                nombre = options['employes'] or generateur.hasard.randint(3, 8)
+                generateur.employes(entreprise, nombre, professions, part_comptes=0.3, part_comptes_actifs=0.5)
 
         self.stdout.write(self.style.SUCCESS('✅ Seed employé terminé!'))
         self.stdout.write(self.style.SUCCESS(f'📊 {Acces.objects.count()} accès créés'))
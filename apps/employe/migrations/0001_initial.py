@@ -0,0 +1,118 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:53
+
+import apps.entreprise.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('entreprise', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Acces',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('titre', models.CharField(max_length=100, unique=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('permissions', models.JSONField(blank=True, default=dict, null=True)),
+            ],
+            options={
+                'db_table': 'acces',
+            },
+        ),
+        migrations.CreateModel(
+            name='Employe',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nom_complet', models.CharField(max_length=200)),
+                ('email', models.EmailField(max_length=254, unique=True)),
+                ('date_naissance', models.DateField(blank=True, null=True)),
+                ('cin', models.CharField(blank=True, max_length=20, null=True, unique=True)),
+                ('renumeration', models.BigIntegerField(default=0)),
+                ('numero_telephone', models.CharField(blank=True, max_length=15, null=True)),
+                ('adresse', models.TextField(blank=True, null=True)),
+                ('etat_civil', models.CharField(blank=True, choices=[('celibataire', 'Célibataire'), ('marie', 'Marié(e)'), ('divorce', 'Divorcé(e)'), ('veuf', 'Veuf(ve)')], max_length=20, null=True)),
+                ('fonction', models.CharField(max_length=200)),
+                ('photo', models.ImageField(blank=True, default='employes/profiles/default.png', null=True, upload_to='employes/profiles/')),
+                ('est_verifie', models.BooleanField(default=False)),
+                ('est_actif', models.BooleanField(default=True)),
+                ('date_embauche', models.DateField(blank=True, null=True)),
+                ('date_sortie', models.DateField(blank=True, null=True)),
+                ('est_un_compte', models.BooleanField(default=False)),
+                ('date_creation', models.DateTimeField(default=apps.entreprise.models.default_created_at)),
+                ('date_modification', models.DateTimeField(auto_now=True)),
+                ('entreprise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='employes', to='entreprise.entreprise')),
+                ('prefix_telephone', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='employes', to='entreprise.prefixtelephone')),
+                ('renumeration_devise', models.ForeignKey(default=125, on_delete=django.db.models.deletion.SET_DEFAULT, to='entreprise.devise')),
+            ],
+            options={
+                'db_table': 'employe',
+                'unique_together': {('entreprise', 'cin')},
+            },
+        ),
+        migrations.CreateModel(
+            name='EmployeOtp',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code_otp', models.CharField(max_length=6)),
+                ('date_expiration', models.DateTimeField()),
+                ('date_creation', models.DateTimeField(default=apps.entreprise.models.default_created_at)),
+                ('utilise', models.BooleanField(default=False)),
+                ('employe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='otps', to='employe.employe')),
+            ],
+            options={
+                'db_table': 'employeotp',
+            },
+        ),
+        migrations.CreateModel(
+            name='EmployeOutstandingToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jti', models.CharField(max_length=255, unique=True)),
+                ('token', models.TextField()),
+                ('date_creation', models.DateTimeField(auto_now_add=True)),
+                ('date_expiration', models.DateTimeField()),
+                ('est_blackliste', models.BooleanField(default=False)),
+                ('employe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='outstanding_tokens', to='employe.employe')),
+            ],
+            options={
+                'db_table': 'employeoutstandingtoken',
+            },
+        ),
+        migrations.CreateModel(
+            name='Profession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nom', models.CharField(max_length=100, unique=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('couleur', models.CharField(default='#3B82F6', max_length=7)),
+                ('acces', models.ManyToManyField(related_name='professions', to='employe.acces')),
+            ],
+            options={
+                'db_table': 'profession',
+            },
+        ),
+        migrations.CreateModel(
+            name='EmployeCompte',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mot_de_passe', models.CharField(max_length=255)),
+                ('est_actif', models.BooleanField(default=False)),
+                ('dernier_login', models.DateTimeField(blank=True, null=True)),
+                ('date_creation', models.DateTimeField(default=apps.entreprise.models.default_created_at)),
+                ('nombre_tentatives', models.PositiveIntegerField(default=0)),
+                ('bloque_jusqua', models.DateTimeField(blank=True, null=True)),
+                ('employe', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='compte', to='employe.employe')),
+                ('profession', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='employes', to='employe.profession')),
+            ],
+            options={
+                'db_table': 'employecompte',
+            },
+        ),
+    ]
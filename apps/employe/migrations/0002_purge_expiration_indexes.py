@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employe', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employeotp',
+            index=models.Index(fields=['date_expiration'], name='employeotp_expiration_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employeotp',
+            index=models.Index(fields=['employe', 'code_otp'], name='employeotp_code_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employeoutstandingtoken',
+            index=models.Index(fields=['date_expiration'], name='empltoken_expiration_idx'),
+        ),
+    ]
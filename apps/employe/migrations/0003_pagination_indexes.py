@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employe', '0002_purge_expiration_indexes'),
+        ('entreprise', '0002_purge_expiration_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employe',
+            index=models.Index(fields=['entreprise', '-date_creation', '-id'], name='employe_ent_creation_idx'),
+        ),
+    ]
@@ -76,6 +76,9 @@ class Employe(models.Model):
     class Meta:
         db_table = "employe"
         unique_together = ['entreprise', 'cin']
+        indexes = [
+            models.Index(fields=['entreprise', '-date_creation', '-id'], name='employe_ent_creation_idx'),
+        ]
 
 class EmployeCompte(models.Model):
     employe = models.OneToOneField(
@@ -126,6 +129,10 @@ class EmployeOtp(models.Model):
     
     class Meta:
         db_table = "employeotp"
+        indexes = [
+            models.Index(fields=['date_expiration'], name='employeotp_expiration_idx'),
+            models.Index(fields=['employe', 'code_otp'], name='employeotp_code_idx'),
+        ]
 
 class EmployeOutstandingToken(models.Model):
     employe = models.ForeignKey(
@@ -144,3 +151,6 @@ class EmployeOutstandingToken(models.Model):
     
     class Meta:
         db_table = 'employeoutstandingtoken'
+        indexes = [
+            models.Index(fields=['date_expiration'], name='empltoken_expiration_idx'),
+        ]
@@ -1,9 +1,7 @@
 # apps/entreprise/permissions.py - Ajoutez cette classe
 from rest_framework.permissions import BasePermission
-from helpers.helper import get_token_from_request, get_employe
-from django.utils import timezone as django_timezone
-from django.contrib.auth.models import AnonymousUser
-from apps.employe.models import EmployeCompte
+from helpers.helper import get_token_from_request
+from helpers.principal import resoudre_principal
 
 class IsAuthenticatedEmploye(BasePermission):
     def has_permission(self, request, view):
@@ -11,20 +9,13 @@ class IsAuthenticatedEmploye(BasePermission):
         if not token:
             return False
 
-        employe = get_employe(token)
-        if employe is None or isinstance(employe, AnonymousUser):
+        principal = resoudre_principal(token)
+        if principal is None or not principal.est_employe:
             return False
 
-        try:
-            compte = EmployeCompte.objects.get(employe=employe, est_actif=True)
-            if compte.nombre_tentatives >= 5 and compte.bloque_jusqua and compte.bloque_jusqua > django_timezone.now():
-                return False
-        except EmployeCompte.DoesNotExist:
+        if not principal.est_autorise():
             return False
 
-        if not employe.est_actif or not employe.entreprise.est_verifie:
-            return False
-
-        request.employe = employe
+        request.principal = principal
+        request.employe = principal.employe
         return True
-
@@ -6,18 +6,20 @@ from apps.employe.models import (
     Employe, EmployeCompte, EmployeOtp, Profession, Acces, PrefixTelephone
 )
 from apps.entreprise.serializers import PrefixTelephoneSerializer
+from helpers.serializers import ChampsPartielsMixin
 
 class AccesSerializer(serializers.ModelSerializer):
     class Meta:
         model = Acces
         fields = ['id', 'titre', 'description', 'permissions']
 
-class ProfessionSerializer(serializers.ModelSerializer):
+class ProfessionSerializer(ChampsPartielsMixin, serializers.ModelSerializer):
     acces_list = AccesSerializer(source='acces', many=True, read_only=True)
     
     class Meta:
         model = Profession
         fields = ['id', 'nom', 'description', 'couleur', 'acces_list']
+        prefetch_related = ['acces']
 
 class EmployeCompteSerializer(serializers.ModelSerializer):
     class Meta:
@@ -39,7 +41,7 @@ class EmployeOtpSerializer(serializers.ModelSerializer):
     def get_date_expiration_formatted(self, obj):
         return datetime.strftime(obj.date_expiration, '%d/%m/%Y %H:%M')
 
-class EmployeListSerializer(serializers.ModelSerializer):
+class EmployeListSerializer(ChampsPartielsMixin, serializers.ModelSerializer):
     profession_data = ProfessionSerializer(source='compte.profession', read_only=True)
     prefix_telephone = serializers.SerializerMethodField()
     photo_url = serializers.SerializerMethodField()
@@ -52,6 +54,12 @@ class EmployeListSerializer(serializers.ModelSerializer):
             'est_un_compte', 'photo_url', 'profession_data', 'prefix_telephone',
             'date_creation', 'date_embauche', 'renumeration_devise', 'renumeration'
         ]
+        select_related = ['prefix_telephone', 'renumeration_devise']
+        colonnes = {
+            'photo_url': ['photo'],
+            'prefix_telephone': ['prefix_telephone', 'prefix_telephone__prefix'],
+            'renumeration_devise': ['renumeration_devise', 'renumeration_devise__nom_court'],
+        }
     
     def get_photo_url(self, obj):
         if getattr(obj, 'photo', None):
@@ -0,0 +1,58 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.db import transaction
+from django.dispatch import receiver
+
+from apps.employe.models import Acces, Employe, EmployeCompte, EmployeOutstandingToken, Profession
+from helpers.acces import invalider_acces
+from helpers.principal import invalider_principaux
+from helpers.reference import invalider_reference
+from helpers.revocation import revocations
+
+
+@receiver(post_save, sender=Employe)
+@receiver(post_delete, sender=Employe)
+def invalider_principal_employe(sender, instance, **kwargs):
+    invalider_principaux('employe', instance.id)
+
+
+@receiver(post_save, sender=EmployeCompte)
+@receiver(post_delete, sender=EmployeCompte)
+def invalider_principal_compte(sender, instance, **kwargs):
+    invalider_principaux('employe', instance.employe_id)
+
+
+@receiver(post_save, sender=EmployeOutstandingToken)
+def invalider_principal_employe_blackliste(sender, instance, **kwargs):
+    if instance.est_blackliste:
+        jti, date_expiration = instance.jti, instance.date_expiration
+        transaction.on_commit(lambda: revocations.ajouter(jti, date_expiration))
+        invalider_principaux('employe', instance.employe_id)
+
+
+@receiver(post_save, sender=Acces)
+@receiver(post_delete, sender=Acces)
+def invalider_acces_modifie(sender, instance, **kwargs):
+    # un Acces peut être partagé par plusieurs professions
+    transaction.on_commit(invalider_acces)
+    transaction.on_commit(lambda: invalider_reference('professions'))
+
+
+@receiver(post_save, sender=Profession)
+def invalider_reference_profession(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalider_reference('professions'))
+
+
+@receiver(post_delete, sender=Profession)
+def invalider_acces_profession(sender, instance, **kwargs):
+    profession_id = instance.id
+    transaction.on_commit(lambda: invalider_acces(profession_id))
+    transaction.on_commit(lambda: invalider_reference('professions'))
+
+
+@receiver(m2m_changed, sender=Profession.acces.through)
+def invalider_acces_associations(sender, instance, action, reverse, **kwargs):
+    if not action.startswith('post_'):
+        return
+    profession_id = None if reverse else instance.id
+    transaction.on_commit(lambda: invalider_acces(profession_id))
+    transaction.on_commit(lambda: invalider_reference('professions'))
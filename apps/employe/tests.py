@@ -1,3 +1,293 @@
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.db import connection
 from django.test import TestCase
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.employe.models import Acces, Employe, EmployeCompte, Profession
+from apps.employe.serializers import EmployeListSerializer
+from apps.employe.tokens import EmployeRefreshToken
+from apps.entreprise.models import Devise, Entreprise, PrefixTelephone
+from helpers.generateur import GenerateurTenant
+from helpers.acces import LECTURE, ECRITURE, SUPPRESSION, compiler, est_autorise, invalider_acces
+from helpers import principal as principaux
+from helpers.principal import resoudre_principal, vider_cache_principaux
+from helpers.revocation import IndexRevocation, revocations
 
 # Create your tests here.
+
+class PlanChargementEmployesTests(TestCase):
+    def setUp(self):
+        Devise.objects.get_or_create(id=125, defaults={'nom_court': 'MGA', 'nom_long': 'Ariary', 'pays': 'MG'})
+        self.entreprise = Entreprise.objects.create(
+            nom_complet='E', email='e@exemple.com', mot_de_passe='x', numero_telephone='1', est_verifie=True, est_actif=True
+        )
+        self.prefix = PrefixTelephone.objects.create(prefix='+261', pays='Madagascar')
+        self.professions = []
+        for i in range(3):
+            profession = Profession.objects.create(nom=f'Profession {i}')
+            profession.acces.set([Acces.objects.create(titre=f'Accès {i}-{j}', permissions={'lecture': True}) for j in range(3)])
+            self.professions.append(profession)
+
+        token = AccessToken()
+        token['entreprise_id'] = self.entreprise.id
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def ajouter_employes(self, nombre):
+        debut = Employe.objects.count()
+        for i in range(debut, debut + nombre):
+            employe = Employe.objects.create(
+                entreprise=self.entreprise, nom_complet=f'Employé {i}', email=f'employe{i}@exemple.com',
+                fonction='Vendeur', prefix_telephone=self.prefix
+            )
+            if i % 2:
+                EmployeCompte.objects.create(employe=employe, mot_de_passe='x', profession=self.professions[i % 3])
+
+    def requetes_liste(self):
+        with CaptureQueriesContext(connection) as requetes:
+            reponse = self.client.get('/api/employes/', {'limit': 100})
+        self.assertEqual(reponse.status_code, 200)
+        return len(requetes), reponse.json()['donnees']
+
+    def test_plan_declare(self):
+        self.assertEqual(EmployeListSerializer.plan_chargement(), (
+            ['prefix_telephone', 'renumeration_devise', 'compte__profession'],
+            ['compte__profession__acces'],
+        ))
+
+    def test_nombre_de_requetes_constant(self):
+        self.ajouter_employes(3)
+        self.requetes_liste()  # principal mis en cache
+        requetes_3, donnees = self.requetes_liste()
+        self.assertEqual(len(donnees), 3)
+
+        self.ajouter_employes(30)
+        requetes_33, donnees = self.requetes_liste()
+        self.assertEqual(len(donnees), 33)
+        self.assertEqual(requetes_33, requetes_3)
+        self.assertEqual(len([e for e in donnees if e['profession_data'] and len(e['profession_data']['acces_list']) == 3]), 16)
+
+    def test_champs_partiels(self):
+        self.ajouter_employes(4)
+        complet = self.client.get('/api/employes/').json()['donnees']
+        champs = ['nom_complet', 'profession_data', 'prefix_telephone']
+        with CaptureQueriesContext(connection) as requetes:
+            reponse = self.client.get('/api/employes/', {'fields': ','.join(champs)})
+        self.assertEqual(reponse.json()['donnees'], [{champ: e[champ] for champ in champs} for e in complet])
+        sql = next(requete['sql'] for requete in requetes if 'FROM "employe"' in requete['sql'])
+        self.assertNotIn('"employe"."email"', sql)
+
+        employe = Employe.objects.filter(compte__isnull=False).first()
+        reponse = self.client.get(f'/api/employes/{employe.id}/', {'fields': 'id,profession_data'})
+        self.assertEqual(list(reponse.json()['donnees']), ['id', 'profession_data'])
+        self.assertEqual(self.client.get('/api/employes/', {'fields': 'mot_de_passe'}).status_code, 400)
+
+
+class DroitsProfessionTests(TestCase):
+    def setUp(self):
+        invalider_acces()
+        Devise.objects.get_or_create(id=125, defaults={'nom_court': 'MGA', 'nom_long': 'Ariary', 'pays': 'MG'})
+        self.entreprise = Entreprise.objects.create(
+            nom_complet='E', email='e@exemple.com', mot_de_passe='x', numero_telephone='1', est_verifie=True, est_actif=True
+        )
+        self.stocks = Acces.objects.create(titre='Stocks', permissions={'read': True, 'write': False, 'delete': False})
+        self.profession = Profession.objects.create(nom='Magasinier')
+        self.profession.acces.add(self.stocks)
+        employe = Employe.objects.create(entreprise=self.entreprise, nom_complet='Employé', email='employe@exemple.com', fonction='Magasinier')
+        EmployeCompte.objects.create(employe=employe, mot_de_passe='x', est_actif=True, profession=self.profession)
+
+        token = AccessToken()
+        token['employe_id'] = employe.id
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_compilation(self):
+        droits = compiler([
+            Acces(titre='Employés', permissions={'read': True}),
+            Acces(titre='Factures', permissions={'read': True, 'write': False}),
+            Acces(titre='factures', permissions={'write': True, 'delete': 'non'}),
+        ])
+        self.assertEqual(dict(droits), {'employes': LECTURE, 'factures': LECTURE | ECRITURE})
+        with self.assertRaises(TypeError):
+            droits['factures'] = SUPPRESSION
+
+    def test_droits_en_cache(self):
+        self.assertTrue(est_autorise(self.profession.id, 'stocks', LECTURE))
+        with self.assertNumQueries(0):
+            self.assertTrue(est_autorise(self.profession.id, 'stocks', LECTURE))
+            self.assertFalse(est_autorise(self.profession.id, 'stocks', ECRITURE))
+            self.assertFalse(est_autorise(self.profession.id, 'factures', LECTURE))
+
+    def test_endpoints(self):
+        self.assertEqual(self.client.get('/api/stockes/stocks/').status_code, 200)
+        self.assertEqual(self.client.post('/api/stockes/stocks/create/', {}, format='json').status_code, 403)
+        self.assertEqual(self.client.get('/api/finances/factures/').status_code, 403)
+
+        # modification de l'Acces et ajout d'un accès : cache invalidé au commit
+        with self.captureOnCommitCallbacks(execute=True):
+            self.stocks.permissions = {'read': True, 'write': True}
+            self.stocks.save()
+        self.assertEqual(self.client.post('/api/stockes/stocks/create/', {}, format='json').status_code, 400)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profession.acces.add(Acces.objects.create(titre='Factures', permissions={'read': True}))
+        self.assertEqual(self.client.get('/api/finances/factures/').status_code, 200)
+
+    def test_entreprise_tous_droits(self):
+        token = AccessToken()
+        token['entreprise_id'] = self.entreprise.id
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(self.client.get('/api/finances/factures/').status_code, 200)
+
+
+class RevocationTests(TestCase):
+    def test_token_refuse_apres_logout(self):
+        Devise.objects.get_or_create(id=125, defaults={'nom_court': 'MGA', 'nom_long': 'Ariary', 'pays': 'MG'})
+        entreprise = Entreprise.objects.create(
+            nom_complet='E', email='e@exemple.com', mot_de_passe='x', numero_telephone='1', est_verifie=True, est_actif=True
+        )
+        employe = Employe.objects.create(
+            entreprise=entreprise, nom_complet='Rabe', email='rabe@exemple.com', est_actif=True,
+            prefix_telephone=PrefixTelephone.objects.create(prefix='+261', pays='Madagascar'),
+        )
+        EmployeCompte.objects.create(employe=employe, mot_de_passe='x', est_actif=True)
+        revocations.charger()  # index du processus aligné sur la base de test
+
+        refresh = EmployeRefreshToken.for_employe(employe)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.assertEqual(client.get('/api/employes/profile/').status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            reponse = client.put('/api/employes/auth/logout/', {'refresh': str(refresh)}, format='json')
+        self.assertEqual(reponse.status_code, 200)
+        self.assertTrue(revocations.est_revoque(str(refresh['jti'])))
+        self.assertEqual(client.get('/api/employes/profile/').status_code, 403)
+
+    def test_filtre_bloom_et_expiration(self):
+        index = IndexRevocation()
+        index.charger()
+        with self.assertNumQueries(0):
+            self.assertFalse(index.est_revoque('inconnu'))
+        index.ajouter('valide', timezone.now() + timedelta(hours=1))
+        index.ajouter('expire', timezone.now() - timedelta(seconds=1))
+        self.assertTrue(index.est_revoque('valide'))
+        self.assertFalse(index.est_revoque('expire'))
+
+    def test_ajout_pendant_un_chargement(self):
+        expiration = timezone.now() + timedelta(hours=1)
+
+        class Index(IndexRevocation):
+            def _lire_base(self):
+                jtis = super()._lire_base()
+                self.ajouter('pendant', expiration)  # logout entre la lecture et l'échange
+                return jtis
+
+        index = Index()
+        index.charger()
+        self.assertTrue(index.est_revoque('pendant'))
+        with self.assertNumQueries(0):
+            index.est_revoque('autre')  # déjà chargé : la resynchronisation est planifiée, pas faite ici
+
+
+class PrincipalCacheTests(TestCase):
+    def setUp(self):
+        Devise.objects.get_or_create(id=125, defaults={'nom_court': 'MGA', 'nom_long': 'Ariary', 'pays': 'MG'})
+        self.entreprise = Entreprise.objects.create(
+            nom_complet='E', email='e@exemple.com', mot_de_passe='x', numero_telephone='1', est_verifie=True, est_actif=True
+        )
+        self.employe = Employe.objects.create(entreprise=self.entreprise, nom_complet='Rabe', email='rabe@exemple.com', est_actif=True)
+        self.compte = EmployeCompte.objects.create(employe=self.employe, mot_de_passe='x', est_actif=True)
+        self.token = str(EmployeRefreshToken.for_employe(self.employe).access_token)
+        vider_cache_principaux()
+        self.addCleanup(vider_cache_principaux)
+
+    def test_aucune_requete_d_autorisation_a_chaud(self):
+        self.assertTrue(resoudre_principal(self.token).est_autorise())
+        with self.assertNumQueries(0):
+            self.assertTrue(resoudre_principal(self.token).est_autorise())
+
+        token = AccessToken()
+        token['entreprise_id'] = self.entreprise.id
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        client.get('/api/stockes/stocks/')
+        with CaptureQueriesContext(connection) as requetes:
+            self.assertEqual(client.get('/api/stockes/stocks/').status_code, 200)
+        self.assertFalse([r['sql'] for r in requetes if 'FROM "entreprise"' in r['sql'] or 'FROM "employecompte"' in r['sql']])
+
+    def test_invalidation_par_signaux(self):
+        self.assertTrue(resoudre_principal(self.token).est_autorise())
+        self.compte.est_actif = False
+        self.compte.save()
+        self.assertFalse(resoudre_principal(self.token).est_autorise())
+
+        self.compte.est_actif = True
+        self.compte.save()
+        self.assertTrue(resoudre_principal(self.token).est_autorise())
+        self.entreprise.est_verifie = False
+        self.entreprise.save()
+        self.assertFalse(resoudre_principal(self.token).est_autorise())
+
+    def test_index_purge_des_jti_expires(self):
+        resoudre_principal(self.token)
+        self.assertIn(('employe', self.employe.id), principaux._INDEX)
+
+        autre = Entreprise.objects.create(nom_complet='A', email='a@exemple.com', mot_de_passe='x', numero_telephone='2')
+        token = AccessToken()
+        token['entreprise_id'] = autre.id
+        plus_tard = time.monotonic() + settings.PRINCIPAL_CACHE_TTL + 1
+        with mock.patch('helpers.principal.time.monotonic', return_value=plus_tard):
+            resoudre_principal(str(token))
+        self.assertEqual(list(principaux._INDEX), [('entreprise', autre.id)])
+
+
+class PaginationEmployesTests(TestCase):
+    def setUp(self):
+        generateur = GenerateurTenant(graine=5)
+        self.entreprise = generateur.entreprise('e@exemple.com', 'E')
+        generateur.employes(self.entreprise, 8)
+        generateur.employes(generateur.entreprise('a@exemple.com', 'A'), 3)
+        self.attendus = list(
+            Employe.objects.filter(entreprise=self.entreprise).order_by('-date_creation', '-id').values_list('id', flat=True)
+        )
+        token = AccessToken()
+        token['entreprise_id'] = self.entreprise.id
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def page(self, **parametres):
+        reponse = self.client.get('/api/employes/', {'fields': 'id', **parametres})
+        self.assertEqual(reponse.status_code, 200, reponse.content)
+        return [employe['id'] for employe in reponse.json()['donnees']], reponse.json()['pagination']
+
+    def parcourir(self, limite, **parametres):
+        ids, pagination = self.page(limit=limite, **parametres)
+        while pagination['next'] is not None:
+            self.assertEqual(set(pagination), {'limit', 'next'})
+            suite, pagination = self.page(limit=limite, cursor=pagination['next'], **parametres)
+            ids += suite
+        return ids
+
+    def test_curseur(self):
+        self.assertEqual(len(set(self.attendus)), 8)
+        self.assertEqual(self.parcourir(3), self.attendus)
+        self.assertEqual(self.page(limit=3)[1]['limit'], 3)
+        # recherche : même ordre, filtrée
+        employe = Employe.objects.get(id=self.attendus[4])
+        self.assertEqual(self.parcourir(1, q=employe.email), [employe.id])
+        # date_creation identiques : départage par id
+        Employe.objects.filter(entreprise=self.entreprise).update(date_creation=timezone.now())
+        self.assertEqual(self.parcourir(3), sorted(self.attendus, reverse=True))
+
+    def test_mode_offset(self):
+        self.assertEqual(self.page(limit=3, offset=0), (self.attendus[:3], {'limit': 3, 'next': 3, 'offset': 0}))
+        self.assertEqual(self.page(limit=3, offset=3), (self.attendus[3:6], {'limit': 3, 'next': 6, 'offset': 3}))
+        self.assertEqual(self.page(limit=3, offset=6), (self.attendus[6:], {'limit': 3, 'next': None, 'offset': 6}))
+        self.assertEqual(self.client.get('/api/employes/', {'offset': -1}).status_code, 400)
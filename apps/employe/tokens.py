@@ -22,6 +22,8 @@ class EmployeRefreshToken(RefreshToken):
             token['employe_id'] = employe.id
             token[enc_dec('type')] = enc_dec('employe')
             token['jti'] = str(uuid.uuid4())
+            # recopié dans les access tokens dérivés pour pouvoir les révoquer au logout
+            token['refresh_jti'] = token['jti']
             token.set_exp()
             
             if api_settings.BLACKLIST_AFTER_ROTATION:
@@ -56,7 +58,7 @@ class EmployeRefreshToken(RefreshToken):
     def blacklist(self):
         try:
             outstanding_token = EmployeOutstandingToken.objects.get(jti=self['jti'])
-            outstanding_token.blacklisted = True
+            outstanding_token.est_blackliste = True
             outstanding_token.save()
         except EmployeOutstandingToken.DoesNotExist:
             raise TokenError('Token not found for blacklisting.')
@@ -6,10 +6,14 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-import traceback
 
 from apps.entreprise.permissions import IsAuthenticatedEntreprise
 from apps.employe.permissions import IsAuthenticatedEmploye
+from helpers.pagination import paginer, PaginationInvalide, PARAMETRES_PAGINATION, SCHEMA_PAGINATION
+from helpers.champs import champs_demandes, ChampsInvalides, PARAMETRE_CHAMPS
+from helpers.middleware import chronometre_serializer
+from helpers.reference import reponse_reference
+from helpers.reponses import erreur_serveur
 
 from apps.employe.models import Employe, Profession
 from apps.employe.serializers import (
@@ -49,19 +53,14 @@ class ProfessionListView(APIView):
     )
     def get(self, request):
         try:
-            professions = Profession.objects.prefetch_related('acces').all().order_by('nom')
-            serializer = ProfessionSerializer(professions, many=True)
-            return Response({
-                "message": "Liste des professions récupérée avec succès.",
-                "success": True,
-                "donnees": serializer.data
-            }, status=status.HTTP_200_OK)
+            return reponse_reference(
+                request, 'professions', "Liste des professions récupérée avec succès.",
+                lambda: ProfessionSerializer(
+                    ProfessionSerializer.charger(Profession.objects.all()).order_by('nom'), many=True
+                ).data
+            )
         except Exception as e:
-            return Response({
-                "message": f"Erreur serveur: {str(e)}",
-                "success": False,
-                "donnees": {}
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
 
 class EmployeListByEntrepriseView(APIView):
@@ -74,6 +73,8 @@ class EmployeListByEntrepriseView(APIView):
         manual_parameters=[
             openapi.Parameter('q', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False,
                               description="Recherche (nom/email)"),
+            *PARAMETRES_PAGINATION,
+            PARAMETRE_CHAMPS,
         ],
         responses={
             200: openapi.Response(description="Liste employés", schema=openapi.Schema(
@@ -81,7 +82,8 @@ class EmployeListByEntrepriseView(APIView):
                 properties={
                     "message": openapi.Schema(type=openapi.TYPE_STRING),
                     "success": openapi.Schema(type=openapi.TYPE_BOOLEAN),
-                    "donnees": openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT))
+                    "donnees": openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT)),
+                    "pagination": SCHEMA_PAGINATION
                 }
             )),
             401: openapi.Response(description="Non authentifié", schema=openapi.Schema(
@@ -100,23 +102,31 @@ class EmployeListByEntrepriseView(APIView):
     )
     def get(self, request):
         try:
+            champs = champs_demandes(request, EmployeListSerializer)
             q = request.GET.get('q')
-            qs = Employe.objects.filter(entreprise=request.entreprise).select_related('prefix_telephone').order_by('-date_creation')
+            qs = Employe.objects.filter(entreprise=request.entreprise).order_by('-date_creation', '-id')
             if q:
                 qs = qs.filter(email__icontains=q) | qs.filter(nom_complet__icontains=q)
+            qs = EmployeListSerializer.charger(qs, champs)
 
-            serializer = EmployeListSerializer(qs, many=True, context={'request': request})
+            employes, pagination = paginer(request, qs)
+            serializer = EmployeListSerializer(employes, many=True, champs=champs, context={'request': request})
+            with chronometre_serializer():
+                donnees = serializer.data
             return Response({
                 "message": "Liste des employés récupérée avec succès.",
                 "success": True,
-                "donnees": serializer.data
+                "donnees": donnees,
+                "pagination": pagination
             }, status=status.HTTP_200_OK)
-        except Exception as e:
+        except (PaginationInvalide, ChampsInvalides) as e:
             return Response({
-                "message": f"{str(e)}: {str(traceback.format_exc())}",
+                "message": str(e),
                 "success": False,
                 "donnees": {}
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return erreur_serveur(e)
 
 
 class EmployeGetOneByEntrepriseView(APIView):
@@ -126,6 +136,7 @@ class EmployeGetOneByEntrepriseView(APIView):
     @swagger_auto_schema(
         tags=['Employé'],
         operation_description="Récupérer un employé de l'entreprise par ID.",
+        manual_parameters=[PARAMETRE_CHAMPS],
         responses={
             200: openapi.Response(description="Employé", schema=openapi.Schema(
                 type=openapi.TYPE_OBJECT,
@@ -149,7 +160,9 @@ class EmployeGetOneByEntrepriseView(APIView):
     )
     def get(self, request, employe_id: int):
         try:
-            employe = Employe.objects.filter(id=employe_id, entreprise=request.entreprise).first()
+            champs = champs_demandes(request, EmployeListSerializer)
+            qs = Employe.objects.filter(id=employe_id, entreprise=request.entreprise)
+            employe = EmployeListSerializer.charger(qs, champs).first()
             if not employe:
                 return Response({
                     "message": "Employé introuvable.",
@@ -157,18 +170,20 @@ class EmployeGetOneByEntrepriseView(APIView):
                     "donnees": {}
                 }, status=status.HTTP_404_NOT_FOUND)
 
-            serializer = EmployeListSerializer(employe, context={'request': request})
+            serializer = EmployeListSerializer(employe, champs=champs, context={'request': request})
             return Response({
                 "message": "Employé récupéré avec succès.",
                 "success": True,
                 "donnees": serializer.data
             }, status=status.HTTP_200_OK)
-        except Exception as e:
+        except ChampsInvalides as e:
             return Response({
-                "message": f"{str(e)}: {str(traceback.format_exc())}",
+                "message": str(e),
                 "success": False,
                 "donnees": {}
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return erreur_serveur(e)
 
 
 class EmployeDeleteByEntrepriseView(APIView):
@@ -216,11 +231,7 @@ class EmployeDeleteByEntrepriseView(APIView):
                 "donnees": {}
             }, status=status.HTTP_200_OK)
         except Exception as e:
-            return Response({
-                "message": f"{str(e)}: {str(traceback.format_exc())}",
-                "success": False,
-                "donnees": {}
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
 
 class EmployeProfileView(APIView):
@@ -255,11 +266,7 @@ class EmployeProfileView(APIView):
                 "donnees": serializer.data
             }, status=status.HTTP_200_OK)
         except Exception as e:
-            return Response({
-                "message": f"{str(e)}: {str(traceback.format_exc())}",
-                "success": False,
-                "donnees": {}
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
 
 class EmployeProfileUpdateView(APIView):
@@ -329,9 +336,5 @@ class EmployeProfileUpdateView(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
 
         except Exception as e:
-            return Response({
-                "message": f"{str(e)}: {str(traceback.format_exc())}",
-                "success": False,
-                "donnees": {}
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
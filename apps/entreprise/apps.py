@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class EntrepriseConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.entreprise'
+
+    def ready(self):
+        import apps.entreprise.signals
+        from django.conf import settings
+
+        if settings.REVOCATION_RESYNC > 0:
+            from helpers import planificateur
+            from helpers.revocation import revocations
+
+            # enregistrée seulement : le thread est lancé par les points d'entrée serveur (wsgi/asgi),
+            # jamais par les commandes de gestion (migrate, shell, tests)
+            planificateur.planifier('revocations', settings.REVOCATION_RESYNC, revocations.charger)
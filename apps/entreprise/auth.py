@@ -16,7 +16,6 @@ from datetime import timedelta, datetime
 import random
 import string
 import os
-import traceback
 from dotenv import load_dotenv
 
 from apps.entreprise.tokens import EntrepriseRefreshToken
@@ -26,6 +25,7 @@ from apps.entreprise.models import Entreprise, EntrepriseOtp, Plan, PrefixTeleph
 from helpers.services.google.authentication import handle_google_callback
 from helpers.services.emails import envoyer_email
 from helpers.helper import generate_jwt_token, enc_dec, decode_jwt_token
+from helpers.reponses import erreur_serveur
 
 load_dotenv()
 
@@ -158,12 +158,7 @@ class EntrepriseLoginView(APIView):
             }, status=status.HTTP_200_OK)
             
         except Exception as e:
-            print(f"Login error: {str(e)}")
-            return Response({
-                'message': f"Erreur serveur: {str(e)}",
-                'success': False,
-                'donnees': {}
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
 class EntrepriseRegisterView(APIView):
     permission_classes = [AllowAny]
@@ -282,11 +277,7 @@ class EntrepriseRegisterView(APIView):
                 'donnees': {}
             }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            return Response({
-                'message': f"{str(e)}: {str(traceback.format_exc())}",
-                'success': False,
-                'donnees': {}
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
 class GoogleCallbackEntrepriseView(APIView):
     permission_classes = [AllowAny]
@@ -450,11 +441,7 @@ class GoogleCallbackEntrepriseView(APIView):
             }, status=status.HTTP_201_CREATED)
             
         except Exception as e:
-            return Response({
-                'message': f"{str(e)}: {str(traceback.format_exc())}",
-                'success': False,
-                'donnees': {}
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
 class VerifyEntrepriseOtpView(APIView):
     permission_classes = [AllowAny]
@@ -570,11 +557,7 @@ class VerifyEntrepriseOtpView(APIView):
             }, status=status.HTTP_200_OK)
             
         except Exception as e:
-            return Response({
-                'message': f"{str(e)}: {str(traceback.format_exc())}",
-                'success': False,
-                'donnees': {}
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
 class EntrepriseMotDePasseOublieView(APIView):
     permission_classes = [AllowAny]
@@ -900,8 +883,4 @@ class ResendEntrepriseOtpView(APIView):
             }, status=status.HTTP_200_OK)
             
         except Exception as e:
-            return Response({
-                'message': f"Erreur serveur: {str(e)} - {str(traceback.format_exc())}",
-                'success': False,
-                'donnees': {}
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
@@ -238,21 +238,26 @@ class Command(BaseCommand):
             {"code": "ZWL", "name": "Zimbabwean dollar", "prefix": "+263", "countries": "Zimbabwe"}
         ]
 
-        for data in pays_data:
-            devise = Devise.objects.create(
+        # une requête par table plutôt qu'un INSERT par ligne
+        Devise.objects.bulk_create([
+            Devise(
                 nom_court=data['code'],
                 nom_long=data['name'],
                 pays=data['countries'],
                 description=f"Devise utilisée dans {data['countries']}",
                 drapeau_image=None
             )
-            
-            PrefixTelephone.objects.create(
+            for data in pays_data
+        ])
+        PrefixTelephone.objects.bulk_create([
+            PrefixTelephone(
                 prefix=data['prefix'],
                 pays=data['countries'],
                 description=f"Préfixe téléphonique pour {data['countries']}",
                 drapeau_image=None
             )
+            for data in pays_data
+        ])
 
         services_data = [
             'Agriculture', 'Aquaculture', 'Pêche', 'Technologie', 'Immobilier',
@@ -264,10 +269,7 @@ class Command(BaseCommand):
             'Restauration', 'Artisanat', 'Export/Import', 'Minoterie'
         ]
 
-        services = []
-        for titre in services_data:
-            service = Service.objects.create(titre=titre)
-            services.append(service)
+        services = Service.objects.bulk_create([Service(titre=titre) for titre in services_data])
 
         # Seed Plans (tout en MGA)
         mga = Devise.objects.get(nom_court='MGA')
@@ -290,13 +292,15 @@ class Command(BaseCommand):
             }
         ]
 
-        for plan_data in plans_data:
-            Plan.objects.create(
+        Plan.objects.bulk_create([
+            Plan(
                 nom=plan_data['nom'],
                 description=plan_data['description'],
                 prix=plan_data['prix'],
                 devise=mga
             )
+            for plan_data in plans_data
+        ])
 
         self.stdout.write(self.style.SUCCESS(f'Seeding completed successfully!'))
         self.stdout.write(self.style.SUCCESS(f'{Devise.objects.count()} devises créées'))
@@ -0,0 +1,129 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:53
+
+import apps.entreprise.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Devise',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nom_court', models.CharField(max_length=3)),
+                ('nom_long', models.CharField(max_length=100)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('pays', models.TextField()),
+                ('drapeau_image', models.ImageField(blank=True, null=True, upload_to='devises/drapeaux/')),
+            ],
+            options={
+                'db_table': 'devise',
+            },
+        ),
+        migrations.CreateModel(
+            name='Entreprise',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nom_complet', models.CharField(max_length=100)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('email', models.EmailField(max_length=254, unique=True)),
+                ('mot_de_passe', models.CharField(max_length=250)),
+                ('nif_stat', models.CharField(blank=True, max_length=100, null=True)),
+                ('date_creation', models.DateTimeField(blank=True, null=True)),
+                ('profile', models.ImageField(default='entreprise/profiles/default.png', upload_to='entreprise/profiles')),
+                ('numero_telephone', models.CharField(max_length=100)),
+                ('est_verifie', models.BooleanField(default=False)),
+                ('est_actif', models.BooleanField(default=False)),
+                ('type_entreprise', models.CharField(blank=True, choices=[('SARL', 'Société à Responsabilité Limitée'), ('SA', 'Société Anonyme'), ('SAS', 'Société par Actions Simplifiée'), ('EURL', 'Entreprise Unipersonnelle à Responsabilité Limitée'), ('EI', 'Entreprise Individuelle'), ('AUTRE', 'Autre')], max_length=50, null=True)),
+            ],
+            options={
+                'db_table': 'entreprise',
+            },
+        ),
+        migrations.CreateModel(
+            name='PrefixTelephone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prefix', models.CharField(max_length=5)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('pays', models.TextField()),
+                ('drapeau_image', models.ImageField(blank=True, null=True, upload_to='prefixes/drapeaux/')),
+            ],
+            options={
+                'db_table': 'prefix_telephone',
+            },
+        ),
+        migrations.CreateModel(
+            name='Service',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('titre', models.CharField(max_length=100)),
+            ],
+            options={
+                'db_table': 'service',
+            },
+        ),
+        migrations.CreateModel(
+            name='EntrepriseOtp',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code_otp', models.CharField(max_length=100)),
+                ('date_expiration', models.DateTimeField()),
+                ('date_creation', models.DateTimeField(default=apps.entreprise.models.default_created_at)),
+                ('entreprise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='otps', to='entreprise.entreprise')),
+            ],
+            options={
+                'db_table': 'entrepriseotp',
+            },
+        ),
+        migrations.CreateModel(
+            name='EntrepriseOutstandingToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jti', models.CharField(max_length=255, unique=True)),
+                ('token', models.TextField()),
+                ('date_creation', models.DateTimeField(auto_now_add=True)),
+                ('date_expiration', models.DateTimeField()),
+                ('est_blackliste', models.BooleanField(default=False)),
+                ('entreprise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='outstanding_tokens', to='entreprise.entreprise')),
+            ],
+            options={
+                'db_table': 'entrepriseoutstandingtoken',
+            },
+        ),
+        migrations.CreateModel(
+            name='Plan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nom', models.CharField(max_length=50, unique=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('prix', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('devise', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='entreprise.devise')),
+            ],
+            options={
+                'db_table': 'plan',
+            },
+        ),
+        migrations.AddField(
+            model_name='entreprise',
+            name='plan',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='entreprises', to='entreprise.plan'),
+        ),
+        migrations.AddField(
+            model_name='entreprise',
+            name='prefix_telephone',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='entreprise.prefixtelephone'),
+        ),
+        migrations.AddField(
+            model_name='entreprise',
+            name='services',
+            field=models.ManyToManyField(related_name='entreprises', to='entreprise.service'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entreprise', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='entrepriseotp',
+            index=models.Index(fields=['date_expiration'], name='entrepriseotp_expiration_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='entrepriseotp',
+            index=models.Index(fields=['entreprise', 'code_otp'], name='entrepriseotp_code_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='entrepriseoutstandingtoken',
+            index=models.Index(fields=['date_expiration'], name='entrtoken_expiration_idx'),
+        ),
+    ]
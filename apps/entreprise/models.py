@@ -105,6 +105,10 @@ class EntrepriseOtp(models.Model):
 
     class Meta:
         db_table = "entrepriseotp"
+        indexes = [
+            models.Index(fields=['date_expiration'], name='entrepriseotp_expiration_idx'),
+            models.Index(fields=['entreprise', 'code_otp'], name='entrepriseotp_code_idx'),
+        ]
 
 class EntrepriseOutstandingToken(models.Model):
     entreprise = models.ForeignKey(Entreprise, on_delete=models.CASCADE, related_name='outstanding_tokens')
@@ -118,4 +122,7 @@ class EntrepriseOutstandingToken(models.Model):
         return self.date_expiration <= django_timezone.now()
 
     class Meta:
-        db_table = 'entrepriseoutstandingtoken'
\ No newline at end of file
+        db_table = 'entrepriseoutstandingtoken'
+        indexes = [
+            models.Index(fields=['date_expiration'], name='entrtoken_expiration_idx'),
+        ]
\ No newline at end of file
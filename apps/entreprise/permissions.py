@@ -1,6 +1,7 @@
+
 from rest_framework.permissions import BasePermission
-from helpers.helper import get_token_from_request, get_entreprise
-from django.contrib.auth.models import AnonymousUser
+from helpers.helper import get_token_from_request
+from helpers.principal import resoudre_principal
 
 class IsAuthenticatedEntreprise(BasePermission):
     def has_permission(self, request, view):
@@ -8,12 +9,13 @@ class IsAuthenticatedEntreprise(BasePermission):
         if not token:
             return False
 
-        entreprise = get_entreprise(token)
-        if entreprise is None or isinstance(entreprise, AnonymousUser):
+        principal = resoudre_principal(token)
+        if principal is None or principal.est_employe:
             return False
         
-        if not entreprise.est_actif or not entreprise.est_verifie:
+        if not principal.est_autorise():
             return False
         
-        request.entreprise = entreprise
+        request.principal = principal
+        request.entreprise = principal.entreprise
         return True
@@ -0,0 +1,39 @@
+from django.db.models.signals import post_save, post_delete
+from django.db import transaction
+from django.dispatch import receiver
+
+from apps.entreprise.models import Devise, Entreprise, EntrepriseOutstandingToken, Plan, PrefixTelephone, Service
+from helpers.principal import invalider_principaux
+from helpers.reference import invalider_reference
+from helpers.revocation import revocations
+
+
+@receiver(post_save, sender=Entreprise)
+@receiver(post_delete, sender=Entreprise)
+def invalider_principal_entreprise(sender, instance, **kwargs):
+    invalider_principaux('entreprise', instance.id)
+
+
+@receiver(post_save, sender=EntrepriseOutstandingToken)
+def invalider_principal_entreprise_blackliste(sender, instance, **kwargs):
+    if instance.est_blackliste:
+        jti, date_expiration = instance.jti, instance.date_expiration
+        transaction.on_commit(lambda: revocations.ajouter(jti, date_expiration))
+        invalider_principaux('entreprise', instance.entreprise_id)
+
+
+# listes de référence : nom du cache invalidé au commit pour chaque modèle
+REFERENCES = {
+    Devise: ('devises', 'plans'),  # suppression d'une devise : plan.devise mis à NULL sans signal
+    PrefixTelephone: ('prefixes',),
+    Service: ('services',),
+    Plan: ('plans',),
+}
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalider_references(sender, **kwargs):
+    noms = REFERENCES.get(sender)
+    if noms:
+        transaction.on_commit(lambda: invalider_reference(*noms))
@@ -1,3 +1,34 @@
 from django.test import TestCase
 
+from apps.entreprise.models import Service
+from helpers.reference import invalider_reference
+
 # Create your tests here.
+
+class ReferenceCacheTests(TestCase):
+    URL = '/api/entreprises/services/liste/'
+
+    def setUp(self):
+        invalider_reference('services')
+        Service.objects.create(titre='Comptabilité')
+
+    def test_cache_etag_et_invalidation(self):
+        premiere = self.client.get(self.URL)
+        self.assertEqual(premiere.status_code, 200)
+        self.assertEqual(premiere.json()['donnees'], [{'id': Service.objects.get().id, 'titre': 'Comptabilité'}])
+        self.assertIn('max-age=', premiere['Cache-Control'])
+        etag = premiere['ETag']
+
+        with self.assertNumQueries(0):
+            seconde = self.client.get(self.URL)
+            non_modifiee = self.client.get(self.URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(seconde.content, premiere.content)
+        self.assertEqual(non_modifiee.status_code, 304)
+        self.assertEqual(non_modifiee.content, b'')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Service.objects.create(titre='Audit')
+        apres = self.client.get(self.URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(apres.status_code, 200)
+        self.assertNotEqual(apres['ETag'], etag)
+        self.assertEqual([service['titre'] for service in apres.json()['donnees']], ['Audit', 'Comptabilité'])
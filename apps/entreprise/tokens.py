@@ -22,6 +22,8 @@ class EntrepriseRefreshToken(RefreshToken):
             token['entreprise_id'] = entreprise.id
             token[enc_dec('type')] = enc_dec('entreprise')
             token['jti'] = str(uuid.uuid4())
+            # recopié dans les access tokens dérivés pour pouvoir les révoquer au logout
+            token['refresh_jti'] = token['jti']
             token.set_exp()
             
             if api_settings.BLACKLIST_AFTER_ROTATION:
@@ -30,7 +32,7 @@ class EntrepriseRefreshToken(RefreshToken):
                     entreprise=entreprise,
                     jti=token['jti'],
                     token=str(token),
-                    expires_at=expires_at
+                    date_expiration=expires_at
                 )
 
             return token
@@ -56,7 +58,7 @@ class EntrepriseRefreshToken(RefreshToken):
     def blacklist(self):
         try:
             outstanding_token = EntrepriseOutstandingToken.objects.get(jti=self['jti'])
-            outstanding_token.blacklisted = True
+            outstanding_token.est_blackliste = True
             outstanding_token.save()
         except EntrepriseOutstandingToken.DoesNotExist:
             raise TokenError('Token not found for blacklisting.')
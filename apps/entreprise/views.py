@@ -12,6 +12,8 @@ from dotenv import load_dotenv
 from apps.entreprise.permissions import IsAuthenticatedEntreprise
 from apps.entreprise.serializers import EntrepriseSerializer, DeviseSerializer, PrefixTelephoneSerializer, ServiceSerializer, PlanSerializer, EntrepriseUpdatePlanSerializer
 from apps.entreprise.models import Entreprise, Devise, PrefixTelephone, Service, Plan
+from helpers.reference import reponse_reference
+from helpers.reponses import erreur_serveur
 
 load_dotenv()
 
@@ -61,19 +63,12 @@ class DeviseListView(APIView):
     )
     def get(self, request):
         try:
-            devises = Devise.objects.all().order_by('nom_court')
-            serializer = DeviseSerializer(devises, many=True)
-            return Response({
-                'message': 'Liste des devises récupérée avec succès',
-                'success': True,
-                'donnees': serializer.data
-            }, status=status.HTTP_200_OK)
+            return reponse_reference(
+                request, 'devises', 'Liste des devises récupérée avec succès',
+                lambda: DeviseSerializer(Devise.objects.all().order_by('nom_court'), many=True).data
+            )
         except Exception as e:
-            return Response({
-                'message': f"Erreur serveur: {str(e)}",
-                'success': False,
-                'donnees': {}
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
 
 ## 2. LISTE PREFIX TELEPHONE (Public)  
@@ -112,19 +107,12 @@ class PrefixTelephoneListView(APIView):
     )
     def get(self, request):
         try:
-            prefixes = PrefixTelephone.objects.all().order_by('prefix')
-            serializer = PrefixTelephoneSerializer(prefixes, many=True)
-            return Response({
-                'message': 'Liste des préfixes téléphoniques récupérée',
-                'success': True,
-                'donnees': serializer.data
-            }, status=status.HTTP_200_OK)
+            return reponse_reference(
+                request, 'prefixes', 'Liste des préfixes téléphoniques récupérée',
+                lambda: PrefixTelephoneSerializer(PrefixTelephone.objects.all().order_by('prefix'), many=True).data
+            )
         except Exception as e:
-            return Response({
-                'message': f"Erreur serveur: {str(e)}",
-                'success': False,
-                'donnees': {}
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
 
 ## 3. LISTE ENTREPRISES (Authentifié uniquement)
@@ -177,11 +165,7 @@ class EntrepriseListView(APIView):
                 'donnees': serializer.data
             }, status=status.HTTP_200_OK)
         except Exception as e:
-            return Response({
-                'message': f"Erreur serveur: {str(e)}",
-                'success': False,
-                'donnees': {}
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
 
 ## 4. PROFIL ENTREPRISE (Authentifié)
@@ -230,11 +214,7 @@ class EntrepriseProfileView(APIView):
                 'donnees': serializer.data
             }, status=status.HTTP_200_OK)
         except Exception as e:
-            return Response({
-                'message': f"Erreur serveur: {str(e)}",
-                'success': False,
-                'donnees': {}
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
 ## 5. UPDATE PROFIL ENTREPRISE (Authentifié + Upload Image) - CORRIGÉE
 class EntrepriseProfileUpdateView(APIView):
@@ -425,12 +405,7 @@ class EntrepriseProfileUpdateView(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
 
         except Exception as e:
-            print(f"Update profile error: {str(e)}")
-            return Response({
-                'message': f"Erreur serveur: {str(e)}",
-                'success': False,
-                'donnees': {}
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
 class ServiceListView(APIView):
     permission_classes = [AllowAny]
@@ -468,19 +443,12 @@ class ServiceListView(APIView):
     )
     def get(self, request):
         try:
-            services = Service.objects.all().order_by('titre')
-            serializer = ServiceSerializer(services, many=True)
-            return Response({
-                "message": "Liste des services récupérée avec succès.",
-                "success": True,
-                "donnees": serializer.data
-            }, status=status.HTTP_200_OK)
+            return reponse_reference(
+                request, 'services', "Liste des services récupérée avec succès.",
+                lambda: ServiceSerializer(Service.objects.all().order_by('titre'), many=True).data
+            )
         except Exception as e:
-            return Response({
-                "message": f"Erreur serveur: {str(e)}",
-                "success": False,
-                "donnees": {}
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
 class PlanListView(APIView):
     permission_classes = [AllowAny]
@@ -521,19 +489,12 @@ class PlanListView(APIView):
     )
     def get(self, request):
         try:
-            plans = Plan.objects.all().order_by('nom')
-            serializer = PlanSerializer(plans, many=True)
-            return Response({
-                "message": "Liste des plans récupérée avec succès.",
-                "success": True,
-                "donnees": serializer.data
-            }, status=status.HTTP_200_OK)
+            return reponse_reference(
+                request, 'plans', "Liste des plans récupérée avec succès.",
+                lambda: PlanSerializer(Plan.objects.all().order_by('nom'), many=True).data
+            )
         except Exception as e:
-            return Response({
-                "message": f"Erreur serveur: {str(e)}",
-                "success": False,
-                "donnees": {}
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
 class EntrepriseUpdatePlanView(APIView):
     permission_classes = [IsAuthenticatedEntreprise]
@@ -622,9 +583,5 @@ class EntrepriseUpdatePlanView(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
 
         except Exception as e:
-            return Response({
-                "message": f"Erreur serveur: {str(e)}",
-                "success": False,
-                "donnees": {}
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
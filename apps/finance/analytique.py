@@ -0,0 +1,120 @@
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone as django_timezone
+
+from apps.finance.models import Facture, ResumeFactureMensuel
+
+CHAMPS_RESUME = {'entreprise_id', 'date_facture', 'statut', 'montant'}
+STATUTS_IMPAYES = ['envoyee', 'echue']
+# (libellé, jours de retard min, max inclus)
+TRANCHES_RETARD = [('0-30', 1, 30), ('31-60', 31, 60), ('61-90', 61, 90), ('90+', 91, None)]
+
+
+def debut_mois(jour):
+    return jour.replace(day=1)
+
+
+def empreinte(facture):
+    """Ce qu'une facture pèse dans les résumés : (entreprise_id, mois, statut, montant)."""
+    return (facture.entreprise_id, debut_mois(facture.date_facture), facture.statut, facture.montant)
+
+
+def cumuler(entreprise_id, mois, statut, nombre, montant):
+    resumes = ResumeFactureMensuel.objects.filter(entreprise_id=entreprise_id, mois=mois, statut=statut)
+    increment = dict(nombre=F('nombre') + nombre, montant_total=F('montant_total') + montant)
+    if resumes.update(**increment):
+        return
+    try:
+        with transaction.atomic():
+            ResumeFactureMensuel.objects.create(
+                entreprise_id=entreprise_id, mois=mois, statut=statut, nombre=nombre, montant_total=montant
+            )
+    except IntegrityError:
+        # créé par une autre transaction entre l'UPDATE et l'INSERT
+        resumes.update(**increment)
+
+
+def noter_facture(avant, apres):
+    """Reporte dans les résumés le passage d'une facture de l'empreinte `avant` à `apres` (None = absente)."""
+    if avant == apres:
+        return
+    if avant is not None:
+        cumuler(avant[0], avant[1], avant[2], -1, -avant[3])
+    if apres is not None:
+        cumuler(apres[0], apres[1], apres[2], 1, apres[3])
+
+
+def recalculer_resumes(entreprise_id=None):
+    """Reconstruit les résumés depuis les factures (rattrapage après des écritures hors ORM)."""
+    factures = Facture.objects.all()
+    resumes = ResumeFactureMensuel.objects.all()
+    if entreprise_id is not None:
+        factures = factures.filter(entreprise_id=entreprise_id)
+        resumes = resumes.filter(entreprise_id=entreprise_id)
+
+    lignes = factures.annotate(mois=TruncMonth('date_facture')).values('entreprise_id', 'mois', 'statut').annotate(
+        nombre=Count('id'), montant_total=Sum('montant')
+    ).order_by()
+    with transaction.atomic():
+        resumes.delete()
+        ResumeFactureMensuel.objects.bulk_create(
+            (ResumeFactureMensuel(**ligne) for ligne in lignes.iterator()), batch_size=1000
+        )
+    return resumes.count()
+
+
+def _montant(valeur):
+    return f"{valeur or 0:.2f}"
+
+
+def analytique_factures(entreprise, debut, fin, nombre_clients=10):
+    """
+    Tableau de bord des factures de `entreprise` pour les mois [debut, fin] :
+    statut et mois depuis les résumés mensuels, clients et retards par agrégation SQL.
+    """
+    resumes = ResumeFactureMensuel.objects.filter(entreprise=entreprise, mois__range=(debut, fin), nombre__gt=0)
+    totaux = resumes.aggregate(nombre=Sum('nombre'), montant=Sum('montant_total'))
+    par_statut = resumes.values('statut').annotate(nombre=Sum('nombre'), montant=Sum('montant_total')).order_by('statut')
+    par_mois = resumes.values('mois').annotate(nombre=Sum('nombre'), montant=Sum('montant_total')).order_by('mois')
+
+    fin_periode = (debut_mois(fin) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    par_client = Facture.objects.filter(
+        entreprise=entreprise, date_facture__range=(debut, fin_periode)
+    ).values('client').annotate(nombre=Count('id'), montant=Sum('montant')).order_by('-montant', 'client')[:nombre_clients]
+
+    aujourdhui = django_timezone.localdate()
+    agregats = {}
+    for libelle, jours_min, jours_max in TRANCHES_RETARD:
+        tranche = Q(date_echeance__lte=aujourdhui - timedelta(days=jours_min))
+        if jours_max is not None:
+            tranche &= Q(date_echeance__gte=aujourdhui - timedelta(days=jours_max))
+        agregats[f'{libelle}_nombre'] = Count('id', filter=tranche)
+        agregats[f'{libelle}_montant'] = Sum('montant', filter=tranche)
+    retards = Facture.objects.filter(
+        entreprise=entreprise, statut__in=STATUTS_IMPAYES, date_echeance__lt=aujourdhui
+    ).aggregate(**agregats)
+
+    return {
+        'debut': f"{debut:%Y-%m}",
+        'fin': f"{fin:%Y-%m}",
+        'total': {'nombre': totaux['nombre'] or 0, 'montant': _montant(totaux['montant'])},
+        'par_statut': [
+            {'statut': ligne['statut'], 'nombre': ligne['nombre'], 'montant': _montant(ligne['montant'])}
+            for ligne in par_statut
+        ],
+        'par_mois': [
+            {'mois': f"{ligne['mois']:%Y-%m}", 'nombre': ligne['nombre'], 'montant': _montant(ligne['montant'])}
+            for ligne in par_mois
+        ],
+        'par_client': [
+            {'client': ligne['client'], 'nombre': ligne['nombre'], 'montant': _montant(ligne['montant'])}
+            for ligne in par_client
+        ],
+        'retards': [
+            {'tranche': libelle, 'nombre': retards[f'{libelle}_nombre'], 'montant': _montant(retards[f'{libelle}_montant'])}
+            for libelle, _, _ in TRANCHES_RETARD
+        ],
+    }
@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class FinanceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.finance'
+
+    def ready(self):
+        import apps.finance.signals
+        from django.conf import settings
+
+        if settings.FACTURES_ECHUES_INTERVALLE > 0:
+            from helpers import planificateur
+            from apps.finance.echeances import bascule_planifiee
+
+            # thread lancé par les points d'entrée serveur (wsgi/asgi), pas par les commandes de gestion
+            planificateur.planifier('factures_echues', settings.FACTURES_ECHUES_INTERVALLE, bascule_planifiee)
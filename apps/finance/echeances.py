@@ -0,0 +1,57 @@
+import logging
+import time
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone as django_timezone
+
+from apps.finance.analytique import cumuler, debut_mois
+from apps.finance.models import Facture
+
+LOGGER = logging.getLogger(__name__)
+
+
+def _basculer_lot(taille_lot, aujourdhui):
+    with transaction.atomic():
+        lot = list(
+            Facture.objects.select_for_update().filter(statut='envoyee', date_echeance__lt=aujourdhui)
+            .order_by('id').values_list('id', 'entreprise_id', 'date_facture', 'montant')[:taille_lot]
+        )
+        if not lot:
+            return 0
+        Facture.objects.filter(id__in=[ligne[0] for ligne in lot]).update(
+            statut='echue', date_modification=django_timezone.now()
+        )
+
+        # UPDATE hors signaux : report explicite dans les résumés mensuels
+        deplaces = defaultdict(lambda: [0, Decimal(0)])
+        for _, entreprise_id, date_facture, montant in lot:
+            cumul = deplaces[(entreprise_id, debut_mois(date_facture))]
+            cumul[0] += 1
+            cumul[1] += montant
+        for (entreprise_id, mois), (nombre, montant) in deplaces.items():
+            cumuler(entreprise_id, mois, 'envoyee', -nombre, -montant)
+            cumuler(entreprise_id, mois, 'echue', nombre, montant)
+    return len(lot)
+
+
+def basculer_echues(taille_lot=None, aujourdhui=None):
+    """Passe par lots les factures 'envoyee' dont l'échéance est dépassée au statut 'echue'. Renvoie (nombre, durée)."""
+    taille_lot = taille_lot or settings.FACTURES_ECHUES_TAILLE_LOT
+    aujourdhui = aujourdhui or django_timezone.localdate()
+    debut = time.monotonic()
+    total = 0
+    while True:
+        nombre = _basculer_lot(taille_lot, aujourdhui)
+        total += nombre
+        if nombre < taille_lot:
+            break
+    return total, time.monotonic() - debut
+
+
+def bascule_planifiee():
+    total, duree = basculer_echues()
+    if total:
+        LOGGER.info(f"{total} facture(s) passée(s) au statut 'echue' en {duree:.2f}s")
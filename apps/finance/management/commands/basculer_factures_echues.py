@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.finance.echeances import basculer_echues
+
+
+class Command(BaseCommand):
+    help = "Passe au statut 'echue' les factures 'envoyee' dont la date d'échéance est dépassée"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--taille-lot', type=int, default=settings.FACTURES_ECHUES_TAILLE_LOT,
+                            help='Nombre de factures mises à jour par transaction')
+
+    def handle(self, *args, **options):
+        total, duree = basculer_echues(options['taille_lot'])
+        self.stdout.write(self.style.SUCCESS(f"✅ {total} facture(s) passée(s) au statut 'echue' en {duree:.2f}s"))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.finance.analytique import recalculer_resumes
+
+
+class Command(BaseCommand):
+    help = 'Reconstruit les résumés mensuels des factures (table finance_resume_mensuel) depuis les factures'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entreprise', type=int, default=None,
+                            help="Limiter à une entreprise (id)")
+
+    def handle(self, *args, **options):
+        nombre = recalculer_resumes(options['entreprise'])
+        self.stdout.write(self.style.SUCCESS(f'✅ {nombre} résumés mensuels recalculés'))
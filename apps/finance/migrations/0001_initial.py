@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('employe', '0001_initial'),
+        ('entreprise', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Facture',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('numero', models.CharField(max_length=50, unique=True)),
+                ('client', models.CharField(max_length=200)),
+                ('montant', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('date_facture', models.DateField()),
+                ('date_echeance', models.DateField()),
+                ('statut', models.CharField(choices=[('brouillon', 'Brouillon'), ('envoyee', 'Envoyée'), ('payee', 'Payée'), ('annulee', 'Annulée'), ('echoue', 'Échoue')], default='brouillon', max_length=20)),
+                ('motif', models.TextField(blank=True, null=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('date_creation', models.DateTimeField(auto_now_add=True)),
+                ('date_modification', models.DateTimeField(auto_now=True)),
+                ('cree_par', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='factures_crees', to='employe.employe')),
+                ('entreprise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='factures', to='entreprise.entreprise')),
+                ('prefix_telephone', models.ForeignKey(default=125, on_delete=django.db.models.deletion.SET_DEFAULT, to='entreprise.prefixtelephone')),
+            ],
+            options={
+                'db_table': 'finance_facture',
+                'ordering': ['-date_creation'],
+            },
+        ),
+    ]
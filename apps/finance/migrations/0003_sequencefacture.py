@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entreprise', '0002_purge_expiration_indexes'),
+        ('finance', '0002_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SequenceFacture',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('annee', models.PositiveSmallIntegerField()),
+                ('dernier_numero', models.PositiveIntegerField(default=0)),
+                ('entreprise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sequences_facture', to='entreprise.entreprise')),
+            ],
+            options={
+                'db_table': 'finance_sequence_facture',
+                'unique_together': {('entreprise', 'annee')},
+            },
+        ),
+    ]
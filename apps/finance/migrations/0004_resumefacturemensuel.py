@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entreprise', '0002_purge_expiration_indexes'),
+        ('finance', '0003_sequencefacture'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeFactureMensuel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mois', models.DateField()),
+                ('statut', models.CharField(choices=[('brouillon', 'Brouillon'), ('envoyee', 'Envoyée'), ('payee', 'Payée'), ('annulee', 'Annulée'), ('echoue', 'Échoue')], max_length=20)),
+                ('nombre', models.IntegerField(default=0)),
+                ('montant_total', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('entreprise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumes_factures', to='entreprise.entreprise')),
+            ],
+            options={
+                'db_table': 'finance_resume_mensuel',
+                'unique_together': {('entreprise', 'mois', 'statut')},
+            },
+        ),
+    ]
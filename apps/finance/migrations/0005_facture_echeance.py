@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employe', '0003_pagination_indexes'),
+        ('entreprise', '0002_purge_expiration_indexes'),
+        ('finance', '0004_resumefacturemensuel'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='facture',
+            name='statut',
+            field=models.CharField(choices=[('brouillon', 'Brouillon'), ('envoyee', 'Envoyée'), ('payee', 'Payée'), ('annulee', 'Annulée'), ('echoue', 'Échoue'), ('echue', 'Échue')], default='brouillon', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='resumefacturemensuel',
+            name='statut',
+            field=models.CharField(choices=[('brouillon', 'Brouillon'), ('envoyee', 'Envoyée'), ('payee', 'Payée'), ('annulee', 'Annulée'), ('echoue', 'Échoue'), ('echue', 'Échue')], max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='facture',
+            index=models.Index(fields=['entreprise', 'statut', 'date_echeance'], name='facture_echeance_idx'),
+        ),
+    ]
@@ -9,6 +9,7 @@ STATUT_CHOICES = [
     ('payee', 'Payée'),
     ('annulee', 'Annulée'),
     ('echoue', 'Échoue'),
+    ('echue', 'Échue'),
 ]
 
 class Facture(models.Model):
@@ -35,8 +36,47 @@ class Facture(models.Model):
     
     @property
     def est_echue(self):
-        return self.statut == 'echue' or (self.statut == 'envoyee' and timezone.now().date() > self.date_echeance)
+        return self.statut == 'echue' or (self.statut == 'envoyee' and timezone.localdate() > self.date_echeance)
+
+    @staticmethod
+    def filtre_echues(aujourdhui=None):
+        """Équivalent SQL de est_echue (index facture_echeance_idx)."""
+        aujourdhui = aujourdhui or timezone.localdate()
+        return models.Q(statut='echue') | models.Q(statut='envoyee', date_echeance__lt=aujourdhui)
     
     class Meta:
         db_table = 'finance_facture'
         ordering = ['-date_creation']
+        indexes = [
+            models.Index(fields=['entreprise', '-date_creation', '-id'], name='facture_ent_creation_idx'),
+            models.Index(fields=['entreprise', 'statut', 'date_echeance'], name='facture_echeance_idx'),
+        ]
+
+
+class SequenceFacture(models.Model):
+    entreprise = models.ForeignKey(Entreprise, on_delete=models.CASCADE, related_name='sequences_facture')
+    annee = models.PositiveSmallIntegerField()
+    dernier_numero = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.entreprise_id}/{self.annee}: {self.dernier_numero}"
+
+    class Meta:
+        db_table = 'finance_sequence_facture'
+        unique_together = ['entreprise', 'annee']
+
+
+class ResumeFactureMensuel(models.Model):
+    """Nombre et montant des factures par entreprise, mois (de date_facture) et statut."""
+    entreprise = models.ForeignKey(Entreprise, on_delete=models.CASCADE, related_name='resumes_factures')
+    mois = models.DateField()  # premier jour du mois
+    statut = models.CharField(max_length=20, choices=STATUT_CHOICES)
+    nombre = models.IntegerField(default=0)
+    montant_total = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.entreprise_id} {self.mois:%Y-%m} {self.statut}: {self.nombre}"
+
+    class Meta:
+        db_table = 'finance_resume_mensuel'
+        unique_together = ['entreprise', 'mois', 'statut']
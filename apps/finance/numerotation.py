@@ -0,0 +1,85 @@
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone as django_timezone
+
+from apps.finance.models import SequenceFacture
+
+
+def formater_numero(entreprise_id, annee, numero):
+    return f"FAC-{annee}-{entreprise_id:04d}-{numero:05d}"
+
+
+def _reserver(entreprise_id, annee, nombre):
+    """
+    Avance le compteur (entreprise, année) de `nombre` en un UPDATE atomique et renvoie sa nouvelle valeur.
+    La ligne reste verrouillée jusqu'à la fin de la transaction englobante : dans la transaction
+    de création, un rollback rend les numéros (pas de trou).
+    """
+    with transaction.atomic():
+        sequences = SequenceFacture.objects.filter(entreprise_id=entreprise_id, annee=annee)
+        if not sequences.update(dernier_numero=F('dernier_numero') + nombre):
+            try:
+                with transaction.atomic():
+                    SequenceFacture.objects.create(entreprise_id=entreprise_id, annee=annee, dernier_numero=nombre)
+                return nombre
+            except IntegrityError:
+                # compteur créé par une autre transaction entre l'UPDATE et l'INSERT
+                sequences.update(dernier_numero=F('dernier_numero') + nombre)
+        return sequences.values_list('dernier_numero', flat=True).get()
+
+
+class _Blocs:
+    """Numéros réservés d'avance par ce processus, par (entreprise, année)."""
+
+    def __init__(self):
+        self._libres = {}
+        self._verrou = threading.Lock()
+
+    def prendre(self, cle):
+        with self._verrou:
+            libres = self._libres.get(cle)
+            return libres.popleft() if libres else None
+
+    def remettre(self, cle, numeros):
+        with self._verrou:
+            self._libres.setdefault(cle, deque()).extend(numeros)
+
+    def vider(self):
+        with self._verrou:
+            self._libres.clear()
+
+
+_BLOCS = _Blocs()
+
+
+def allouer_numeros(entreprise_id, nombre, annee=None):
+    """Réserve `nombre` numéros consécutifs en une seule incrémentation (création en masse)."""
+    annee = annee or django_timezone.localdate().year
+    dernier = _reserver(entreprise_id, annee, nombre)
+    return [formater_numero(entreprise_id, annee, numero) for numero in range(dernier - nombre + 1, dernier + 1)]
+
+
+def allouer_numero(entreprise_id, annee=None):
+    """
+    Prochain numéro de facture de l'entreprise.
+    Mode 'continue' : à appeler dans la transaction qui crée la facture.
+    Mode 'bloc' : le compteur n'est touché qu'une fois par bloc ; le reste du bloc n'est
+    utilisable qu'après le commit de la réservation, un rollback ne peut donc pas le dupliquer.
+    """
+    annee = annee or django_timezone.localdate().year
+    taille_bloc = settings.FACTURE_NUMEROTATION_BLOC
+    if settings.FACTURE_NUMEROTATION != 'bloc' or taille_bloc <= 1:
+        return formater_numero(entreprise_id, annee, _reserver(entreprise_id, annee, 1))
+
+    cle = (entreprise_id, annee)
+    numero = _BLOCS.prendre(cle)
+    if numero is None:
+        dernier = _reserver(entreprise_id, annee, taille_bloc)
+        numero = dernier - taille_bloc + 1
+        restants = range(numero + 1, dernier + 1)
+        transaction.on_commit(lambda: _BLOCS.remettre(cle, restants))
+    return formater_numero(entreprise_id, annee, numero)
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import threading
+import zipfile
+from functools import lru_cache
+from itertools import islice
+
+from django.conf import settings
+from django.template.loader import get_template, render_to_string
+
+from helpers.pdf import soumettre_rendu
+
+GABARIT = 'factures/facture.html'
+
+
+@lru_cache(maxsize=1)
+def _empreinte_gabarit():
+    # un changement du gabarit invalide tous les PDF en cache
+    return hashlib.sha256(get_template(GABARIT).template.source.encode()).hexdigest()
+
+
+def donnees_facture(facture):
+    """Tout ce qui apparaît sur le PDF, en types simples (sert aussi à la clé du cache)."""
+    entreprise = facture.entreprise
+    prefix = entreprise.prefix_telephone.prefix if entreprise.prefix_telephone_id else ''
+    return {
+        'facture': {
+            'id': facture.id,
+            'numero': facture.numero,
+            'client': facture.client,
+            'montant': f"{facture.montant:.2f}",
+            'date_facture': f"{facture.date_facture:%d/%m/%Y}",
+            'date_echeance': f"{facture.date_echeance:%d/%m/%Y}",
+            'statut': facture.get_statut_display(),
+            'motif': facture.motif or '',
+            'description': facture.description or '',
+            'cree_par': facture.cree_par.nom_complet if facture.cree_par_id else '',
+            'date_modification': facture.date_modification.isoformat(),
+        },
+        'entreprise': {
+            'nom_complet': entreprise.nom_complet,
+            'email': entreprise.email,
+            'telephone': f"{prefix} {entreprise.numero_telephone}".strip(),
+            'nif_stat': entreprise.nif_stat or '',
+        },
+    }
+
+
+def cle_pdf(donnees):
+    brut = json.dumps(donnees, sort_keys=True, ensure_ascii=False) + _empreinte_gabarit()
+    return hashlib.sha256(brut.encode()).hexdigest()
+
+
+def chemin_pdf(cle):
+    return os.path.join(settings.FACTURE_PDF_DOSSIER, cle[:2], f"{cle}.pdf")
+
+
+def _enregistrer(chemin, contenu):
+    os.makedirs(os.path.dirname(chemin), exist_ok=True)
+    temporaire = f"{chemin}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporaire, 'wb') as fichier:
+        fichier.write(contenu)
+    # remplacement atomique : un lecteur concurrent voit l'ancien fichier ou le nouveau, jamais un PDF partiel
+    os.replace(temporaire, chemin)
+
+
+def pdfs_factures(factures):
+    """
+    Génère (facture, chemin du PDF) dans l'ordre de `factures`. Les PDF absents du cache
+    sont rendus dans le pool de processus, FACTURE_PDF_LOT à la fois.
+    """
+    factures = iter(factures)
+    while lot := list(islice(factures, settings.FACTURE_PDF_LOT)):
+        rendus = []
+        for facture in lot:
+            donnees = donnees_facture(facture)
+            chemin = chemin_pdf(cle_pdf(donnees))
+            rendu = None if os.path.exists(chemin) else soumettre_rendu(render_to_string(GABARIT, donnees))
+            rendus.append((facture, chemin, rendu))
+        for facture, chemin, rendu in rendus:
+            if rendu is not None:
+                _enregistrer(chemin, rendu.result(timeout=settings.FACTURE_PDF_TIMEOUT))
+            yield facture, chemin
+
+
+def pdf_facture(facture):
+    return next(pdfs_factures([facture]))[1]
+
+
+def nom_fichier_pdf(facture):
+    return f"{facture.numero.replace('/', '-')}.pdf"
+
+
+class _Flux:
+    """Sortie non « seekable » de ZipFile : les octets écrits sont repris par le générateur."""
+
+    def __init__(self):
+        self._morceaux = []
+
+    def write(self, donnees):
+        self._morceaux.append(bytes(donnees))
+        return len(donnees)
+
+    def flush(self):
+        pass
+
+    def vider(self):
+        donnees = b''.join(self._morceaux)
+        self._morceaux.clear()
+        return donnees
+
+
+def zip_factures(factures):
+    """Archive ZIP produite au fil de l'eau : au plus un PDF en mémoire à la fois."""
+    flux = _Flux()
+    # PDF déjà compressés : stockage sans recompression
+    with zipfile.ZipFile(flux, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for facture, chemin in pdfs_factures(factures):
+            archive.write(chemin, arcname=nom_fichier_pdf(facture))
+            yield flux.vider()
+    yield flux.vider()
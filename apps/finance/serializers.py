@@ -1,15 +1,22 @@
 from rest_framework import serializers
+from django.db import transaction
 from django.utils import timezone
 from .models import Facture, STATUT_CHOICES
+from .numerotation import allouer_numero
 from apps.entreprise.models import Entreprise, PrefixTelephone
 from apps.employe.models import Employe
+from helpers.serializers import LECTURE_CREE_PAR, ChampsPartielsMixin, LectureRapideMixin
 
 class PrefixTelephoneSerializer(serializers.ModelSerializer):
     class Meta:
         model = PrefixTelephone
         fields = ['id', 'prefix', 'pays']
 
-class FactureListSerializer(serializers.ModelSerializer):
+def _est_echue(ligne):
+    # Facture.est_echue sur une ligne .values()
+    return ligne['statut'] == 'echue' or (ligne['statut'] == 'envoyee' and timezone.localdate() > ligne['date_echeance'])
+
+class FactureListSerializer(LectureRapideMixin, ChampsPartielsMixin, serializers.ModelSerializer):
     prefix_telephone_data = PrefixTelephoneSerializer(read_only=True)
     cree_par_data = serializers.SerializerMethodField()
     
@@ -20,6 +27,12 @@ class FactureListSerializer(serializers.ModelSerializer):
             'date_facture', 'date_echeance', 'statut', 'motif', 'description',
             'cree_par_data', 'est_payee', 'est_echue', 'date_creation', 'date_modification'
         ]
+        select_related = ['prefix_telephone', 'cree_par']
+        lecture_rapide = {
+            'cree_par_data': LECTURE_CREE_PAR,
+            'est_payee': (['statut'], lambda ligne: ligne['statut'] == 'payee'),
+            'est_echue': (['statut', 'date_echeance'], _est_echue),
+        }
     
     def get_cree_par_data(self, obj):
         if obj.cree_par:
@@ -30,6 +43,7 @@ class FactureListSerializer(serializers.ModelSerializer):
         return None
 
 class FactureCreateSerializer(serializers.ModelSerializer):
+    numero = serializers.CharField(max_length=50, required=False, allow_blank=True)
     prefix_telephone = serializers.PrimaryKeyRelatedField(
         queryset=PrefixTelephone.objects.all(),
         required=False,
@@ -55,7 +69,9 @@ class FactureCreateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Entreprise requise.")
         
         numero = attrs.get('numero', '').strip()
-        if Facture.objects.filter(numero=numero, entreprise=entreprise).exists():
+        # contrôle limité à l'entreprise : l'existence d'un numéro chez un autre tenant ne doit pas fuiter
+        # (la contrainte unique globale est rattrapée à l'enregistrement par la vue)
+        if numero and Facture.objects.filter(entreprise=entreprise, numero=numero).exists():
             raise serializers.ValidationError("Numéro de facture dupliqué.")
         
         if attrs.get('montant', 0) <= 0:
@@ -72,12 +88,11 @@ class FactureCreateSerializer(serializers.ModelSerializer):
         entreprise = self.context['entreprise']
         validated_data['entreprise'] = entreprise
         
-        # Générer numero auto si vide
-        numero = validated_data.get('numero')
-        if not numero:
-            validated_data['numero'] = f"FAC-{timezone.now().year}-{entreprise.id:04d}"
-        
-        return super().create(validated_data)
+        with transaction.atomic():
+            # Générer numero auto si vide (dans la même transaction que l'insertion)
+            numero = validated_data.get('numero', '').strip()
+            validated_data['numero'] = numero or allouer_numero(entreprise.id)
+            return super().create(validated_data)
 
 class FactureUpdateSerializer(serializers.ModelSerializer):
     prefix_telephone = serializers.PrimaryKeyRelatedField(
@@ -0,0 +1,33 @@
+from django.db.models.signals import post_init, pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from apps.finance.analytique import CHAMPS_RESUME, empreinte, noter_facture
+from apps.finance.models import Facture
+
+
+@receiver(post_init, sender=Facture)
+def memoriser_empreinte_facture(sender, instance, **kwargs):
+    # pas de requête supplémentaire si un des champs est différé (.only()/.defer())
+    if instance.pk is None or instance.get_deferred_fields() & CHAMPS_RESUME:
+        instance._empreinte_resume = None
+    else:
+        instance._empreinte_resume = empreinte(instance)
+
+
+@receiver(pre_save, sender=Facture)
+def charger_empreinte_facture(sender, instance, **kwargs):
+    if instance.pk is not None and instance._empreinte_resume is None:
+        ancienne = Facture.objects.filter(pk=instance.pk).only('entreprise', 'date_facture', 'statut', 'montant').first()
+        instance._empreinte_resume = empreinte(ancienne) if ancienne else None
+
+
+@receiver(post_save, sender=Facture)
+def mettre_a_jour_resume_facture(sender, instance, created, **kwargs):
+    apres = empreinte(instance)
+    noter_facture(None if created else instance._empreinte_resume, apres)
+    instance._empreinte_resume = apres
+
+
+@receiver(post_delete, sender=Facture)
+def retirer_resume_facture(sender, instance, **kwargs):
+    noter_facture(instance._empreinte_resume or empreinte(instance), None)
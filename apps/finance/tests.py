@@ -1,3 +1,463 @@
-from django.test import TestCase
+import csv
+import os
+import tempfile
+import zipfile
+from concurrent.futures import Future
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock, skipIf
+
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from concurrent.futures import ThreadPoolExecutor
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.entreprise.models import Entreprise, Devise, PrefixTelephone
+from apps.finance.analytique import analytique_factures, recalculer_resumes
+from apps.finance.echeances import basculer_echues
+from apps.finance.models import Facture, ResumeFactureMensuel, SequenceFacture
+from apps.finance.numerotation import allouer_numero, formater_numero, _BLOCS
+from apps.employe.models import Employe
+from apps.finance.serializers import FactureCreateSerializer, FactureListSerializer
+from helpers import exports, pdf
+from helpers.generateur import GenerateurTenant
+from helpers.renderers import JSONRapideRenderer
 
 # Create your tests here.
+
+class NumerotationFactureTests(TransactionTestCase):
+    ECRIVAINS = 8
+    NUMEROS = 200
+
+    def setUp(self):
+        _BLOCS.vider()
+        Devise.objects.get_or_create(id=125, defaults={'nom_court': 'MGA', 'nom_long': 'Ariary', 'pays': 'MG'})
+        self.entreprise = Entreprise.objects.create(nom_complet='E', email='e@exemple.com', mot_de_passe='x', numero_telephone='1')
+        self.prefix = PrefixTelephone.objects.create(prefix='+261', pays='Madagascar')
+
+    def allouer(self, _):
+        try:
+            return allouer_numero(self.entreprise.id, annee=2025)
+        finally:
+            connection.close()
+
+    def allouer_en_parallele(self):
+        with ThreadPoolExecutor(max_workers=self.ECRIVAINS) as executor:
+            return list(executor.map(self.allouer, range(self.NUMEROS)))
+
+    @override_settings(FACTURE_NUMEROTATION='continue')
+    def test_continue_sans_doublon_ni_trou(self):
+        numeros = self.allouer_en_parallele()
+
+        attendus = {formater_numero(self.entreprise.id, 2025, n) for n in range(1, self.NUMEROS + 1)}
+        self.assertEqual(set(numeros), attendus)
+
+    @override_settings(FACTURE_NUMEROTATION='bloc', FACTURE_NUMEROTATION_BLOC=16)
+    def test_bloc_sans_doublon(self):
+        numeros = self.allouer_en_parallele()
+
+        self.assertEqual(len(set(numeros)), self.NUMEROS)
+        sequence = SequenceFacture.objects.get(entreprise=self.entreprise, annee=2025)
+        self.assertEqual(sequence.dernier_numero % 16, 0)
+
+    def test_creation_factures_en_parallele(self):
+        def creer(i):
+            try:
+                serializer = FactureCreateSerializer(data={
+                    'client': f'Client {i}', 'montant': '1000', 'date_facture': '2025-01-10', 'date_echeance': '2025-02-10',
+                    'prefix_telephone': self.prefix.id,
+                }, context={'entreprise': self.entreprise})
+                serializer.is_valid(raise_exception=True)
+                return serializer.save().numero
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=self.ECRIVAINS) as executor:
+            numeros = list(executor.map(creer, range(40)))
+
+        self.assertEqual(len(set(numeros)), 40)
+        self.assertEqual(Facture.objects.filter(entreprise=self.entreprise).count(), 40)
+
+
+class NumeroFactureParEntrepriseTests(TestCase):
+    def setUp(self):
+        Devise.objects.get_or_create(id=125, defaults={'nom_court': 'MGA', 'nom_long': 'Ariary', 'pays': 'MG'})
+        self.prefix = PrefixTelephone.objects.create(prefix='+261', pays='Madagascar')
+        self.entreprise = Entreprise.objects.create(
+            nom_complet='E', email='e@exemple.com', mot_de_passe='x', numero_telephone='1', est_verifie=True, est_actif=True
+        )
+        autre = Entreprise.objects.create(nom_complet='A', email='a@exemple.com', mot_de_passe='x', numero_telephone='2')
+        Facture.objects.create(
+            numero='FAC-A-1', entreprise=autre, client='C', montant=Decimal('10'),
+            date_facture=date(2025, 1, 1), date_echeance=date(2025, 2, 1), prefix_telephone=self.prefix,
+        )
+        token = AccessToken()
+        token['entreprise_id'] = self.entreprise.id
+        self.api = APIClient()
+        self.api.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def creer(self, numero):
+        return self.api.post('/api/finances/factures/create/', {
+            'numero': numero, 'client': 'Client', 'montant': '1000', 'date_facture': '2025-01-10',
+            'date_echeance': '2025-02-10', 'prefix_telephone': self.prefix.id,
+        }, format='json')
+
+    def test_numero_d_une_autre_entreprise(self):
+        reponse = self.creer('FAC-A-1')
+
+        self.assertEqual(reponse.status_code, 400)
+        self.assertEqual(reponse.json()['message'], "Numéro de facture indisponible.")
+        self.assertFalse(Facture.objects.filter(entreprise=self.entreprise).exists())
+
+    def test_numero_deja_utilise_par_l_entreprise(self):
+        self.assertEqual(self.creer('FAC-E-1').status_code, 201)
+
+        reponse = self.creer('FAC-E-1')
+        self.assertEqual(reponse.status_code, 400)
+        self.assertEqual(reponse.json()['donnees']['non_field_errors'], ["Numéro de facture dupliqué."])
+
+
+class BasculeEcheancesTests(TestCase):
+    def setUp(self):
+        self.entreprise = Entreprise.objects.create(nom_complet='E', email='e@exemple.com', mot_de_passe='x', numero_telephone='1')
+        self.prefix = PrefixTelephone.objects.create(prefix='+261', pays='Madagascar')
+        for i, (statut, echeance) in enumerate([
+            ('envoyee', date(2025, 1, 31)), ('envoyee', date(2025, 2, 28)), ('envoyee', date(2025, 3, 31)),
+            ('payee', date(2025, 1, 31)), ('brouillon', date(2025, 1, 31)),
+        ]):
+            Facture.objects.create(
+                entreprise=self.entreprise, prefix_telephone=self.prefix, numero=f'F-{i}', client=f'C{i}',
+                montant=Decimal('100'), date_facture=date(2025, 1, 10), date_echeance=echeance, statut=statut,
+            )
+
+    def resumes(self):
+        return set(ResumeFactureMensuel.objects.filter(nombre__gt=0).values_list('mois', 'statut', 'nombre', 'montant_total'))
+
+    def test_bascule_par_lots(self):
+        self.assertEqual(set(Facture.objects.filter(Facture.filtre_echues(date(2025, 3, 15))).values_list('numero', flat=True)),
+                         {'F-0', 'F-1'})
+
+        total, _ = basculer_echues(taille_lot=1, aujourdhui=date(2025, 3, 15))
+
+        self.assertEqual(total, 2)
+        self.assertEqual(set(Facture.objects.filter(statut='echue').values_list('numero', flat=True)), {'F-0', 'F-1'})
+        self.assertEqual(Facture.objects.get(numero='F-2').statut, 'envoyee')
+        self.assertEqual(basculer_echues(aujourdhui=date(2025, 3, 15))[0], 0)
+
+        # résumés ajustés sans passer par les signaux, identiques à un recalcul complet
+        resumes = self.resumes()
+        recalculer_resumes(self.entreprise.id)
+        self.assertEqual(resumes, self.resumes())
+
+    def test_echeance_au_jour_local(self):
+        # 31 mars 22h UTC = 1er avril 1h à Antananarivo : l'échéance du 31 mars est dépassée
+        instant = datetime(2025, 3, 31, 22, tzinfo=dt_timezone.utc)
+        with mock.patch('django.utils.timezone.now', return_value=instant):
+            self.assertTrue(Facture.objects.get(numero='F-2').est_echue)
+            self.assertIn('F-2', Facture.objects.filter(Facture.filtre_echues()).values_list('numero', flat=True))
+
+
+class LectureRapideFacturesTests(TestCase):
+    def test_sortie_identique_au_serializer(self):
+        generateur = GenerateurTenant(graine=2)
+        entreprise = generateur.entreprise('e@exemple.com', 'E')
+        generateur.factures(entreprise, 60)
+        employe = Employe.objects.create(entreprise=entreprise, nom_complet='Rabe', email='rabe@exemple.com', renumeration_devise=generateur.devise)
+        premieres = Facture.objects.order_by('id').values_list('id', flat=True)[:3]
+        Facture.objects.filter(id__in=list(premieres)).update(cree_par=employe, motif='Livraison', statut='envoyee')
+        factures = Facture.objects.filter(entreprise=entreprise).order_by('id')
+
+        attendu = JSONRapideRenderer().render(FactureListSerializer(FactureListSerializer.charger(factures), many=True).data)
+        with self.assertNumQueries(1):
+            rendu = JSONRapideRenderer().render(FactureListSerializer.representer(FactureListSerializer.lignes(factures)))
+        self.assertEqual(rendu, attendu)
+        self.assertIn(b'"est_echue":true', rendu)
+        self.assertIn(b'"nom_complet":"Rabe"', rendu)
+
+
+class PdfFacturesTests(TestCase):
+    def setUp(self):
+        dossier = tempfile.TemporaryDirectory()
+        self.addCleanup(dossier.cleanup)
+        parametres = override_settings(FACTURE_PDF_DOSSIER=dossier.name, FACTURE_PDF_LOT=2)
+        parametres.enable()
+        self.addCleanup(parametres.disable)
+
+        Devise.objects.get_or_create(id=125, defaults={'nom_court': 'MGA', 'nom_long': 'Ariary', 'pays': 'MG'})
+        self.prefix = PrefixTelephone.objects.create(prefix='+261', pays='Madagascar')
+        self.entreprise = self.creer_entreprise('e@exemple.com')
+        self.factures = [self.creer_facture(self.entreprise, f'F-{i}', date(2025, 6, 1 + i)) for i in range(3)]
+        self.creer_facture(self.entreprise, 'F-juillet', date(2025, 7, 1))
+        self.creer_facture(self.creer_entreprise('autre@exemple.com'), 'A-0', date(2025, 6, 2))
+
+        token = AccessToken()
+        token['entreprise_id'] = self.entreprise.id
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        self.rendus = []
+        patch = mock.patch('apps.finance.pdf.soumettre_rendu', side_effect=self.rendre)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def creer_entreprise(self, email):
+        return Entreprise.objects.create(
+            nom_complet='E', email=email, mot_de_passe='x', numero_telephone='1', est_verifie=True, est_actif=True
+        )
+
+    def creer_facture(self, entreprise, numero, date_facture):
+        return Facture.objects.create(
+            entreprise=entreprise, prefix_telephone=self.prefix, numero=numero, client='Client',
+            montant=Decimal('100'), date_facture=date_facture, date_echeance=date_facture, statut='envoyee',
+        )
+
+    def rendre(self, html, url_base=None):
+        self.rendus.append(html)
+        rendu = Future()
+        rendu.set_result(f'%PDF {len(self.rendus)}'.encode())
+        return rendu
+
+    def telecharger(self, facture):
+        reponse = self.client.get(f'/api/finances/factures/{facture.id}/pdf/')
+        self.assertEqual(reponse.status_code, 200)
+        self.assertEqual(reponse['Content-Type'], 'application/pdf')
+        return b''.join(reponse.streaming_content)
+
+    def test_cache_par_empreinte(self):
+        facture = self.factures[0]
+        self.assertEqual(self.telecharger(facture), b'%PDF 1')
+        self.assertIn('F-0', self.rendus[0])
+        self.assertEqual(self.telecharger(facture), b'%PDF 1')  # cache : pas de nouveau rendu
+        self.assertEqual(len(self.rendus), 1)
+
+        facture.montant = Decimal('250')
+        facture.save()
+        self.assertEqual(self.telecharger(facture), b'%PDF 2')  # contenu modifié : nouvelle empreinte
+        self.assertEqual(sum(len(fichiers) for _, _, fichiers in os.walk(settings.FACTURE_PDF_DOSSIER)), 2)
+
+    def test_archive_du_mois(self):
+        self.telecharger(self.factures[1])  # déjà en cache
+        reponse = self.client.get('/api/finances/factures/pdf/', {'mois': '2025-06'})
+        self.assertEqual(reponse.status_code, 200)
+        self.assertEqual(reponse['Content-Disposition'], 'attachment; filename="factures_2025-06.zip"')
+        archive = zipfile.ZipFile(BytesIO(b''.join(reponse.streaming_content)))
+        self.assertEqual(archive.namelist(), ['F-0.pdf', 'F-1.pdf', 'F-2.pdf'])  # ni juillet ni l'autre entreprise
+        self.assertEqual(archive.read('F-1.pdf'), b'%PDF 1')
+        self.assertEqual(len(self.rendus), 3)
+
+        self.assertEqual(self.client.get('/api/finances/factures/pdf/', {'mois': '06/2025'}).status_code, 400)
+
+    def test_rendu_indisponible(self):
+        # rendu réel, sans weasyprint
+        with mock.patch('apps.finance.pdf.soumettre_rendu', pdf.soumettre_rendu), mock.patch('helpers.pdf.HTML', None):
+            for url in (f'/api/finances/factures/{self.factures[0].id}/pdf/', '/api/finances/factures/pdf/?mois=2025-06'):
+                reponse = self.client.get(url)
+                self.assertEqual(reponse.status_code, 503)
+                self.assertFalse(reponse.json()['success'])
+
+
+class ExportFacturesTests(TestCase):
+    def setUp(self):
+        Devise.objects.get_or_create(id=125, defaults={'nom_court': 'MGA', 'nom_long': 'Ariary', 'pays': 'MG'})
+        self.entreprise = Entreprise.objects.create(
+            nom_complet='E', email='e@exemple.com', mot_de_passe='x', numero_telephone='1', est_verifie=True, est_actif=True
+        )
+        autre = Entreprise.objects.create(nom_complet='A', email='a@exemple.com', mot_de_passe='x', numero_telephone='2')
+        prefix = PrefixTelephone.objects.create(prefix='+261', pays='Madagascar')
+        employe = Employe.objects.create(entreprise=self.entreprise, nom_complet='Rabe', email='rabe@exemple.com')
+        hier = date.today() - timedelta(days=1)
+        for numero, statut, echeance, cree_par in [
+            ('F-1', 'envoyee', hier, employe), ('F-2', 'envoyee', date.today() + timedelta(days=30), None), ('F-3', 'payee', hier, None),
+        ]:
+            Facture.objects.create(
+                entreprise=self.entreprise, prefix_telephone=prefix, numero=numero, client='-Client', montant=Decimal('1500.50'),
+                date_facture=hier, date_echeance=echeance, statut=statut, cree_par=cree_par,
+            )
+        Facture.objects.create(
+            entreprise=autre, prefix_telephone=prefix, numero='X-1', client='C', montant=Decimal('1'),
+            date_facture=hier, date_echeance=hier, statut='envoyee',
+        )
+        token = AccessToken()
+        token['entreprise_id'] = self.entreprise.id
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def csv(self, **parametres):
+        reponse = self.client.get('/api/finances/factures/export/', parametres)
+        self.assertEqual(reponse.status_code, 200)
+        return list(csv.reader(StringIO(b''.join(reponse.streaming_content).decode('utf-8')[1:]), delimiter=';'))
+
+    def test_csv(self):
+        lignes = self.csv()
+        self.assertEqual(lignes[0], [
+            'numero', 'client', 'montant', 'prefix_telephone', 'date_facture', 'date_echeance',
+            'statut', 'est_echue', 'motif', 'description', 'cree_par', 'date_creation'
+        ])
+        # entreprise connectée uniquement, plus récente d'abord ; est_echue calculée à l'export
+        self.assertEqual([(ligne[0], ligne[7], ligne[10]) for ligne in lignes[1:]], [
+            ('F-3', 'False', ''), ('F-2', 'False', ''), ('F-1', 'True', 'Rabe'),
+        ])
+        self.assertEqual(lignes[1][1:4], ["'-Client", '1500.50', '+261'])
+        self.assertEqual([ligne[0] for ligne in self.csv(statut='envoyee', echue='true')[1:]], ['F-1'])
+
+    @skipIf(exports.Workbook is None, 'openpyxl non installé')
+    def test_xlsx(self):
+        from openpyxl import load_workbook
+
+        reponse = self.client.get('/api/finances/factures/export/', {'type': 'xlsx', 'statut': 'envoyee'})
+        self.assertEqual(reponse.status_code, 200)
+        self.assertRegex(reponse['Content-Disposition'], r'filename="factures_\d{8}\.xlsx"')
+        lignes = list(load_workbook(BytesIO(b''.join(reponse.streaming_content))).active.values)
+        self.assertEqual([(ligne[0], ligne[7]) for ligne in lignes[1:]], [('F-2', False), ('F-1', True)])
+        self.assertEqual(lignes[2][2], 1500.5)
+        self.assertIsNone(lignes[2][11].tzinfo)
+
+    def test_format_invalide(self):
+        reponse = self.client.get('/api/finances/factures/export/', {'type': 'json'})
+        self.assertEqual(reponse.status_code, 400)
+        self.assertEqual(set(reponse.json()), {'message', 'success', 'donnees'})
+
+
+class AnalytiqueFacturesTests(TestCase):
+    def setUp(self):
+        Devise.objects.get_or_create(id=125, defaults={'nom_court': 'MGA', 'nom_long': 'Ariary', 'pays': 'MG'})
+        self.entreprise = Entreprise.objects.create(
+            nom_complet='E', email='e@exemple.com', mot_de_passe='x', numero_telephone='1', est_verifie=True, est_actif=True
+        )
+        self.autre = Entreprise.objects.create(nom_complet='A', email='a@exemple.com', mot_de_passe='x', numero_telephone='2')
+        self.prefix = PrefixTelephone.objects.create(prefix='+261', pays='Madagascar')
+        aujourdhui = date.today()
+        self.janvier_a = self.facture('F-1', 'Shoprite', '100', date(2025, 1, 5), 'payee')
+        self.janvier_b = self.facture('F-2', 'Jumbo', '250', date(2025, 1, 20), 'payee')
+        # retards relatifs à aujourd'hui : tranches 31-60 et 90+
+        self.fevrier = self.facture('F-3', 'Shoprite', '300', date(2025, 2, 10), 'envoyee', aujourdhui - timedelta(days=45))
+        self.facture('F-4', 'Jumbo', '40', date(2025, 2, 11), 'echue', aujourdhui - timedelta(days=200))
+        self.facture('F-5', 'Tiko', '999', date(2024, 12, 31), 'payee')  # hors période
+        self.facture('X-1', 'Shoprite', '5000', date(2025, 1, 5), 'payee', entreprise=self.autre)
+        token = AccessToken()
+        token['entreprise_id'] = self.entreprise.id
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def facture(self, numero, client, montant, date_facture, statut, date_echeance=None, entreprise=None):
+        return Facture.objects.create(
+            entreprise=entreprise or self.entreprise, prefix_telephone=self.prefix, numero=numero, client=client,
+            montant=Decimal(montant), date_facture=date_facture, date_echeance=date_echeance or date_facture + timedelta(days=30),
+            statut=statut,
+        )
+
+    def resumes(self):
+        return set(ResumeFactureMensuel.objects.filter(nombre__gt=0).values_list('entreprise_id', 'mois', 'statut', 'nombre', 'montant_total'))
+
+    def assertResumesExacts(self):
+        resumes = self.resumes()
+        recalculer_resumes()
+        self.assertEqual(resumes, self.resumes())
+
+    def test_endpoint(self):
+        reponse = self.client.get('/api/finances/factures/analytique/', {'debut': '2025-01', 'fin': '2025-02', 'clients': 2})
+        self.assertEqual(reponse.status_code, 200)
+        donnees = reponse.json()['donnees']
+        self.assertEqual((donnees['debut'], donnees['fin']), ('2025-01', '2025-02'))
+        self.assertEqual(donnees['total'], {'nombre': 4, 'montant': '690.00'})
+        self.assertEqual(donnees['par_statut'], [
+            {'statut': 'echue', 'nombre': 1, 'montant': '40.00'},
+            {'statut': 'envoyee', 'nombre': 1, 'montant': '300.00'},
+            {'statut': 'payee', 'nombre': 2, 'montant': '350.00'},
+        ])
+        self.assertEqual(donnees['par_mois'], [
+            {'mois': '2025-01', 'nombre': 2, 'montant': '350.00'},
+            {'mois': '2025-02', 'nombre': 2, 'montant': '340.00'},
+        ])
+        self.assertEqual(donnees['par_client'], [
+            {'client': 'Shoprite', 'nombre': 2, 'montant': '400.00'},
+            {'client': 'Jumbo', 'nombre': 2, 'montant': '290.00'},
+        ])
+        self.assertEqual(donnees['retards'], [
+            {'tranche': '0-30', 'nombre': 0, 'montant': '0.00'},
+            {'tranche': '31-60', 'nombre': 1, 'montant': '300.00'},
+            {'tranche': '61-90', 'nombre': 0, 'montant': '0.00'},
+            {'tranche': '90+', 'nombre': 1, 'montant': '40.00'},
+        ])
+
+    def test_parametres_invalides(self):
+        for parametres in ({'fin': '2025-13'}, {'debut': '2025'}, {'clients': 'x'}):
+            reponse = self.client.get('/api/finances/factures/analytique/', parametres)
+            self.assertEqual(reponse.status_code, 400, parametres)
+            self.assertEqual(reponse.json()['success'], False)
+
+    def test_resumes_suivent_les_modifications(self):
+        self.assertResumesExacts()
+
+        # changement de statut, puis de montant, par l'API
+        reponse = self.client.patch(f'/api/finances/factures/{self.fevrier.id}/update/', {'statut': 'payee'}, format='json')
+        self.assertEqual(reponse.status_code, 200)
+        self.assertResumesExacts()
+        reponse = self.client.patch(f'/api/finances/factures/{self.janvier_a.id}/update/', {'montant': '175.00'}, format='json')
+        self.assertEqual(reponse.status_code, 200)
+        self.assertResumesExacts()
+
+        # instance partielle (.only()) : l'ancienne empreinte est relue avant l'écriture
+        facture = Facture.objects.only('id', 'statut').get(id=self.janvier_b.id)
+        facture.statut = 'annulee'
+        facture.save(update_fields=['statut'])
+        self.assertResumesExacts()
+
+        self.assertEqual(self.client.delete(f'/api/finances/factures/{self.janvier_a.id}/delete/').status_code, 200)
+        self.assertResumesExacts()
+
+        donnees = analytique_factures(self.entreprise, date(2025, 1, 1), date(2025, 2, 1))
+        self.assertEqual(donnees['par_statut'], [
+            {'statut': 'annulee', 'nombre': 1, 'montant': '250.00'},
+            {'statut': 'echue', 'nombre': 1, 'montant': '40.00'},
+            {'statut': 'payee', 'nombre': 1, 'montant': '300.00'},
+        ])
+        self.assertEqual(donnees['total'], {'nombre': 3, 'montant': '590.00'})
+
+
+class PaginationFacturesTests(TestCase):
+    def setUp(self):
+        generateur = GenerateurTenant(graine=5)
+        self.entreprise = generateur.entreprise('e@exemple.com', 'E')
+        generateur.factures(self.entreprise, 8)
+        generateur.factures(generateur.entreprise('a@exemple.com', 'A'), 3)
+        self.attendus = list(
+            Facture.objects.filter(entreprise=self.entreprise).order_by('-date_creation', '-id').values_list('id', flat=True)
+        )
+        token = AccessToken()
+        token['entreprise_id'] = self.entreprise.id
+        self.api = APIClient()
+        self.api.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def page(self, **parametres):
+        reponse = self.api.get('/api/finances/factures/', {'fields': 'id', **parametres})
+        self.assertEqual(reponse.status_code, 200, reponse.content)
+        return [facture['id'] for facture in reponse.json()['donnees']], reponse.json()['pagination']
+
+    def parcourir(self, limite, **parametres):
+        ids, pagination = self.page(limit=limite, **parametres)
+        while pagination['next'] is not None:
+            self.assertEqual(set(pagination), {'limit', 'next'})
+            suite, pagination = self.page(limit=limite, cursor=pagination['next'], **parametres)
+            ids += suite
+        return ids
+
+    def test_curseur(self):
+        self.assertEqual(len(set(self.attendus)), 8)
+        self.assertEqual(self.parcourir(3), self.attendus)
+        # filtre : sous-suite dans le même ordre
+        payees = set(Facture.objects.filter(entreprise=self.entreprise, statut='payee').values_list('id', flat=True))
+        self.assertEqual(self.parcourir(2, statut='payee'), [i for i in self.attendus if i in payees])
+        # date_creation identiques : départage par id
+        Facture.objects.filter(entreprise=self.entreprise).update(date_creation=timezone.now())
+        self.assertEqual(self.parcourir(3), sorted(self.attendus, reverse=True))
+
+    def test_mode_offset(self):
+        self.assertEqual(self.page(limit=3, offset=0), (self.attendus[:3], {'limit': 3, 'next': 3, 'offset': 0}))
+        self.assertEqual(self.page(limit=3, offset=3), (self.attendus[3:6], {'limit': 3, 'next': 6, 'offset': 3}))
+        self.assertEqual(self.page(limit=3, offset=6), (self.attendus[6:], {'limit': 3, 'next': None, 'offset': 6}))
+        self.assertEqual(self.api.get('/api/finances/factures/', {'limit': 'x'}).status_code, 400)
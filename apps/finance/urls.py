@@ -3,8 +3,12 @@ from apps.finance import views
 
 urlpatterns = [
     path('factures/', views.FactureListView.as_view(), name='facture-list'),
+    path('factures/export/', views.FactureExportView.as_view(), name='facture-export'),
+    path('factures/analytique/', views.FactureAnalytiqueView.as_view(), name='facture-analytique'),
     path('factures/create/', views.FactureCreateView.as_view(), name='facture-create'),
     path('factures/<int:facture_id>/details/', views.FactureDetailView.as_view(), name='facture-detail'),
+    path('factures/<int:facture_id>/pdf/', views.FacturePdfView.as_view(), name='facture-pdf'),
+    path('factures/pdf/', views.FacturePdfMoisView.as_view(), name='facture-pdf-mois'),
     path('factures/<int:facture_id>/update/', views.FactureUpdateView.as_view(), name='facture-update'),
     path('factures/<int:facture_id>/delete/', views.FactureDeleteView.as_view(), name='facture-delete'),
 ]
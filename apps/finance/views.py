@@ -1,14 +1,28 @@
+from django.db import IntegrityError
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-import traceback
 from .models import Facture
 from .serializers import (
     FactureListSerializer, FactureCreateSerializer, FactureUpdateSerializer
 )
-from helpers.permissions import IsAuthenticatedEntrepriseOrEmploye
+from helpers.permissions import IsAuthenticatedEntrepriseOrEmploye, AccesRessource
+from helpers.pagination import paginer, PaginationInvalide, PARAMETRES_PAGINATION, SCHEMA_PAGINATION
+from helpers.champs import champs_demandes, ChampsInvalides, PARAMETRE_CHAMPS
+from helpers.exports import reponse_export, ExportInvalide, PARAMETRE_FORMAT_EXPORT
+from helpers.middleware import chronometre_serializer
+from helpers.pdf import RenduPdfIndisponible
+from helpers.reponses import erreur, erreur_serveur
+from .pdf import pdf_facture, nom_fichier_pdf, zip_factures
+from django.http import FileResponse, StreamingHttpResponse
+from .analytique import analytique_factures, debut_mois
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from datetime import date, timedelta
+from itertools import chain
 
 # Schemas JSON 100% manuels (PAS de serializer dans Swagger)
 RESPONSE_JSON = openapi.Schema(
@@ -68,17 +82,54 @@ RESPONSE_JSON_DETAIL = openapi.Schema(
     }
 )
 
+PARAMETRES_FILTRE_FACTURES = [
+    openapi.Parameter('statut', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False),
+    openapi.Parameter('q', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False, description="Recherche numero/client"),
+    openapi.Parameter('echue', openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN, required=False, description="Uniquement les factures échues"),
+]
+
+COLONNES_EXPORT_FACTURES = [
+    'numero', 'client', 'montant', 'prefix_telephone', 'date_facture', 'date_echeance',
+    'statut', 'est_echue', 'motif', 'description', 'cree_par', 'date_creation'
+]
+
+
+def filtrer_factures(request):
+    """Factures de l'entreprise connectée filtrées par statut, q et echue (liste et export)."""
+    qs = Facture.objects.filter(entreprise=request.principal.entreprise)
+    statut = request.GET.get('statut')
+    q = request.GET.get('q', '')
+    if statut:
+        qs = qs.filter(statut=statut)
+    if request.GET.get('echue') in ('1', 'true'):
+        qs = qs.filter(Facture.filtre_echues())
+    if q:
+        qs = qs.filter(Q(numero__icontains=q) | Q(client__icontains=q))
+    return qs
+
+
+def lignes_export_factures(qs, aujourdhui):
+    for ligne in qs.iterator(chunk_size=settings.EXPORT_TAILLE_LOT):
+        statut, date_echeance = ligne[6], ligne[5]
+        est_echue = statut == 'echue' or (statut == 'envoyee' and aujourdhui > date_echeance)
+        yield (*ligne[:7], est_echue, *ligne[7:])
+
+
 class FactureListView(APIView):
-    permission_classes = [IsAuthenticatedEntrepriseOrEmploye]
+    permission_classes = [IsAuthenticatedEntrepriseOrEmploye, AccesRessource]
+    ressource_acces = 'factures'
+    authentication_classes = []
     
     @swagger_auto_schema(
         tags=['Facture'],
         manual_parameters=[
-            openapi.Parameter('statut', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False),
-            openapi.Parameter('q', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False, description="Recherche numero/client")
+            *PARAMETRES_FILTRE_FACTURES,
+            *PARAMETRES_PAGINATION,
+            PARAMETRE_CHAMPS
         ],
         responses={
             200: openapi.Response('Liste factures', RESPONSE_JSON_LIST),
+            400: openapi.Response('Pagination ou champs invalides', RESPONSE_JSON),
             401: openapi.Response('Non authentifié', RESPONSE_JSON),
             403: openapi.Response('Non autorisé', RESPONSE_JSON),
             500: openapi.Response('Erreur serveur', RESPONSE_JSON)
@@ -87,39 +138,108 @@ class FactureListView(APIView):
     )
     def get(self, request):
         try:
-            filters = {}
-            statut = request.GET.get('statut')
-            q = request.GET.get('q', '')
-            
-            entreprise = getattr(request, 'entreprise', request.employe.entreprise)
-            qs = Facture.objects.filter(entreprise=entreprise)
-            
-            if statut:
-                qs = qs.filter(statut=statut)
-            if q:
-                qs = qs.filter(
-                    numero__icontains=q
-                ) | qs.filter(
-                    client__icontains=q
-                )
-            
-            qs = qs.select_related('prefix_telephone', 'cree_par').order_by('-date_creation')
-            serializer = FactureListSerializer(qs, many=True)
+            champs = champs_demandes(request, FactureListSerializer)
+            # lecture seule : lignes .values() sans instancier de Facture
+            factures, pagination = paginer(request, FactureListSerializer.lignes(filtrer_factures(request), champs))
+            with chronometre_serializer():
+                donnees = FactureListSerializer.representer(factures, champs)
             return Response({
                 "message": "Factures récupérées avec succès.",
                 "success": True,
-                "donnees": serializer.data
+                "donnees": donnees,
+                "pagination": pagination
             }, status=status.HTTP_200_OK)
             
+        except (PaginationInvalide, ChampsInvalides) as e:
+            return Response({
+                "message": str(e),
+                "success": False,
+                "donnees": {}
+            }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
+            return erreur_serveur(e)
+
+class FactureExportView(APIView):
+    permission_classes = [IsAuthenticatedEntrepriseOrEmploye, AccesRessource]
+    ressource_acces = 'factures'
+    authentication_classes = []
+    
+    @swagger_auto_schema(
+        tags=['Facture'],
+        manual_parameters=[*PARAMETRES_FILTRE_FACTURES, PARAMETRE_FORMAT_EXPORT],
+        responses={
+            200: openapi.Response('Fichier CSV ou XLSX'),
+            400: openapi.Response('Format invalide', RESPONSE_JSON),
+            500: openapi.Response('Erreur serveur', RESPONSE_JSON)
+        },
+        operation_description="Exporter les factures de l'entreprise (mêmes filtres que la liste), envoyées ligne à ligne."
+    )
+    def get(self, request):
+        try:
+            aujourdhui = timezone.localdate()
+            qs = filtrer_factures(request).order_by('-date_creation', '-id').values_list(
+                'numero', 'client', 'montant', 'prefix_telephone__prefix', 'date_facture', 'date_echeance',
+                'statut', 'motif', 'description', 'cree_par__nom_complet', 'date_creation'
+            )
+            return reponse_export(request, f"factures_{aujourdhui:%Y%m%d}", COLONNES_EXPORT_FACTURES, lignes_export_factures(qs, aujourdhui))
+            
+        except ExportInvalide as e:
             return Response({
-                "message": f"Erreur serveur: {str(e)}",
+                "message": str(e),
                 "success": False,
                 "donnees": {}
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return erreur_serveur(e)
+
+class FactureAnalytiqueView(APIView):
+    permission_classes = [IsAuthenticatedEntrepriseOrEmploye, AccesRessource]
+    ressource_acces = 'factures'
+    authentication_classes = []
+    
+    @swagger_auto_schema(
+        tags=['Facture'],
+        manual_parameters=[
+            openapi.Parameter('debut', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False, description="Mois de début AAAA-MM (défaut: 11 mois avant fin)"),
+            openapi.Parameter('fin', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False, description="Mois de fin AAAA-MM (défaut: mois courant)"),
+            openapi.Parameter('clients', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=False, description="Nombre de meilleurs clients (défaut: 10)")
+        ],
+        responses={
+            200: openapi.Response('Analytique factures', RESPONSE_JSON),
+            400: openapi.Response('Paramètres invalides', RESPONSE_JSON),
+            500: openapi.Response('Erreur serveur', RESPONSE_JSON)
+        },
+        operation_description="Totaux et nombres de factures par statut, mois, client et tranche de retard."
+    )
+    def get(self, request):
+        try:
+            try:
+                fin = debut_mois(date.fromisoformat(request.GET['fin'] + '-01')) if request.GET.get('fin') else debut_mois(timezone.localdate())
+                if request.GET.get('debut'):
+                    debut = date.fromisoformat(request.GET['debut'] + '-01')
+                else:
+                    debut = fin.replace(year=fin.year - 1, month=fin.month + 1) if fin.month < 12 else fin.replace(month=1)
+                nombre_clients = min(max(int(request.GET.get('clients', 10)), 0), 100)
+            except ValueError:
+                return Response({
+                    "message": "Paramètres invalides (debut/fin: AAAA-MM, clients: entier).",
+                    "success": False,
+                    "donnees": {}
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            return Response({
+                "message": "Analytique des factures récupérée avec succès.",
+                "success": True,
+                "donnees": analytique_factures(request.principal.entreprise, debut, fin, nombre_clients)
+            }, status=status.HTTP_200_OK)
+            
+        except Exception as e:
+            return erreur_serveur(e)
 
 class FactureCreateView(APIView):
-    permission_classes = [IsAuthenticatedEntrepriseOrEmploye]
+    permission_classes = [IsAuthenticatedEntrepriseOrEmploye, AccesRessource]
+    ressource_acces = 'factures'
+    authentication_classes = []
     
     @swagger_auto_schema(
         tags=['Facture'],
@@ -147,14 +267,22 @@ class FactureCreateView(APIView):
     )
     def post(self, request):
         try:
-            entreprise = getattr(request, 'entreprise', request.employe.entreprise)
+            entreprise = request.principal.entreprise
             serializer = FactureCreateSerializer(
                 data=request.data,
                 context={'entreprise': entreprise}
             )
             
             if serializer.is_valid():
-                facture = serializer.save()
+                try:
+                    facture = serializer.save()
+                except IntegrityError:
+                    # numéro déjà pris (autre entreprise, ou création concurrente) : sans dire par qui
+                    return Response({
+                        "message": "Numéro de facture indisponible.",
+                        "success": False,
+                        "donnees": {}
+                    }, status=status.HTTP_400_BAD_REQUEST)
                 return Response({
                     "message": "Facture créée avec succès.",
                     "success": True,
@@ -168,38 +296,47 @@ class FactureCreateView(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
             
         except Exception as e:
-            return Response({
-                "message": f"Erreur serveur: {str(e)} - {str(traceback.format_exc())}",
-                "success": False,
-                "donnees": {}
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
 class FactureDetailView(APIView):
-    permission_classes = [IsAuthenticatedEntrepriseOrEmploye]
+    permission_classes = [IsAuthenticatedEntrepriseOrEmploye, AccesRessource]
+    ressource_acces = 'factures'
+    authentication_classes = []
     
-    def get_object(self, facture_id):
-        entreprise = getattr(self.request, 'entreprise', self.request.employe.entreprise)
+    def get_object(self, facture_id, champs=None):
+        entreprise = self.request.principal.entreprise
         try:
-            return Facture.objects.get(id=facture_id, entreprise=entreprise)
+            return FactureListSerializer.charger(Facture.objects.filter(entreprise=entreprise), champs).get(id=facture_id)
         except Facture.DoesNotExist:
             raise Exception("Facture introuvable.")
     
     @swagger_auto_schema(
         tags=['Facture'],
+        manual_parameters=[PARAMETRE_CHAMPS],
         responses={
             200: openapi.Response('Détail facture', RESPONSE_JSON_DETAIL),
+            400: openapi.Response('Champs invalides', RESPONSE_JSON),
             404: openapi.Response('Facture introuvable', RESPONSE_JSON)
         }
     )
     def get(self, request, facture_id):
         try:
-            facture = self.get_object(facture_id)
+            champs = champs_demandes(request, FactureListSerializer)
+            facture = self.get_object(facture_id, champs)
+            with chronometre_serializer():
+                donnees = FactureListSerializer(facture, champs=champs).data
             return Response({
                 "message": "Facture récupérée avec succès.",
                 "success": True,
-                "donnees": FactureListSerializer(facture).data
+                "donnees": donnees
             }, status=status.HTTP_200_OK)
             
+        except ChampsInvalides as e:
+            return Response({
+                "message": str(e),
+                "success": False,
+                "donnees": {}
+            }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({
                 "message": str(e),
@@ -207,11 +344,103 @@ class FactureDetailView(APIView):
                 "donnees": {}
             }, status=status.HTTP_404_NOT_FOUND)
 
+class FacturePdfView(APIView):
+    permission_classes = [IsAuthenticatedEntrepriseOrEmploye, AccesRessource]
+    ressource_acces = 'factures'
+    authentication_classes = []
+    
+    @swagger_auto_schema(
+        tags=['Facture'],
+        responses={
+            200: openapi.Response('Fichier PDF'),
+            404: openapi.Response('Facture introuvable', RESPONSE_JSON),
+            503: openapi.Response('Génération PDF indisponible', RESPONSE_JSON),
+            500: openapi.Response('Erreur serveur', RESPONSE_JSON)
+        },
+        operation_description="PDF imprimable de la facture (rendu une seule fois tant que la facture ne change pas)."
+    )
+    def get(self, request, facture_id):
+        try:
+            facture = Facture.objects.select_related('entreprise__prefix_telephone', 'cree_par').filter(
+                id=facture_id, entreprise=request.principal.entreprise
+            ).first()
+            if facture is None:
+                return Response({
+                    "message": "Facture introuvable.",
+                    "success": False,
+                    "donnees": {}
+                }, status=status.HTTP_404_NOT_FOUND)
+            
+            return FileResponse(
+                open(pdf_facture(facture), 'rb'), filename=nom_fichier_pdf(facture), content_type='application/pdf'
+            )
+            
+        except RenduPdfIndisponible as e:
+            return Response({
+                "message": str(e),
+                "success": False,
+                "donnees": {}
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        except Exception as e:
+            return erreur_serveur(e)
+
+class FacturePdfMoisView(APIView):
+    permission_classes = [IsAuthenticatedEntrepriseOrEmploye, AccesRessource]
+    ressource_acces = 'factures'
+    authentication_classes = []
+    
+    @swagger_auto_schema(
+        tags=['Facture'],
+        manual_parameters=[
+            openapi.Parameter('mois', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True, description="Mois AAAA-MM (date de facture)"),
+            *PARAMETRES_FILTRE_FACTURES
+        ],
+        responses={
+            200: openapi.Response('Archive ZIP des PDF'),
+            400: openapi.Response('Paramètres invalides', RESPONSE_JSON),
+            503: openapi.Response('Génération PDF indisponible', RESPONSE_JSON),
+            500: openapi.Response('Erreur serveur', RESPONSE_JSON)
+        },
+        operation_description="PDF de toutes les factures d'un mois, envoyés dans une archive ZIP au fil du rendu."
+    )
+    def get(self, request):
+        try:
+            try:
+                mois = date.fromisoformat(request.GET.get('mois', '') + '-01')
+            except ValueError:
+                return Response({
+                    "message": "Paramètre mois invalide (AAAA-MM).",
+                    "success": False,
+                    "donnees": {}
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            fin = (mois + timedelta(days=32)).replace(day=1)
+            factures = filtrer_factures(request).filter(
+                date_facture__gte=mois, date_facture__lt=fin
+            ).select_related('entreprise__prefix_telephone', 'cree_par').order_by('date_facture', 'id')
+            # premier PDF rendu avant d'envoyer les en-têtes : une erreur de rendu reste une réponse JSON
+            flux = zip_factures(factures.iterator(chunk_size=settings.FACTURE_PDF_LOT))
+            premier = next(flux)
+            reponse = StreamingHttpResponse(chain([premier], flux), content_type='application/zip')
+            reponse['Content-Disposition'] = f'attachment; filename="factures_{mois:%Y-%m}.zip"'
+            return reponse
+            
+        except RenduPdfIndisponible as e:
+            return Response({
+                "message": str(e),
+                "success": False,
+                "donnees": {}
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        except Exception as e:
+            return erreur_serveur(e)
+
 class FactureUpdateView(APIView):
-    permission_classes = [IsAuthenticatedEntrepriseOrEmploye]
+    permission_classes = [IsAuthenticatedEntrepriseOrEmploye, AccesRessource]
+    ressource_acces = 'factures'
+    authentication_classes = []
     
     def get_object(self, facture_id):
-        entreprise = getattr(self.request, 'entreprise', self.request.employe.entreprise)
+        entreprise = self.request.principal.entreprise
         try:
             return Facture.objects.get(id=facture_id, entreprise=entreprise)
         except Facture.DoesNotExist:
@@ -257,17 +486,15 @@ class FactureUpdateView(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
             
         except Exception as e:
-            return Response({
-                "message": f"{str(e)} - {str(traceback.format_exc())}",
-                "success": False,
-                "donnees": {}
-            }, status=status.HTTP_400_BAD_REQUEST)
+            return erreur(str(e))
 
 class FactureDeleteView(APIView):
-    permission_classes = [IsAuthenticatedEntrepriseOrEmploye]
+    permission_classes = [IsAuthenticatedEntrepriseOrEmploye, AccesRessource]
+    ressource_acces = 'factures'
+    authentication_classes = []
     
     def get_object(self, facture_id):
-        entreprise = getattr(self.request, 'entreprise', self.request.employe.entreprise)
+        entreprise = self.request.principal.entreprise
         try:
             return Facture.objects.get(id=facture_id, entreprise=entreprise)
         except Facture.DoesNotExist:
@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+
+from helpers.cache import TTLCache
+
+# quantite <= stock_min, évalué en SQL (index partiel stock_rupture_idx)
+EN_RUPTURE = Q(quantite__lte=F('stock_min'))
+
+# Nombre de stocks en rupture par entreprise. Ajusté à chaque changement de quantité
+# ou de seuil fait par ce processus ; le TTL borne l'écart avec les autres workers.
+_COMPTEURS = TTLCache(ttl=settings.STOCK_ALERTES_CACHE_TTL)
+
+
+def compter_ruptures(entreprise_id):
+    nombre = _COMPTEURS.get(entreprise_id)
+    if nombre is None:
+        from apps.stock.models import Stock
+
+        nombre = Stock.objects.filter(EN_RUPTURE, entreprise_id=entreprise_id).count()
+        _COMPTEURS.set(entreprise_id, nombre)
+    return nombre
+
+
+def _ajuster(entreprise_id, increment):
+    nombre = _COMPTEURS.get(entreprise_id)
+    if nombre is not None:
+        _COMPTEURS.set(entreprise_id, max(nombre + increment, 0))
+
+
+def noter_changement(entreprise_id, etait_en_rupture, est_en_rupture):
+    """À appeler après chaque changement de quantité ou de seuil ; appliqué au commit."""
+    if etait_en_rupture == est_en_rupture:
+        return
+    increment = 1 if est_en_rupture else -1
+    transaction.on_commit(lambda: _ajuster(entreprise_id, increment))
+
+
+def invalider_compteur(entreprise_id):
+    transaction.on_commit(lambda: _COMPTEURS.delete(entreprise_id))
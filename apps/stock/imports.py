@@ -0,0 +1,206 @@
+import csv
+import io
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone as django_timezone
+from rest_framework import serializers
+
+from apps.stock.models import Stock, UNITE_CHOICES
+from apps.stock.mouvements import enregistrer_mouvements, nouveau_mouvement
+from apps.stock.alertes import invalider_compteur
+
+try:
+    from openpyxl import load_workbook
+except ImportError:  # XLSX optionnel
+    load_workbook = None
+
+COLONNES = ['nom', 'quantite', 'stock_min', 'unite', 'fournisseur', 'description']
+# au-delà, les erreurs sont seulement comptées (mémoire constante)
+ERREURS_MAX = 1000
+
+
+class ImportInvalide(ValueError):
+    pass
+
+
+class StockImportLigneSerializer(serializers.Serializer):
+    nom = serializers.CharField(max_length=200)
+    quantite = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=0, default=0)
+    stock_min = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=0, default=0)
+    unite = serializers.ChoiceField(choices=UNITE_CHOICES, default='kg')
+    fournisseur = serializers.CharField(max_length=200)
+    description = serializers.CharField(allow_blank=True, default='')
+
+
+def lignes_csv(fichier):
+    texte = io.TextIOWrapper(fichier, encoding='utf-8-sig', newline='')
+    echantillon = texte.readline()
+    texte.seek(0)
+    delimiteur = ';' if echantillon.count(';') > echantillon.count(',') else ','
+    lecteur = csv.reader(texte, delimiter=delimiteur)
+    entetes = [entete.strip().lower() for entete in next(lecteur, [])]
+    for ligne in lecteur:
+        yield dict(zip(entetes, ligne))
+
+
+def lignes_xlsx(fichier):
+    if load_workbook is None:
+        raise ImportInvalide("Import XLSX indisponible (openpyxl non installé), utilisez un fichier CSV.")
+    classeur = load_workbook(fichier, read_only=True, data_only=True)
+    try:
+        lignes = classeur.active.iter_rows(values_only=True)
+        entetes = [str(entete or '').strip().lower() for entete in next(lignes, ())]
+        for ligne in lignes:
+            yield dict(zip(entetes, ('' if valeur is None else str(valeur) for valeur in ligne)))
+    finally:
+        classeur.close()
+
+
+def lire_fichier(fichier):
+    nom = (fichier.name or '').lower()
+    if nom.endswith('.csv'):
+        return lignes_csv(fichier.file)
+    if nom.endswith('.xlsx'):
+        return lignes_xlsx(fichier.file)
+    raise ImportInvalide("Format non supporté (CSV ou XLSX attendu).")
+
+
+class ImportStocks:
+    """
+    Import en une passe : les noms existants de l'entreprise sont chargés une fois
+    (nom en minuscules -> id), les lignes valides sont accumulées puis écrites par lots
+    (bulk_create des nouveaux stocks, bulk_update des existants).
+
+    Un stock existant ne reçoit que les colonnes renseignées dans sa ligne (jamais les valeurs
+    par défaut) ; sa quantité est écrite comme un delta (F('quantite') + delta) calculé sur la
+    quantité relue sous verrou au moment de l'écriture, et journalisée en 'ajustement'.
+    """
+
+    def __init__(self, entreprise, employe=None, taille_lot=None):
+        self.entreprise = entreprise
+        self.employe = employe
+        self.taille_lot = taille_lot or settings.STOCK_IMPORT_TAILLE_LOT
+        self.existants = {
+            nom.lower(): identifiant
+            for identifiant, nom in Stock.objects.filter(entreprise=entreprise).values_list('id', 'nom')
+        }
+        self.vus = set()
+        self.champs = StockImportLigneSerializer().fields
+        # a_creer : (stock, colonnes renseignées) ; a_mettre_a_jour : (id, valeurs renseignées)
+        self.a_creer, self.a_mettre_a_jour = [], []
+        self.crees, self.mis_a_jour, self.nombre_erreurs = 0, 0, 0
+        self.erreurs = []
+
+    def _erreur(self, numero, erreurs):
+        self.nombre_erreurs += 1
+        if len(self.erreurs) < ERREURS_MAX:
+            self.erreurs.append({'ligne': numero, 'erreurs': erreurs})
+
+    def _valider(self, ligne, partiel=False):
+        """`partiel` (stock existant) : seules les colonnes renseignées sont validées, sans défaut."""
+        valeurs, erreurs = {}, {}
+        for nom, champ in self.champs.items():
+            brut = (ligne.get(nom) or '').strip()
+            if partiel and nom != 'nom' and not brut:
+                continue
+            try:
+                valeurs[nom] = champ.run_validation(brut if brut else serializers.empty)
+            except serializers.ValidationError as e:
+                erreurs[nom] = e.detail
+        return valeurs, erreurs
+
+    def ajouter(self, numero, ligne):
+        existant = self.existants.get((ligne.get('nom') or '').strip().lower())
+        valeurs, erreurs = self._valider(ligne, partiel=existant is not None)
+        if erreurs:
+            self._erreur(numero, erreurs)
+            return
+        cle = valeurs.pop('nom').lower() if existant else valeurs['nom'].lower()
+        if cle in self.vus:
+            self._erreur(numero, {'nom': ["Doublon dans le fichier."]})
+            return
+        self.vus.add(cle)
+
+        if existant:
+            self.a_mettre_a_jour.append((existant, valeurs))
+        else:
+            renseignees = [nom for nom in valeurs if nom != 'nom' and (ligne.get(nom) or '').strip()]
+            stock = Stock(entreprise=self.entreprise, cree_par_id=self.employe.id if self.employe else None, **valeurs)
+            self.a_creer.append((stock, renseignees))
+
+        if len(self.a_creer) + len(self.a_mettre_a_jour) >= self.taille_lot:
+            self.ecrire()
+
+    def ecrire(self):
+        if self.a_creer:
+            stocks = [stock for stock, _ in self.a_creer]
+            # upsert : un stock du même nom créé entre-temps par une autre requête n'est touché ici que
+            # par date_modification, puis repris par le chemin de mise à jour (date_creation différente)
+            Stock.objects.bulk_create(
+                stocks, update_conflicts=True,
+                unique_fields=['nom', 'entreprise'], update_fields=['date_modification'],
+            )
+            creations = dict(Stock.objects.filter(id__in=[stock.id for stock in stocks]).values_list('id', 'date_creation'))
+            crees = []
+            for stock, renseignees in self.a_creer:
+                if creations.get(stock.id) == stock.date_creation:
+                    crees.append(stock)
+                else:
+                    self.a_mettre_a_jour.append((stock.id, {nom: getattr(stock, nom) for nom in renseignees}))
+            enregistrer_mouvements(nouveau_mouvement(stock, stock.quantite, self.employe) for stock in crees)
+            self.crees += len(crees)
+        if self.a_mettre_a_jour:
+            self._mettre_a_jour()
+        self.a_creer, self.a_mettre_a_jour = [], []
+
+    def _mettre_a_jour(self):
+        quantites = dict(
+            Stock.objects.select_for_update()
+            .filter(id__in=[identifiant for identifiant, _ in self.a_mettre_a_jour])
+            .values_list('id', 'quantite')
+        )
+        maintenant = django_timezone.now()
+        # bulk_update par jeu de colonnes : une colonne absente de la ligne n'est jamais écrite
+        groupes, mouvements = defaultdict(list), []
+        for identifiant, valeurs in self.a_mettre_a_jour:
+            if identifiant not in quantites:
+                continue  # supprimé entre-temps
+            stock = Stock(id=identifiant, entreprise=self.entreprise, date_modification=maintenant, **valeurs)
+            if 'quantite' in valeurs:
+                delta = valeurs['quantite'] - quantites[identifiant]
+                mouvements.append(nouveau_mouvement(stock, delta, self.employe, 'ajustement'))
+                stock.quantite = F('quantite') + delta
+            groupes[tuple(valeurs)].append(stock)
+        for colonnes, stocks in groupes.items():
+            Stock.objects.bulk_update(stocks, [*colonnes, 'date_modification'])
+            self.mis_a_jour += len(stocks)
+        enregistrer_mouvements(mouvements)
+
+    def rapport(self, duree):
+        return {
+            'crees': self.crees,
+            'mis_a_jour': self.mis_a_jour,
+            'nombre_erreurs': self.nombre_erreurs,
+            'erreurs': self.erreurs,
+            'duree': round(duree, 3),
+        }
+
+
+def importer_stocks(entreprise, lignes, employe=None, taille_lot=None):
+    """Importe un itérable de lignes (dict colonne -> texte) ; renvoie le rapport d'import."""
+    debut = time.monotonic()
+    with transaction.atomic():
+        import_stocks = ImportStocks(entreprise, employe, taille_lot)
+        # numéro de ligne du fichier (ligne 1 = entêtes)
+        for numero, ligne in enumerate(lignes, start=2):
+            if not any((valeur or '').strip() for valeur in ligne.values()):
+                continue
+            import_stocks.ajouter(numero, ligne)
+        import_stocks.ecrire()
+        # recompté à la prochaine lecture plutôt qu'ajusté ligne à ligne
+        invalider_compteur(entreprise.id)
+    return import_stocks.rapport(time.monotonic() - debut)
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('employe', '0001_initial'),
+        ('entreprise', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Stock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nom', models.CharField(max_length=200)),
+                ('description', models.TextField(default='')),
+                ('quantite', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('stock_min', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('unite', models.CharField(choices=[('kg', 'Kilogramme'), ('g', 'Gramme'), ('unite', 'Unité'), ('L', 'Litre'), ('ml', 'Millilitre'), ('m', 'Mètre'), ('boite', 'Boîte'), ('kp', 'kapoaka'), ('md', 'madikao'), ('sac', 'Sac'), ('bt-1', 'bouteil 1 litre'), ('bt-1.5', 'bouteil 1,5 litre'), ('bt-2', 'bouteil 2 litre')], default='kg', max_length=10)),
+                ('fournisseur', models.CharField(max_length=200)),
+                ('date_creation', models.DateTimeField(auto_now_add=True)),
+                ('date_modification', models.DateTimeField(auto_now=True)),
+                ('cree_par', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stocks_crees', to='employe.employe')),
+                ('entreprise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stocks', to='entreprise.entreprise')),
+            ],
+            options={
+                'db_table': 'stock',
+                'unique_together': {('nom', 'entreprise')},
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:55
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employe', '0003_pagination_indexes'),
+        ('entreprise', '0002_purge_expiration_indexes'),
+        ('stock', '0002_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MouvementStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type_mouvement', models.CharField(choices=[('entree', 'Entrée'), ('sortie', 'Sortie'), ('ajustement', 'Ajustement')], max_length=20)),
+                ('quantite', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('quantite_apres', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('date_mouvement', models.DateTimeField(default=django.utils.timezone.now)),
+                ('effectue_par', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='mouvements_stock', to='employe.employe')),
+                ('entreprise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mouvements_stock', to='entreprise.entreprise')),
+                ('stock', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mouvements', to='stock.stock')),
+            ],
+            options={
+                'db_table': 'stock_mouvement',
+                'indexes': [models.Index(fields=['stock', 'date_mouvement'], name='mouvement_stock_date_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockAgregat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('periode', models.CharField(choices=[('jour', 'Jour'), ('semaine', 'Semaine')], max_length=10)),
+                ('debut_periode', models.DateField()),
+                ('entrees', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('sorties', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('nombre_mouvements', models.PositiveIntegerField(default=0)),
+                ('stock', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='agregats', to='stock.stock')),
+            ],
+            options={
+                'db_table': 'stock_agregat',
+                'unique_together': {('stock', 'periode', 'debut_periode')},
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employe', '0003_pagination_indexes'),
+        ('entreprise', '0002_purge_expiration_indexes'),
+        ('stock', '0003_mouvements_stock'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='stock',
+            index=models.Index(condition=models.Q(('quantite__lte', models.F('stock_min'))), fields=['entreprise', 'id'], name='stock_rupture_idx'),
+        ),
+    ]
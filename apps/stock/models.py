@@ -1,4 +1,6 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from apps.stock.alertes import EN_RUPTURE, noter_changement
 from django.utils import timezone
 from apps.entreprise.models import Entreprise
 from apps.employe.models import Employe
@@ -38,8 +40,79 @@ class Stock(models.Model):
     @property
     def est_en_rupture(self):
         return self.quantite <= self.stock_min
+
+    def ajuster_quantite(self, delta):
+        """
+        Applique `delta` en un seul UPDATE conditionnel (quantite + delta >= 0) : pas de
+        lecture-modification-écriture, donc pas de mise à jour perdue entre écritures concurrentes.
+        Renvoie False si la quantité deviendrait négative ; sinon relit, dans la même transaction
+        et sous le verrou posé par l'UPDATE, la quantité écrite par cet appel.
+        """
+        lignes = Stock.objects.filter(pk=self.pk)
+        if delta < 0:
+            lignes = lignes.filter(quantite__gte=-delta)
+        with transaction.atomic():
+            if not lignes.update(quantite=F('quantite') + delta, date_modification=timezone.now()):
+                return False
+            self.quantite, self.stock_min, self.date_modification = (
+                Stock.objects.select_for_update().filter(pk=self.pk)
+                .values_list('quantite', 'stock_min', 'date_modification').get()
+            )
+            noter_changement(self.entreprise_id, self.quantite - delta <= self.stock_min, self.est_en_rupture)
+        return True
     
     class Meta:
         db_table = 'stock'
         unique_together = ['nom', 'entreprise']
+        indexes = [
+            models.Index(fields=['entreprise', '-date_creation', '-id'], name='stock_ent_creation_idx'),
+            models.Index(fields=['entreprise', 'id'], condition=EN_RUPTURE, name='stock_rupture_idx'),
+        ]
+
+
+
+TYPE_MOUVEMENT_CHOICES = [
+    ('entree', 'Entrée'),
+    ('sortie', 'Sortie'),
+    ('ajustement', 'Ajustement'),
+]
+
+PERIODE_CHOICES = [
+    ('jour', 'Jour'),
+    ('semaine', 'Semaine'),
+]
+
+
+class MouvementStock(models.Model):
+    stock = models.ForeignKey(Stock, on_delete=models.CASCADE, related_name='mouvements')
+    entreprise = models.ForeignKey(Entreprise, on_delete=models.CASCADE, related_name='mouvements_stock')
+    type_mouvement = models.CharField(max_length=20, choices=TYPE_MOUVEMENT_CHOICES)
+    quantite = models.DecimalField(max_digits=12, decimal_places=2)  # signée : +50 entrée, -25 sortie
+    quantite_apres = models.DecimalField(max_digits=12, decimal_places=2)
+    effectue_par = models.ForeignKey(Employe, on_delete=models.SET_NULL, null=True, blank=True, related_name='mouvements_stock')  # null = l'entreprise
+    date_mouvement = models.DateTimeField(default=timezone.now)
 
+    def __str__(self):
+        return f"{self.type_mouvement} {self.quantite} ({self.stock_id})"
+
+    class Meta:
+        db_table = 'stock_mouvement'
+        indexes = [
+            models.Index(fields=['stock', 'date_mouvement'], name='mouvement_stock_date_idx'),
+        ]
+
+
+class StockAgregat(models.Model):
+    stock = models.ForeignKey(Stock, on_delete=models.CASCADE, related_name='agregats')
+    periode = models.CharField(max_length=10, choices=PERIODE_CHOICES)
+    debut_periode = models.DateField()
+    entrees = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    sorties = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    nombre_mouvements = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.stock_id} {self.periode} {self.debut_periode}"
+
+    class Meta:
+        db_table = 'stock_agregat'
+        unique_together = ['stock', 'periode', 'debut_periode']
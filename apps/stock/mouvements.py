@@ -0,0 +1,206 @@
+import atexit
+import logging
+import threading
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone as django_timezone
+
+from apps.stock.models import MouvementStock, Stock, StockAgregat
+
+LOGGER = logging.getLogger(__name__)
+
+
+def debut_periode(jour, periode):
+    if periode == 'semaine':
+        return jour - timedelta(days=jour.weekday())
+    return jour
+
+
+class _Journal:
+    """
+    Mode optionnel (MOUVEMENTS_INTERVALLE > 0) : tampon en mémoire des mouvements validés, écrit par
+    lots par un thread de fond ; la requête de mise à jour ne paie qu'un ajout en liste. Les mouvements
+    non encore écrits sont perdus si le processus est tué brutalement (SIGKILL, OOM) : le journal peut
+    alors manquer des lignes que la quantité du stock reflète déjà.
+    """
+
+    def __init__(self):
+        self._tampon = []
+        self._verrou = threading.Lock()
+        self._verrou_ecriture = threading.Lock()
+        self._evenement = threading.Event()
+        self._thread = None
+
+    def ajouter(self, mouvements):
+        with self._verrou:
+            self._tampon.extend(mouvements)
+            plein = len(self._tampon) >= settings.MOUVEMENTS_TAILLE_LOT
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._boucle, name='journal-stock', daemon=True)
+                self._thread.start()
+        if plein:
+            self._evenement.set()
+
+    def _boucle(self):
+        while True:
+            self._evenement.wait(timeout=settings.MOUVEMENTS_INTERVALLE)
+            self._evenement.clear()
+            close_old_connections()
+            try:
+                self.vider()
+            except Exception as e:
+                LOGGER.error(f"Écriture du journal des stocks en échec: {e}")
+            finally:
+                close_old_connections()
+
+    def vider(self):
+        with self._verrou:
+            mouvements, self._tampon = self._tampon, []
+        for debut in range(0, len(mouvements), settings.MOUVEMENTS_TAILLE_LOT):
+            self.ecrire(mouvements[debut:debut + settings.MOUVEMENTS_TAILLE_LOT])
+        return len(mouvements)
+
+    def ecrire(self, mouvements):
+        if not mouvements:
+            return
+        with self._verrou_ecriture:
+            # un stock supprimé entre-temps ne doit pas faire échouer tout le lot
+            existants = set(Stock.objects.filter(id__in={m.stock_id for m in mouvements}).values_list('id', flat=True))
+            mouvements = [m for m in mouvements if m.stock_id in existants]
+
+            ecrire_mouvements(mouvements)
+
+    def en_attente(self, stock_id):
+        """Mouvements d'un stock encore en tampon dans ce processus (lus sans forcer l'écriture)."""
+        with self._verrou:
+            return [mouvement for mouvement in self._tampon if mouvement.stock_id == stock_id]
+
+
+def ecrire_mouvements(mouvements):
+    """Un bulk_create des mouvements et le cumul de leurs agrégats, dans la transaction en cours."""
+    if not mouvements:
+        return
+    with transaction.atomic():
+        MouvementStock.objects.bulk_create(mouvements)
+        _cumuler_agregats(cumuler(mouvements))
+
+
+def cumuler(mouvements):
+    """(stock_id, periode, debut_periode) -> [entrées, sorties, nombre de mouvements]."""
+    cumuls = defaultdict(lambda: [Decimal(0), Decimal(0), 0])
+    for mouvement in mouvements:
+        jour = django_timezone.localdate(mouvement.date_mouvement)
+        for periode in ('jour', 'semaine'):
+            cumul = cumuls[(mouvement.stock_id, periode, debut_periode(jour, periode))]
+            if mouvement.quantite >= 0:
+                cumul[0] += mouvement.quantite
+            else:
+                cumul[1] -= mouvement.quantite
+            cumul[2] += 1
+    return cumuls
+
+
+def _cumuler_agregats(cumuls):
+    """Incrémente les agrégats du lot : un SELECT, un bulk_update (F + delta) et un bulk_create."""
+    existants = {
+        (agregat.stock_id, agregat.periode, agregat.debut_periode): agregat
+        for agregat in StockAgregat.objects.filter(
+            stock_id__in={cle[0] for cle in cumuls},
+            debut_periode__in={cle[2] for cle in cumuls},
+        ).only('id', 'stock_id', 'periode', 'debut_periode')
+    }
+    a_mettre_a_jour, a_creer = [], []
+    for cle, (entrees, sorties, nombre) in cumuls.items():
+        agregat = existants.get(cle)
+        if agregat is None:
+            a_creer.append(StockAgregat(
+                stock_id=cle[0], periode=cle[1], debut_periode=cle[2],
+                entrees=entrees, sorties=sorties, nombre_mouvements=nombre,
+            ))
+            continue
+        agregat.entrees = F('entrees') + entrees
+        agregat.sorties = F('sorties') + sorties
+        agregat.nombre_mouvements = F('nombre_mouvements') + nombre
+        a_mettre_a_jour.append(agregat)
+
+    StockAgregat.objects.bulk_update(a_mettre_a_jour, ['entrees', 'sorties', 'nombre_mouvements'])
+    try:
+        with transaction.atomic():
+            StockAgregat.objects.bulk_create(a_creer)
+    except IntegrityError:
+        # un autre processus a créé certains agrégats entre-temps : reprise ligne à ligne
+        for agregat in a_creer:
+            _cumuler_agregat(agregat.stock_id, agregat.periode, agregat.debut_periode,
+                             agregat.entrees, agregat.sorties, agregat.nombre_mouvements)
+
+
+def _cumuler_agregat(stock_id, periode, debut, entrees, sorties, nombre):
+    agregats = StockAgregat.objects.filter(stock_id=stock_id, periode=periode, debut_periode=debut)
+    increment = dict(
+        entrees=F('entrees') + entrees,
+        sorties=F('sorties') + sorties,
+        nombre_mouvements=F('nombre_mouvements') + nombre,
+    )
+    if agregats.update(**increment):
+        return
+    try:
+        with transaction.atomic():
+            StockAgregat.objects.create(
+                stock_id=stock_id, periode=periode, debut_periode=debut,
+                entrees=entrees, sorties=sorties, nombre_mouvements=nombre,
+            )
+    except IntegrityError:
+        # créé par un autre processus entre l'UPDATE et l'INSERT
+        agregats.update(**increment)
+
+
+journal = _Journal()
+
+
+@atexit.register
+def _vider_a_la_sortie():
+    try:
+        journal.vider()
+    except Exception as e:
+        LOGGER.error(f"Mouvements de stock non écrits à l'arrêt: {e}")
+
+
+def nouveau_mouvement(stock, quantite, employe=None, type_mouvement=None):
+    if type_mouvement is None:
+        type_mouvement = 'entree' if quantite > 0 else 'sortie'
+    return MouvementStock(
+        stock_id=stock.id,
+        entreprise_id=stock.entreprise_id,
+        type_mouvement=type_mouvement,
+        quantite=quantite,
+        quantite_apres=stock.quantite,
+        effectue_par_id=employe.id if employe else None,
+        date_mouvement=django_timezone.now(),
+    )
+
+
+def enregistrer_mouvements(mouvements):
+    """
+    Journalise des changements de quantité déjà appliqués : par défaut dans la transaction de la mise à
+    jour du stock (un bulk_create), sinon confiés au journal en tampon une fois la transaction validée.
+    """
+    mouvements = [mouvement for mouvement in mouvements if mouvement.quantite]
+    if not mouvements:
+        return
+    if settings.MOUVEMENTS_INTERVALLE <= 0:
+        ecrire_mouvements(mouvements)
+    else:
+        transaction.on_commit(lambda: journal.ajouter(mouvements), robust=True)
+
+
+def enregistrer_mouvement(stock, quantite, employe=None, type_mouvement=None):
+    enregistrer_mouvements([nouveau_mouvement(stock, quantite, employe, type_mouvement)])
+
+
+def mouvements_en_attente(stock_id):
+    return journal.en_attente(stock_id)
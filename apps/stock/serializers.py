@@ -1,10 +1,14 @@
 from rest_framework import serializers
+from django.db import transaction
 from django.utils import timezone
-from apps.stock.models import Stock, UNITE_CHOICES
+from apps.stock.models import Stock, StockAgregat, UNITE_CHOICES
 from apps.entreprise.models import Entreprise
 from apps.employe.models import Employe
+from apps.stock.mouvements import enregistrer_mouvement, enregistrer_mouvements, nouveau_mouvement
+from apps.stock.alertes import noter_changement
+from helpers.serializers import LECTURE_CREE_PAR, ChampsPartielsMixin, LectureRapideMixin
 
-class StockListSerializer(serializers.ModelSerializer):
+class StockListSerializer(LectureRapideMixin, ChampsPartielsMixin, serializers.ModelSerializer):
     cree_par_data = serializers.SerializerMethodField()
     est_en_rupture = serializers.SerializerMethodField()
     
@@ -14,6 +18,11 @@ class StockListSerializer(serializers.ModelSerializer):
             'id', 'nom', 'quantite', 'stock_min', 'unite', 'fournisseur',
             'cree_par_data', 'est_en_rupture', 'date_creation', 'date_modification', 'description'
         ]
+        select_related = ['cree_par']
+        lecture_rapide = {
+            'cree_par_data': LECTURE_CREE_PAR,
+            'est_en_rupture': (['quantite', 'stock_min'], lambda ligne: ligne['quantite'] <= ligne['stock_min']),
+        }
     
     def get_cree_par_data(self, obj):
         if obj.cree_par:
@@ -61,7 +70,10 @@ class StockCreateSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         entreprise = self.context['entreprise']
         validated_data['entreprise'] = entreprise
-        return super().create(validated_data)
+        stock = super().create(validated_data)
+        enregistrer_mouvement(stock, stock.quantite, self.context.get('employe'))
+        noter_changement(stock.entreprise_id, False, stock.est_en_rupture)
+        return stock
 
 class StockUpdateSerializer(serializers.ModelSerializer):
     quantite_delta = serializers.DecimalField(
@@ -77,11 +89,36 @@ class StockUpdateSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         quantite_delta = validated_data.pop('quantite_delta', None)
         
-        if quantite_delta is not None:
-            nouvelle_quantite = instance.quantite + quantite_delta
-            if nouvelle_quantite < 0:
-                raise serializers.ValidationError("Quantité ne peut pas devenir négative.")
-            instance.quantite = nouvelle_quantite
-            validated_data['quantite'] = instance.quantite
+        employe = self.context.get('employe')
         
-        return super().update(instance, validated_data)
+        with transaction.atomic():
+            mouvements = []
+            if validated_data:
+                # quantité et seuil relus sous verrou : l'ajustement journalisé et la bascule de rupture
+                # partent de la valeur en base, pas de celle chargée par la vue
+                instance.quantite, instance.stock_min = (
+                    Stock.objects.select_for_update().filter(pk=instance.pk).values_list('quantite', 'stock_min').get()
+                )
+                ancienne_quantite = instance.quantite
+                etait_en_rupture = instance.est_en_rupture
+                # seules les colonnes envoyées sont écrites : la quantité lue plus tôt n'écrase pas un delta concurrent
+                for attr, value in validated_data.items():
+                    setattr(instance, attr, value)
+                instance.save(update_fields=[*validated_data, 'date_modification'])
+                noter_changement(instance.entreprise_id, etait_en_rupture, instance.est_en_rupture)
+                if 'quantite' in validated_data:
+                    mouvements.append(nouveau_mouvement(instance, instance.quantite - ancienne_quantite, employe, 'ajustement'))
+            
+            if quantite_delta is not None:
+                if not instance.ajuster_quantite(quantite_delta):
+                    raise serializers.ValidationError("Quantité ne peut pas devenir négative.")
+                mouvements.append(nouveau_mouvement(instance, quantite_delta, employe))
+            enregistrer_mouvements(mouvements)
+        
+        return instance
+
+
+class StockAgregatSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = StockAgregat
+        fields = ['debut_periode', 'entrees', 'sorties', 'nombre_mouvements']
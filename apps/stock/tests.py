@@ -1,3 +1,560 @@
-from django.test import TestCase
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+import csv
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock, skipIf
+from concurrent.futures import ThreadPoolExecutor
+from rest_framework import serializers
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.entreprise.models import Entreprise, Devise
+from apps.stock import alertes
+from apps.stock.imports import ImportStocks, importer_stocks, lignes_csv
+from apps.stock.models import MouvementStock, Stock, StockAgregat
+from apps.stock.mouvements import journal, nouveau_mouvement
+from apps.employe.models import Employe
+from apps.stock.serializers import StockListSerializer, StockUpdateSerializer
+from helpers import exports
+from helpers.pagination import PaginationInvalide, decoder_curseur, encoder_curseur
+from helpers.generateur import GenerateurTenant
+from helpers.renderers import JSONRapideRenderer
 
 # Create your tests here.
+
+@override_settings(MOUVEMENTS_INTERVALLE=0)
+class QuantiteDeltaConcurrenceTests(TransactionTestCase):
+    ECRIVAINS = 8
+    DELTAS_PAR_ECRIVAIN = 25
+
+    def setUp(self):
+        Devise.objects.get_or_create(id=125, defaults={'nom_court': 'MGA', 'nom_long': 'Ariary', 'pays': 'MG'})
+        entreprise = Entreprise.objects.create(nom_complet='E', email='e@exemple.com', mot_de_passe='x', numero_telephone='1')
+        self.stock = Stock.objects.create(nom='Riz', fournisseur='F', entreprise=entreprise, quantite=Decimal('100'))
+
+    def appliquer(self, delta):
+        try:
+            stock = Stock.objects.get(pk=self.stock.pk)
+            serializer = StockUpdateSerializer(stock, data={'quantite_delta': str(delta)}, partial=True)
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+            return True
+        except serializers.ValidationError:
+            return False
+        finally:
+            connection.close()
+
+    def executer(self, deltas):
+        with ThreadPoolExecutor(max_workers=self.ECRIVAINS) as executor:
+            return list(executor.map(self.appliquer, deltas))
+
+    def test_aucune_mise_a_jour_perdue(self):
+        deltas = [Decimal('1.5'), Decimal('-1')] * (self.ECRIVAINS * self.DELTAS_PAR_ECRIVAIN // 2)
+
+        resultats = self.executer(deltas)
+
+        self.assertTrue(all(resultats))
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.quantite, Decimal('100') + sum(deltas))
+        self.assertEqual(self.stock.mouvements.count(), len(deltas))
+
+    def test_quantite_jamais_negative(self):
+        resultats = self.executer([Decimal('-3')] * 50)
+
+        self.assertEqual(resultats.count(True), 33)
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.quantite, Decimal('1'))
+
+    def test_champs_envoyes_sans_ecraser_la_quantite(self):
+        perime = Stock.objects.get(pk=self.stock.pk)
+        Stock.objects.get(pk=self.stock.pk).ajuster_quantite(Decimal('5'))
+
+        serializer = StockUpdateSerializer(perime, data={'fournisseur': 'G'}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.quantite, Decimal('105'))
+        self.assertEqual(self.stock.fournisseur, 'G')
+
+    def test_ajustement_calcule_sur_la_quantite_en_base(self):
+        perime = Stock.objects.get(pk=self.stock.pk)
+        Stock.objects.get(pk=self.stock.pk).ajuster_quantite(Decimal('5'))
+
+        serializer = StockUpdateSerializer(perime, data={'quantite': '110', 'quantite_delta': '-4'}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        self.assertEqual(perime.quantite, Decimal('106'))
+        self.assertEqual(
+            list(self.stock.mouvements.order_by('id').values_list('type_mouvement', 'quantite', 'quantite_apres')),
+            [('ajustement', Decimal('5'), Decimal('110')), ('sortie', Decimal('-4'), Decimal('106'))],
+        )
+
+
+class LectureRapideStocksTests(TestCase):
+    def test_sortie_identique_au_serializer(self):
+        generateur = GenerateurTenant(graine=2)
+        entreprise = generateur.entreprise('e@exemple.com', 'E')
+        generateur.stocks(entreprise, 40)
+        employe = Employe.objects.create(entreprise=entreprise, nom_complet='Rabe', email='rabe@exemple.com', renumeration_devise=generateur.devise)
+        Stock.objects.filter(nom__in=['Article 0000001', 'Article 0000002']).update(cree_par=employe, description='« Ligne »')
+        stocks = Stock.objects.filter(entreprise=entreprise).order_by('id')
+
+        attendu = JSONRapideRenderer().render(StockListSerializer(stocks.select_related('cree_par'), many=True).data)
+        with self.assertNumQueries(1):
+            rendu = JSONRapideRenderer().render(StockListSerializer.representer(StockListSerializer.lignes(stocks)))
+        self.assertEqual(rendu, attendu)
+        self.assertIn(b'"nom_complet":"Rabe"', rendu)
+        self.assertIn(b'"est_en_rupture":true', rendu)
+
+
+class ChampsPartielsStocksTests(TestCase):
+    def setUp(self):
+        generateur = GenerateurTenant(graine=3)
+        self.entreprise = generateur.entreprise('e@exemple.com', 'E')
+        generateur.stocks(self.entreprise, 5)
+        token = AccessToken()
+        token['entreprise_id'] = self.entreprise.id
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def lire(self, url, **parametres):
+        with CaptureQueriesContext(connection) as requetes:
+            reponse = self.client.get(url, parametres)
+        sql = [requete['sql'] for requete in requetes if 'FROM "stock"' in requete['sql']]
+        return reponse, sql
+
+    def test_liste(self):
+        reponse, sql = self.lire('/api/stockes/stocks/', fields='id,nom,quantite,est_en_rupture', limit=2)
+        self.assertEqual(reponse.status_code, 200)
+        donnees = reponse.json()['donnees']
+        self.assertEqual([list(stock) for stock in donnees], [['id', 'nom', 'quantite', 'est_en_rupture']] * 2)
+        self.assertIsNotNone(reponse.json()['pagination']['next'])
+        self.assertNotIn('description', sql[0])
+        self.assertNotIn('JOIN', sql[0])
+
+        suite = self.client.get('/api/stockes/stocks/', {'fields': 'nom', 'cursor': reponse.json()['pagination']['next']})
+        self.assertEqual(len(suite.json()['donnees']), 3)
+
+    def test_detail(self):
+        stock = Stock.objects.filter(entreprise=self.entreprise).first()
+        complet = self.client.get(f'/api/stockes/stocks/{stock.id}/details/').json()['donnees']
+        reponse, sql = self.lire(f'/api/stockes/stocks/{stock.id}/details/', fields='nom,est_en_rupture,cree_par_data')
+        self.assertEqual(reponse.json()['donnees'], {
+            'nom': complet['nom'], 'cree_par_data': None, 'est_en_rupture': complet['est_en_rupture']
+        })
+        self.assertEqual(len(sql), 1)
+        self.assertNotIn('description', sql[0])
+
+    def test_champ_inconnu(self):
+        for url in ('/api/stockes/stocks/', f'/api/stockes/stocks/{Stock.objects.first().id}/details/'):
+            reponse = self.client.get(url, {'fields': 'nom,entreprise'})
+            self.assertEqual(reponse.status_code, 400)
+            self.assertIn('entreprise', reponse.json()['message'])
+        self.assertEqual(self.client.get('/api/stockes/stocks/', {'fields': ','}).status_code, 400)
+
+
+@override_settings(MOUVEMENTS_INTERVALLE=0)
+class ImportStocksTests(TestCase):
+    def setUp(self):
+        Devise.objects.get_or_create(id=125, defaults={'nom_court': 'MGA', 'nom_long': 'Ariary', 'pays': 'MG'})
+        self.entreprise = Entreprise.objects.create(nom_complet='E', email='e@exemple.com', mot_de_passe='x', numero_telephone='1')
+        self.riz = Stock.objects.create(
+            nom='Riz', fournisseur='F', entreprise=self.entreprise, quantite=Decimal('10'),
+            stock_min=Decimal('2'), unite='sac', description='Riz blanc',
+        )
+
+    def importer(self, contenu):
+        with self.captureOnCommitCallbacks(execute=True):
+            return importer_stocks(self.entreprise, lignes_csv(BytesIO(contenu.encode())))
+
+    def mouvements(self, stock):
+        return list(MouvementStock.objects.filter(stock=stock).order_by('id').values_list('type_mouvement', 'quantite', 'quantite_apres'))
+
+    def test_colonnes_partielles(self):
+        rapport = self.importer("nom,fournisseur\nriz,Grossiste\nSucre,Usine\n")
+        self.assertEqual((rapport['crees'], rapport['mis_a_jour'], rapport['nombre_erreurs']), (1, 1, 0))
+        self.riz.refresh_from_db()
+        self.assertEqual(
+            (self.riz.nom, self.riz.fournisseur, self.riz.quantite, self.riz.stock_min, self.riz.unite, self.riz.description),
+            ('Riz', 'Grossiste', Decimal('10'), Decimal('2'), 'sac', 'Riz blanc'),
+        )
+        self.assertEqual(self.mouvements(self.riz), [])
+        sucre = Stock.objects.get(nom='Sucre')
+        self.assertEqual((sucre.quantite, sucre.unite), (Decimal('0'), 'kg'))
+
+    def test_quantite_en_delta(self):
+        import_stocks = ImportStocks(self.entreprise)
+        import_stocks.ajouter(2, {'nom': 'Riz', 'quantite': '25', 'unite': ''})
+        # mouvement concurrent entre le préchargement et l'écriture
+        Stock.objects.get(pk=self.riz.pk).ajuster_quantite(Decimal('5'))
+        with self.captureOnCommitCallbacks(execute=True):
+            import_stocks.ecrire()
+        self.riz.refresh_from_db()
+        self.assertEqual((self.riz.quantite, self.riz.unite), (Decimal('25'), 'sac'))
+        self.assertEqual(self.mouvements(self.riz), [('ajustement', Decimal('10'), Decimal('25'))])
+
+    def test_upsert_sur_stock_cree_entre_temps(self):
+        import_stocks = ImportStocks(self.entreprise)
+        import_stocks.ajouter(2, {'nom': 'Sel', 'quantite': '8', 'fournisseur': 'Salin'})
+        sel = Stock.objects.create(nom='Sel', fournisseur='F', entreprise=self.entreprise, quantite=Decimal('3'), description='Gros sel')
+        with self.captureOnCommitCallbacks(execute=True):
+            import_stocks.ecrire()
+        self.assertEqual((import_stocks.crees, import_stocks.mis_a_jour), (0, 1))
+        sel.refresh_from_db()
+        self.assertEqual((sel.quantite, sel.fournisseur, sel.description), (Decimal('8'), 'Salin', 'Gros sel'))
+        self.assertEqual(self.mouvements(sel), [('ajustement', Decimal('5'), Decimal('8'))])
+
+    def test_creation_journalisee(self):
+        self.importer("nom;quantite;fournisseur\nHuile;12.5;F\n")
+        self.assertEqual(self.mouvements(Stock.objects.get(nom='Huile')), [('entree', Decimal('12.5'), Decimal('12.5'))])
+
+    def test_erreurs_de_ligne(self):
+        rapport = self.importer(
+            "nom,quantite,fournisseur\n"
+            "Riz,-1,\n"        # existant : quantité invalide
+            "Farine,3,\n"      # nouveau : fournisseur requis
+            "Farine,3,F\n"
+            "farine,4,F\n"     # doublon dans le fichier
+            "Riz,,\n"          # existant sans colonne renseignée : accepté
+        )
+        self.assertEqual((rapport['crees'], rapport['mis_a_jour'], rapport['nombre_erreurs']), (1, 1, 3))
+        self.assertEqual([(erreur['ligne'], list(erreur['erreurs'])) for erreur in rapport['erreurs']],
+                         [(2, ['quantite']), (3, ['fournisseur']), (5, ['nom'])])
+        self.riz.refresh_from_db()
+        self.assertEqual(self.riz.quantite, Decimal('10'))
+
+
+class HistoriqueStockTests(TestCase):
+    def setUp(self):
+        Devise.objects.get_or_create(id=125, defaults={'nom_court': 'MGA', 'nom_long': 'Ariary', 'pays': 'MG'})
+        entreprise = Entreprise.objects.create(
+            nom_complet='E', email='e@exemple.com', mot_de_passe='x', numero_telephone='1', est_verifie=True, est_actif=True
+        )
+        self.stock = Stock.objects.create(nom='Riz', fournisseur='F', entreprise=entreprise)
+        token = AccessToken()
+        token['entreprise_id'] = entreprise.id
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def mouvement(self, jour, quantite):
+        mouvement = nouveau_mouvement(self.stock, Decimal(quantite))
+        mouvement.date_mouvement = timezone.make_aware(datetime.combine(jour, time(12)))
+        return mouvement
+
+    def agregats(self, periode):
+        return list(StockAgregat.objects.filter(stock=self.stock, periode=periode).order_by('debut_periode').values_list(
+            'debut_periode', 'entrees', 'sorties', 'nombre_mouvements'
+        ))
+
+    def historique(self, **parametres):
+        return self.client.get(f'/api/stockes/stocks/{self.stock.id}/historique/', parametres)
+
+    def test_agregats_jour_et_semaine(self):
+        # lundi 2 juin, mercredi 4 juin (x2), lundi 9 juin ; puis un second lot sur un agrégat existant
+        journal.ecrire([
+            self.mouvement(date(2025, 6, 2), '10'), self.mouvement(date(2025, 6, 4), '-3'),
+            self.mouvement(date(2025, 6, 4), '2'), self.mouvement(date(2025, 6, 9), '-4'),
+        ])
+        journal.ecrire([self.mouvement(date(2025, 6, 2), '1')])
+        self.assertEqual(self.agregats('jour'), [
+            (date(2025, 6, 2), Decimal('11'), Decimal('0'), 2),
+            (date(2025, 6, 4), Decimal('2'), Decimal('3'), 2),
+            (date(2025, 6, 9), Decimal('0'), Decimal('4'), 1),
+        ])
+        self.assertEqual(self.agregats('semaine'), [
+            (date(2025, 6, 2), Decimal('13'), Decimal('3'), 4),
+            (date(2025, 6, 9), Decimal('0'), Decimal('4'), 1),
+        ])
+
+        donnees = self.historique(periode='semaine', debut='2025-06-04', fin='2025-06-15').json()['donnees']
+        self.assertEqual((donnees['debut'], donnees['fin']), ('2025-06-02', '2025-06-09'))
+        self.assertEqual((donnees['total_entrees'], donnees['total_sorties'], donnees['consommation_moyenne']), ('13.00', '7.00', '3.50'))
+        self.assertEqual([agregat['debut_periode'] for agregat in donnees['agregats']], ['2025-06-02', '2025-06-09'])
+
+    @override_settings(MOUVEMENTS_INTERVALLE=3600)
+    def test_mouvements_en_tampon_sans_ecriture(self):
+        self.addCleanup(journal._tampon.clear)
+        journal.ecrire([self.mouvement(date(2025, 6, 2), '5')])
+        journal.ajouter([self.mouvement(date(2025, 6, 2), '-2'), self.mouvement(date(2025, 6, 3), '4')])
+
+        donnees = self.historique(periode='jour', debut='2025-06-01', fin='2025-06-07').json()['donnees']
+        self.assertEqual(
+            [(a['debut_periode'], a['entrees'], a['sorties'], a['nombre_mouvements']) for a in donnees['agregats']],
+            [('2025-06-02', '5.00', '2.00', 2), ('2025-06-03', '4.00', '0.00', 1)],
+        )
+        # rien n'a été écrit par la lecture
+        self.assertEqual(len(journal._tampon), 2)
+        self.assertEqual(MouvementStock.objects.filter(stock=self.stock).count(), 1)
+
+    def test_parametres_invalides(self):
+        self.assertEqual(self.historique(periode='mois').status_code, 400)
+        self.assertEqual(self.historique(debut='02/06/2025').status_code, 400)
+        self.assertEqual(self.client.get('/api/stockes/stocks/0/historique/').status_code, 404)
+
+    def test_debut_apres_fin(self):
+        for periode in ('jour', 'semaine'):
+            reponse = self.historique(periode=periode, debut='2025-06-20', fin='2025-06-01')
+            self.assertEqual(reponse.status_code, 400)
+            self.assertIs(reponse.json()['success'], False)
+        # même jour ou même semaine : une seule période
+        donnees = self.historique(periode='semaine', debut='2025-06-04', fin='2025-06-04').json()['donnees']
+        self.assertEqual(donnees['consommation_moyenne'], '0.00')
+
+    @override_settings(MOUVEMENTS_INTERVALLE=0)
+    def test_mouvements_ecrits_dans_la_transaction_du_stock(self):
+        serializer = StockUpdateSerializer(self.stock, data={'quantite': '4', 'quantite_delta': '3'}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        # aucun callback on_commit exécuté : les lignes viennent de la transaction de la mise à jour
+        self.assertEqual(
+            list(MouvementStock.objects.filter(stock=self.stock).order_by('id').values_list('type_mouvement', 'quantite', 'quantite_apres')),
+            [('ajustement', Decimal('4'), Decimal('4')), ('entree', Decimal('3'), Decimal('7'))],
+        )
+        self.assertEqual(self.agregats('jour')[0][1:], (Decimal('7'), Decimal('0'), 2))
+
+
+@override_settings(MOUVEMENTS_INTERVALLE=0)
+class AlertesStockTests(TestCase):
+    def setUp(self):
+        Devise.objects.get_or_create(id=125, defaults={'nom_court': 'MGA', 'nom_long': 'Ariary', 'pays': 'MG'})
+        self.entreprise = Entreprise.objects.create(
+            nom_complet='E', email='e@exemple.com', mot_de_passe='x', numero_telephone='1', est_verifie=True, est_actif=True
+        )
+        autre = Entreprise.objects.create(nom_complet='A', email='a@exemple.com', mot_de_passe='x', numero_telephone='2')
+        self.riz = self.stock('Riz', '5', '10')       # manque 5
+        self.sucre = self.stock('Sucre', '10', '10')  # au seuil : en rupture
+        self.sel = self.stock('Sel', '50', '10')
+        Stock.objects.create(nom='Riz', fournisseur='F', entreprise=autre, quantite=Decimal('0'), stock_min=Decimal('10'))
+        alertes._COMPTEURS.delete(self.entreprise.id)
+        self.addCleanup(alertes._COMPTEURS.delete, self.entreprise.id)
+        token = AccessToken()
+        token['entreprise_id'] = self.entreprise.id
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def stock(self, nom, quantite, stock_min):
+        return Stock.objects.create(
+            nom=nom, fournisseur='F', entreprise=self.entreprise, quantite=Decimal(quantite), stock_min=Decimal(stock_min)
+        )
+
+    def noms(self, **parametres):
+        reponse = self.client.get('/api/stockes/stocks/', parametres)
+        self.assertEqual(reponse.status_code, 200)
+        return sorted(stock['nom'] for stock in reponse.json()['donnees'])
+
+    def modifier(self, stock, **donnees):
+        with self.captureOnCommitCallbacks(execute=True):
+            reponse = self.client.patch(f'/api/stockes/stocks/{stock.id}/update/', donnees, format='json')
+        self.assertEqual(reponse.status_code, 200)
+
+    def compteur(self):
+        with self.assertNumQueries(0):
+            return alertes.compter_ruptures(self.entreprise.id)
+
+    def test_filtre_rupture(self):
+        self.assertEqual(self.noms(rupture='true'), ['Riz', 'Sucre'])
+        self.assertEqual(self.noms(rupture='1', q='suc'), ['Sucre'])
+        self.assertEqual(self.noms(rupture='false'), ['Riz', 'Sel', 'Sucre'])
+
+    def test_alertes(self):
+        reponse = self.client.get('/api/stockes/stocks/alertes/')
+        self.assertEqual(reponse.status_code, 200)
+        donnees = reponse.json()['donnees']
+        self.assertEqual(donnees['nombre_en_rupture'], 2)
+        # plus grand manque d'abord
+        self.assertEqual([stock['nom'] for stock in donnees['stocks']], ['Riz', 'Sucre'])
+        self.assertTrue(all(stock['est_en_rupture'] for stock in donnees['stocks']))
+
+        self.assertEqual([stock['nom'] for stock in self.client.get('/api/stockes/stocks/alertes/', {'limit': 1}).json()['donnees']['stocks']], ['Riz'])
+        self.assertEqual(self.client.get('/api/stockes/stocks/alertes/', {'limit': 'x'}).status_code, 400)
+
+    def test_compteur_suit_les_franchissements(self):
+        self.assertEqual(alertes.compter_ruptures(self.entreprise.id), 2)
+
+        # passe sous le seuil, par quantité puis par seuil
+        self.modifier(self.sel, quantite_delta='-45')
+        self.assertEqual(self.compteur(), 3)
+        self.modifier(self.sel, quantite='20', stock_min='25')
+        self.assertEqual(self.compteur(), 3)
+        # repasse au-dessus
+        self.modifier(self.riz, quantite_delta='6')
+        self.assertEqual(self.compteur(), 2)
+        self.modifier(self.sucre, stock_min='9')
+        self.assertEqual(self.compteur(), 1)
+        # sans franchissement : inchangé
+        self.modifier(self.sel, quantite_delta='1')
+        self.assertEqual(self.compteur(), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/api/stockes/stocks/{self.sel.id}/delete/')
+        self.assertEqual(self.compteur(), 0)
+        self.assertEqual(Stock.objects.filter(alertes.EN_RUPTURE, entreprise=self.entreprise).count(), 0)
+
+    def test_changement_annule_sans_effet(self):
+        self.assertEqual(alertes.compter_ruptures(self.entreprise.id), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                alertes.noter_changement(self.entreprise.id, False, True)
+                transaction.set_rollback(True)
+        self.assertEqual(self.compteur(), 2)
+
+    def test_invalider_compteur(self):
+        self.assertEqual(alertes.compter_ruptures(self.entreprise.id), 2)
+        Stock.objects.filter(id=self.sel.id).update(quantite=Decimal('0'))
+        self.assertEqual(self.compteur(), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            alertes.invalider_compteur(self.entreprise.id)
+        self.assertEqual(alertes.compter_ruptures(self.entreprise.id), 3)
+
+
+@override_settings(EXPORT_TAILLE_LOT=2)
+class ExportStocksTests(TestCase):
+    ENTETES = ['nom', 'quantite', 'stock_min', 'unite', 'fournisseur', 'description', 'date_modification']
+
+    def setUp(self):
+        Devise.objects.get_or_create(id=125, defaults={'nom_court': 'MGA', 'nom_long': 'Ariary', 'pays': 'MG'})
+        self.entreprise = Entreprise.objects.create(
+            nom_complet='E', email='e@exemple.com', mot_de_passe='x', numero_telephone='1', est_verifie=True, est_actif=True
+        )
+        autre = Entreprise.objects.create(nom_complet='A', email='a@exemple.com', mot_de_passe='x', numero_telephone='2')
+        for nom, quantite, fournisseur, description in [
+            ('Riz', '5', 'Tiko', 'Riz « blanc »'), ('Sucre', '50', '=SOMME(A1)', ''), ('Sel', '0', '+261 34', 'a;b'),
+        ]:
+            Stock.objects.create(
+                nom=nom, quantite=Decimal(quantite), stock_min=Decimal('10'), fournisseur=fournisseur,
+                description=description, entreprise=self.entreprise,
+            )
+        Stock.objects.create(nom='Autre', fournisseur='F', entreprise=autre)
+        token = AccessToken()
+        token['entreprise_id'] = self.entreprise.id
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def exporter(self, **parametres):
+        return self.client.get('/api/stockes/stocks/export/', parametres)
+
+    def test_csv_en_flux(self):
+        reponse = self.exporter()
+        self.assertEqual(reponse.status_code, 200)
+        self.assertTrue(reponse.streaming)
+        self.assertEqual(reponse['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertRegex(reponse['Content-Disposition'], r'^attachment; filename="stocks_\d{8}\.csv"$')
+
+        contenu = b''.join(reponse.streaming_content).decode('utf-8')
+        self.assertTrue(contenu.startswith('\ufeff'))
+        lignes = list(csv.reader(StringIO(contenu[1:]), delimiter=';'))
+        self.assertEqual(lignes[0], self.ENTETES)
+        # plus récent d'abord, entreprise connectée uniquement
+        self.assertEqual([ligne[:6] for ligne in lignes[1:]], [
+            ['Sel', '0.00', '10.00', 'kg', '+261 34', 'a;b'],
+            ['Sucre', '50.00', '10.00', 'kg', "'=SOMME(A1)", ''],
+            ['Riz', '5.00', '10.00', 'kg', 'Tiko', 'Riz « blanc »'],
+        ])
+        self.assertEqual(lignes[1][6], timezone.localtime(Stock.objects.get(nom='Sel').date_modification).isoformat())
+
+    def test_filtres_de_la_liste(self):
+        contenu = b''.join(self.exporter(rupture='true', q='s').streaming_content).decode('utf-8')
+        self.assertEqual([ligne[0] for ligne in csv.reader(StringIO(contenu[1:]), delimiter=';')][1:], ['Sel'])
+
+    @skipIf(exports.Workbook is None, 'openpyxl non installé')
+    def test_xlsx(self):
+        from openpyxl import load_workbook
+
+        reponse = self.exporter(type='XLSX')
+        self.assertEqual(reponse.status_code, 200)
+        self.assertEqual(reponse['Content-Type'], 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+        self.assertRegex(reponse['Content-Disposition'], r'^attachment; filename="stocks_\d{8}\.xlsx"$')
+
+        feuille = load_workbook(BytesIO(b''.join(reponse.streaming_content))).active
+        lignes = list(feuille.values)
+        self.assertEqual(list(lignes[0]), self.ENTETES)
+        self.assertEqual([ligne[0] for ligne in lignes[1:]], ['Sel', 'Sucre', 'Riz'])
+        self.assertEqual(lignes[2][4], "'=SOMME(A1)")
+        self.assertEqual(lignes[3][1], 5)
+        # datetimes sans fuseau (non gérés par Excel), en heure locale
+        attendue = timezone.make_naive(Stock.objects.get(nom='Riz').date_modification)
+        self.assertIsNone(lignes[3][6].tzinfo)
+        self.assertLess(abs(lignes[3][6] - attendue), timedelta(milliseconds=1))
+
+    def test_format_invalide(self):
+        reponse = self.exporter(type='pdf')
+        self.assertEqual(reponse.status_code, 400)
+        self.assertEqual(reponse.json()['success'], False)
+        self.assertIn('csv, xlsx', reponse.json()['message'])
+
+        with mock.patch('helpers.exports.Workbook', None):
+            reponse = self.exporter(type='xlsx')
+        self.assertEqual(reponse.status_code, 400)
+        self.assertIn('openpyxl', reponse.json()['message'])
+
+
+class PaginationStocksTests(TestCase):
+    def setUp(self):
+        generateur = GenerateurTenant(graine=5)
+        self.entreprise = generateur.entreprise('e@exemple.com', 'E')
+        generateur.stocks(self.entreprise, 8)
+        autre = generateur.entreprise('a@exemple.com', 'A')
+        generateur.stocks(autre, 3)
+        self.attendus = list(
+            Stock.objects.filter(entreprise=self.entreprise).order_by('-date_creation', '-id').values_list('id', flat=True)
+        )
+        token = AccessToken()
+        token['entreprise_id'] = self.entreprise.id
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def page(self, **parametres):
+        reponse = self.client.get('/api/stockes/stocks/', {'fields': 'id', **parametres})
+        self.assertEqual(reponse.status_code, 200, reponse.content)
+        return [stock['id'] for stock in reponse.json()['donnees']], reponse.json()['pagination']
+
+    def parcourir(self, limite):
+        ids, pagination = self.page(limit=limite)
+        while pagination['next'] is not None:
+            self.assertNotIn('offset', pagination)
+            suite, pagination = self.page(limit=limite, cursor=pagination['next'])
+            ids += suite
+        return ids
+
+    def test_curseur(self):
+        date_creation = timezone.now()
+        curseur = encoder_curseur(date_creation, 42)
+        self.assertNotIn('=', curseur)
+        self.assertEqual(decoder_curseur(curseur), (date_creation, 42))
+
+        self.assertEqual(self.parcourir(3), self.attendus)
+        # date_creation identiques : départage par id, sans doublon ni trou
+        Stock.objects.filter(entreprise=self.entreprise).update(date_creation=date_creation)
+        self.assertEqual(self.parcourir(3), sorted(self.attendus, reverse=True))
+
+    def test_curseur_invalide(self):
+        for curseur in ('xxx', encoder_curseur(timezone.now(), 1)[:-3], 'WzFd', 'WyJoaWVyIiwgMV0'):
+            with self.assertRaises(PaginationInvalide):
+                decoder_curseur(curseur)
+            reponse = self.client.get('/api/stockes/stocks/', {'cursor': curseur})
+            self.assertEqual(reponse.status_code, 400, curseur)
+            self.assertEqual(reponse.json()['message'], "Curseur de pagination invalide.")
+
+    def test_mode_offset(self):
+        ids, pagination = self.page(limit=3, offset=0)
+        self.assertEqual((ids, pagination), (self.attendus[:3], {'limit': 3, 'next': 3, 'offset': 0}))
+        ids, pagination = self.page(limit=3, offset=pagination['next'])
+        self.assertEqual((ids, pagination), (self.attendus[3:6], {'limit': 3, 'next': 6, 'offset': 3}))
+        ids, pagination = self.page(limit=3, offset=6)
+        self.assertEqual((ids, pagination), (self.attendus[6:], {'limit': 3, 'next': None, 'offset': 6}))
+
+        # cursor prioritaire sur offset
+        ids, pagination = self.page(limit=3, offset=0, cursor=self.page(limit=3)[1]['next'])
+        self.assertEqual(ids, self.attendus[3:6])
+        self.assertNotIn('offset', pagination)
+        self.assertIsInstance(pagination['next'], str)
+
+        for parametres in ({'offset': -1}, {'offset': 'x'}, {'limit': 0}):
+            self.assertEqual(self.client.get('/api/stockes/stocks/', parametres).status_code, 400, parametres)
@@ -3,8 +3,12 @@ from apps.stock import views
 
 urlpatterns = [
     path('stocks/', views.StockListView.as_view(), name='stock-list'),
+    path('stocks/alertes/', views.StockAlerteView.as_view(), name='stock-alertes'),
     path('stocks/create/', views.StockCreateView.as_view(), name='stock-create'),
+    path('stocks/export/', views.StockExportView.as_view(), name='stock-export'),
+    path('stocks/import/', views.StockImportView.as_view(), name='stock-import'),
     path('stocks/<int:stock_id>/details/', views.StockDetailView.as_view(), name='stock-detail'),
     path('stocks/<int:stock_id>/update/', views.StockUpdateView.as_view(), name='stock-update'),
     path('stocks/<int:stock_id>/delete/', views.StockDeleteView.as_view(), name='stock-delete'),
+    path('stocks/<int:stock_id>/historique/', views.StockHistoriqueView.as_view(), name='stock-historique'),
 ]
\ No newline at end of file
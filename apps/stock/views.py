@@ -4,12 +4,24 @@ from rest_framework.response import Response
 from rest_framework.parsers import FormParser, MultiPartParser
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-import traceback
-from .models import Stock
+from datetime import date, timedelta
+from decimal import Decimal
+from django.utils import timezone
+from .models import Stock, StockAgregat, PERIODE_CHOICES
+from .mouvements import cumuler, debut_periode, mouvements_en_attente
+from .imports import importer_stocks, lire_fichier, ImportInvalide, COLONNES
+from .alertes import EN_RUPTURE, compter_ruptures, noter_changement
+from django.conf import settings
+from django.db.models import F
 from .serializers import (
-    StockListSerializer, StockCreateSerializer, StockUpdateSerializer
+    StockListSerializer, StockCreateSerializer, StockUpdateSerializer, StockAgregatSerializer
 )
-from helpers.permissions import IsAuthenticatedEntrepriseOrEmploye
+from helpers.permissions import IsAuthenticatedEntrepriseOrEmploye, AccesRessource
+from helpers.pagination import paginer, PaginationInvalide, PARAMETRES_PAGINATION, SCHEMA_PAGINATION
+from helpers.champs import champs_demandes, ChampsInvalides, PARAMETRE_CHAMPS
+from helpers.exports import reponse_export, ExportInvalide, PARAMETRE_FORMAT_EXPORT
+from helpers.middleware import chronometre_serializer
+from helpers.reponses import erreur, erreur_serveur
 
 # Schema JSON standard UNIQUEMENT avec objets simples
 RESPONSE_JSON = openapi.Schema(
@@ -26,6 +38,7 @@ RESPONSE_JSON_LIST = openapi.Schema(
     properties={
         'message': openapi.Schema(type=openapi.TYPE_STRING),
         'success': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+        'pagination': SCHEMA_PAGINATION,
         'donnees': openapi.Schema(
             type=openapi.TYPE_ARRAY,
             items=openapi.Schema(
@@ -70,16 +83,38 @@ RESPONSE_JSON_DETAIL = openapi.Schema(
     }
 )
 
+PARAMETRES_FILTRE_STOCKS = [
+    openapi.Parameter('q', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False, description="Recherche par nom"),
+    openapi.Parameter('rupture', openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN, required=False, description="Uniquement les stocks en rupture (quantite <= stock_min)"),
+]
+
+
+def filtrer_stocks(request):
+    """Stocks de l'entreprise connectée filtrés par q et rupture (liste et export)."""
+    qs = Stock.objects.filter(entreprise=request.principal.entreprise)
+    q = request.GET.get('q', '')
+    if q:
+        qs = qs.filter(nom__icontains=q)
+    if request.GET.get('rupture') in ('1', 'true'):
+        qs = qs.filter(EN_RUPTURE)
+    return qs
+
+
 class StockListView(APIView):
-    permission_classes = [IsAuthenticatedEntrepriseOrEmploye]
+    permission_classes = [IsAuthenticatedEntrepriseOrEmploye, AccesRessource]
+    ressource_acces = 'stocks'
+    authentication_classes = []
     
     @swagger_auto_schema(
         tags=['Stock'],
         manual_parameters=[
-            openapi.Parameter('q', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False, description="Recherche par nom")
+            *PARAMETRES_FILTRE_STOCKS,
+            *PARAMETRES_PAGINATION,
+            PARAMETRE_CHAMPS
         ],
         responses={
             200: openapi.Response('Liste stocks', RESPONSE_JSON_LIST),
+            400: openapi.Response('Pagination ou champs invalides', RESPONSE_JSON),
             401: openapi.Response('Non authentifié', RESPONSE_JSON),
             403: openapi.Response('Non autorisé', RESPONSE_JSON),
             500: openapi.Response('Erreur serveur', RESPONSE_JSON)
@@ -88,33 +123,110 @@ class StockListView(APIView):
     )
     def get(self, request):
         try:
-            q = request.GET.get('q', '')
-            
-            if hasattr(request, 'entreprise'):
-                qs = Stock.objects.filter(entreprise=request.entreprise)
-            else:  # employé
-                qs = Stock.objects.filter(entreprise=request.employe.entreprise)
-            
-            if q:
-                qs = qs.filter(nom__icontains=q)
-            
-            qs = qs.select_related('cree_par', 'entreprise').order_by('-date_creation')
-            serializer = StockListSerializer(qs, many=True)
+            champs = champs_demandes(request, StockListSerializer)
+            # lecture seule : lignes .values() sans instancier de Stock
+            stocks, pagination = paginer(request, StockListSerializer.lignes(filtrer_stocks(request), champs))
+            with chronometre_serializer():
+                donnees = StockListSerializer.representer(stocks, champs)
             return Response({
                 "message": "Stocks récupérés avec succès.",
                 "success": True,
-                "donnees": serializer.data
+                "donnees": donnees,
+                "pagination": pagination
             }, status=status.HTTP_200_OK)
             
+        except (PaginationInvalide, ChampsInvalides) as e:
+            return Response({
+                "message": str(e),
+                "success": False,
+                "donnees": {}
+            }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
+            return erreur_serveur(e)
+
+class StockExportView(APIView):
+    permission_classes = [IsAuthenticatedEntrepriseOrEmploye, AccesRessource]
+    ressource_acces = 'stocks'
+    authentication_classes = []
+    
+    @swagger_auto_schema(
+        tags=['Stock'],
+        manual_parameters=[*PARAMETRES_FILTRE_STOCKS, PARAMETRE_FORMAT_EXPORT],
+        responses={
+            200: openapi.Response('Fichier CSV ou XLSX (colonnes réimportables via stocks/import/)'),
+            400: openapi.Response('Format invalide', RESPONSE_JSON),
+            500: openapi.Response('Erreur serveur', RESPONSE_JSON)
+        },
+        operation_description="Exporter les stocks de l'entreprise (mêmes filtres que la liste), envoyés ligne à ligne."
+    )
+    def get(self, request):
+        try:
+            lignes = filtrer_stocks(request).order_by('-date_creation', '-id').values_list(
+                *COLONNES, 'date_modification'
+            ).iterator(chunk_size=settings.EXPORT_TAILLE_LOT)
+            nom_fichier = f"stocks_{timezone.localdate():%Y%m%d}"
+            return reponse_export(request, nom_fichier, [*COLONNES, 'date_modification'], lignes)
+            
+        except ExportInvalide as e:
             return Response({
-                "message": f"Erreur serveur: {str(e)}",
+                "message": str(e),
                 "success": False,
                 "donnees": {}
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return erreur_serveur(e)
+
+class StockAlerteView(APIView):
+    permission_classes = [IsAuthenticatedEntrepriseOrEmploye, AccesRessource]
+    ressource_acces = 'stocks'
+    authentication_classes = []
+    
+    @swagger_auto_schema(
+        tags=['Stock'],
+        manual_parameters=[
+            openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=False, description="Nombre de stocks renvoyés (défaut: PAGE_SIZE)")
+        ],
+        responses={
+            200: openapi.Response('Alertes stock', RESPONSE_JSON),
+            400: openapi.Response('Paramètres invalides', RESPONSE_JSON),
+            500: openapi.Response('Erreur serveur', RESPONSE_JSON)
+        },
+        operation_description="Nombre de stocks en rupture de l'entreprise et les plus critiques (plus grand manque d'abord)."
+    )
+    def get(self, request):
+        try:
+            entreprise = request.principal.entreprise
+            try:
+                limite = min(int(request.GET.get('limit', settings.REST_FRAMEWORK['PAGE_SIZE'])), settings.PAGINATION_LIMITE_MAX)
+            except ValueError:
+                return Response({
+                    "message": "Paramètre 'limit' invalide.",
+                    "success": False,
+                    "donnees": {}
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            stocks = StockListSerializer.lignes(Stock.objects.filter(EN_RUPTURE, entreprise=entreprise)).order_by(
+                F('quantite') - F('stock_min'), 'id'
+            )[:max(limite, 0)]
+            nombre_en_rupture = compter_ruptures(entreprise.id)
+            with chronometre_serializer():
+                donnees = StockListSerializer.representer(stocks)
+            return Response({
+                "message": "Alertes de stock récupérées avec succès.",
+                "success": True,
+                "donnees": {
+                    "nombre_en_rupture": nombre_en_rupture,
+                    "stocks": donnees
+                }
+            }, status=status.HTTP_200_OK)
+            
+        except Exception as e:
+            return erreur_serveur(e)
 
 class StockCreateView(APIView):
-    permission_classes = [IsAuthenticatedEntrepriseOrEmploye]
+    permission_classes = [IsAuthenticatedEntrepriseOrEmploye, AccesRessource]
+    ressource_acces = 'stocks'
+    authentication_classes = []
     
     @swagger_auto_schema(
         tags=['Stock'],
@@ -139,10 +251,10 @@ class StockCreateView(APIView):
     )
     def post(self, request):
         try:
-            entreprise = getattr(request, 'entreprise', request.employe.entreprise)
+            entreprise = request.principal.entreprise
             serializer = StockCreateSerializer(
                 data=request.data, 
-                context={'entreprise': entreprise}
+                context={'entreprise': entreprise, 'employe': request.principal.employe}
             )
             
             if serializer.is_valid():
@@ -160,40 +272,94 @@ class StockCreateView(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
             
         except Exception as e:
+            return erreur_serveur(e)
+
+class StockImportView(APIView):
+    permission_classes = [IsAuthenticatedEntrepriseOrEmploye, AccesRessource]
+    ressource_acces = 'stocks'
+    authentication_classes = []
+    parser_classes = [MultiPartParser, FormParser]
+    
+    @swagger_auto_schema(
+        tags=['Stock'],
+        manual_parameters=[
+            openapi.Parameter('fichier', openapi.IN_FORM, type=openapi.TYPE_FILE, required=True,
+                              description=f"CSV (',' ou ';') ou XLSX, colonnes: {', '.join(COLONNES)}")
+        ],
+        responses={
+            200: openapi.Response('Rapport d\'import', RESPONSE_JSON),
+            400: openapi.Response('Fichier invalide', RESPONSE_JSON),
+            500: openapi.Response('Erreur serveur', RESPONSE_JSON)
+        },
+        operation_description="Importer des stocks en masse : les noms existants (insensible à la casse) sont mis à jour sur les seules colonnes renseignées, les autres créés. Les lignes invalides sont ignorées et listées dans le rapport."
+    )
+    def post(self, request):
+        try:
+            fichier = request.FILES.get('fichier')
+            if fichier is None:
+                return Response({
+                    "message": "Fichier requis.",
+                    "success": False,
+                    "donnees": {}
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            rapport = importer_stocks(request.principal.entreprise, lire_fichier(fichier), request.principal.employe)
             return Response({
-                "message": f"Erreur serveur: {str(e)} - {str(traceback.format_exc())}",
+                "message": f"{rapport['crees']} stock(s) créé(s), {rapport['mis_a_jour']} mis à jour, {rapport['nombre_erreurs']} ligne(s) en erreur.",
+                "success": True,
+                "donnees": rapport
+            }, status=status.HTTP_200_OK)
+            
+        except (ImportInvalide, UnicodeDecodeError) as e:
+            return Response({
+                "message": str(e),
                 "success": False,
                 "donnees": {}
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return erreur_serveur(e)
 
 class StockDetailView(APIView):
-    permission_classes = [IsAuthenticatedEntrepriseOrEmploye]
+    permission_classes = [IsAuthenticatedEntrepriseOrEmploye, AccesRessource]
+    ressource_acces = 'stocks'
+    authentication_classes = []
     
-    def get_object(self, stock_id):
-        entreprise = getattr(self.request, 'entreprise', self.request.employe.entreprise)
+    def get_object(self, stock_id, champs=None):
+        entreprise = self.request.principal.entreprise
         try:
-            obj = Stock.objects.get(id=stock_id, entreprise=entreprise)
+            obj = StockListSerializer.charger(Stock.objects.filter(entreprise=entreprise), champs).get(id=stock_id)
             return obj
         except Stock.DoesNotExist:
             raise Exception("Stock introuvable.")
     
     @swagger_auto_schema(
         tags=['Stock'],
+        manual_parameters=[PARAMETRE_CHAMPS],
         responses={
             200: openapi.Response('Détail stock', RESPONSE_JSON_DETAIL),
+            400: openapi.Response('Champs invalides', RESPONSE_JSON),
             404: openapi.Response('Stock introuvable', RESPONSE_JSON)
         },
         operation_description="Récupérer le détail d'un stock."
     )
     def get(self, request, stock_id):
         try:
-            stock = self.get_object(stock_id)
+            champs = champs_demandes(request, StockListSerializer)
+            stock = self.get_object(stock_id, champs)
+            with chronometre_serializer():
+                donnees = StockListSerializer(stock, champs=champs).data
             return Response({
                 "message": "Stock récupéré avec succès.",
                 "success": True,
-                "donnees": StockListSerializer(stock).data
+                "donnees": donnees
             }, status=status.HTTP_200_OK)
             
+        except ChampsInvalides as e:
+            return Response({
+                "message": str(e),
+                "success": False,
+                "donnees": {}
+            }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({
                 "message": str(e),
@@ -202,10 +368,12 @@ class StockDetailView(APIView):
             }, status=status.HTTP_404_NOT_FOUND)
 
 class StockUpdateView(APIView):
-    permission_classes = [IsAuthenticatedEntrepriseOrEmploye]
+    permission_classes = [IsAuthenticatedEntrepriseOrEmploye, AccesRessource]
+    ressource_acces = 'stocks'
+    authentication_classes = []
     
     def get_object(self, stock_id):
-        entreprise = getattr(self.request, 'entreprise', self.request.employe.entreprise)
+        entreprise = self.request.principal.entreprise
         try:
             obj = Stock.objects.get(id=stock_id, entreprise=entreprise)
             return obj
@@ -234,7 +402,7 @@ class StockUpdateView(APIView):
     def patch(self, request, stock_id):
         try:
             stock = self.get_object(stock_id)
-            serializer = StockUpdateSerializer(stock, data=request.data, partial=True)
+            serializer = StockUpdateSerializer(stock, data=request.data, partial=True, context={'employe': request.principal.employe})
             
             if serializer.is_valid():
                 serializer.save()
@@ -251,17 +419,15 @@ class StockUpdateView(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
             
         except Exception as e:
-            return Response({
-                "message": f"{str(e)} - {str(traceback.format_exc())}",
-                "success": False,
-                "donnees": {}
-            }, status=status.HTTP_400_BAD_REQUEST)
+            return erreur(str(e))
 
 class StockDeleteView(APIView):
-    permission_classes = [IsAuthenticatedEntrepriseOrEmploye]
+    permission_classes = [IsAuthenticatedEntrepriseOrEmploye, AccesRessource]
+    ressource_acces = 'stocks'
+    authentication_classes = []
     
     def get_object(self, stock_id):
-        entreprise = getattr(self.request, 'entreprise', self.request.employe.entreprise)
+        entreprise = self.request.principal.entreprise
         try:
             obj = Stock.objects.get(id=stock_id, entreprise=entreprise)
             return obj
@@ -281,6 +447,7 @@ class StockDeleteView(APIView):
             stock = self.get_object(stock_id)
             nom = stock.nom
             stock.delete()
+            noter_changement(stock.entreprise_id, stock.est_en_rupture, False)
             return Response({
                 "message": f"Stock '{nom}' supprimé avec succès.",
                 "success": True,
@@ -293,3 +460,93 @@ class StockDeleteView(APIView):
                 "success": False,
                 "donnees": {}
             }, status=status.HTTP_404_NOT_FOUND)
+
+
+class StockHistoriqueView(APIView):
+    permission_classes = [IsAuthenticatedEntrepriseOrEmploye, AccesRessource]
+    ressource_acces = 'stocks'
+    authentication_classes = []
+    
+    @swagger_auto_schema(
+        tags=['Stock'],
+        manual_parameters=[
+            openapi.Parameter('periode', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False, enum=['jour', 'semaine'], description="Granularité (défaut: jour)"),
+            openapi.Parameter('debut', openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE, required=False, description="Défaut: 30 jours / 12 semaines avant fin"),
+            openapi.Parameter('fin', openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE, required=False, description="Défaut: aujourd'hui")
+        ],
+        responses={
+            200: openapi.Response('Historique stock', RESPONSE_JSON),
+            400: openapi.Response('Paramètres invalides', RESPONSE_JSON),
+            404: openapi.Response('Stock introuvable', RESPONSE_JSON)
+        },
+        operation_description="Entrées, sorties et consommation moyenne d'un stock par jour ou par semaine. Avec l'écriture par lots (MOUVEMENTS_INTERVALLE > 0), les derniers mouvements peuvent apparaître avec quelques secondes de décalage."
+    )
+    def get(self, request, stock_id):
+        try:
+            stock = Stock.objects.filter(id=stock_id, entreprise=request.principal.entreprise).first()
+            if stock is None:
+                return Response({
+                    "message": "Stock introuvable.",
+                    "success": False,
+                    "donnees": {}
+                }, status=status.HTTP_404_NOT_FOUND)
+            
+            periode = request.GET.get('periode', 'jour')
+            try:
+                if periode not in dict(PERIODE_CHOICES):
+                    raise ValueError
+                fin = date.fromisoformat(request.GET['fin']) if request.GET.get('fin') else timezone.localdate()
+                debut = date.fromisoformat(request.GET['debut']) if request.GET.get('debut') else (
+                    fin - timedelta(days=29) if periode == 'jour' else fin - timedelta(weeks=11)
+                )
+            except ValueError:
+                return Response({
+                    "message": "Paramètres invalides (periode: jour|semaine, debut/fin: AAAA-MM-JJ).",
+                    "success": False,
+                    "donnees": {}
+                }, status=status.HTTP_400_BAD_REQUEST)
+            if debut > fin:
+                return Response({
+                    "message": "La date de début doit précéder la date de fin.",
+                    "success": False,
+                    "donnees": {}
+                }, status=status.HTTP_400_BAD_REQUEST)
+            debut, fin = debut_periode(debut, periode), debut_periode(fin, periode)
+            
+            agregats = {
+                agregat.debut_periode: agregat
+                for agregat in StockAgregat.objects.filter(stock=stock, periode=periode, debut_periode__range=(debut, fin))
+            }
+            # écriture par lots (MOUVEMENTS_INTERVALLE > 0) : les mouvements en tampon de ce processus sont ajoutés
+            # sans forcer l'écriture ; ceux des autres workers apparaissent à leur prochain lot
+            for (_, periode_cumul, debut_cumul), (entrees, sorties, nombre) in cumuler(mouvements_en_attente(stock.id)).items():
+                if periode_cumul != periode or not debut <= debut_cumul <= fin:
+                    continue
+                agregat = agregats.setdefault(debut_cumul, StockAgregat(stock=stock, periode=periode, debut_periode=debut_cumul))
+                agregat.entrees += entrees
+                agregat.sorties += sorties
+                agregat.nombre_mouvements += nombre
+            agregats = [agregats[debut_agregat] for debut_agregat in sorted(agregats)]
+            with chronometre_serializer():
+                donnees = StockAgregatSerializer(agregats, many=True).data
+            
+            total_entrees = sum((a.entrees for a in agregats), Decimal(0))
+            total_sorties = sum((a.sorties for a in agregats), Decimal(0))
+            nombre_periodes = (fin - debut).days // (7 if periode == 'semaine' else 1) + 1
+            return Response({
+                "message": "Historique du stock récupéré avec succès.",
+                "success": True,
+                "donnees": {
+                    "stock_id": stock.id,
+                    "periode": periode,
+                    "debut": debut,
+                    "fin": fin,
+                    "total_entrees": f"{total_entrees:.2f}",
+                    "total_sorties": f"{total_sorties:.2f}",
+                    "consommation_moyenne": f"{total_sorties / nombre_periodes:.2f}",
+                    "agregats": donnees
+                }
+            }, status=status.HTTP_200_OK)
+            
+        except Exception as e:
+            return erreur_serveur(e)
@@ -13,7 +13,7 @@ import string
 from dotenv import load_dotenv
 import os
 
-from apps.users.models import User, SmsOrangeToken, UserOtp
+from apps.users.models import User, SmsOrangeToken, UserOtp, EmailSortant
 from helpers.services.emails import envoyer_email
 
 load_dotenv()
@@ -140,6 +140,13 @@ class UserOtpAdmin(admin.ModelAdmin):
             messages.error(request, f"Erreur lors de l'envoi de l'OTP à {otp.user.nom_complet}: {str(e)}")
         return HttpResponseRedirect(reverse('admin:users_userotp_changelist'))
 
+class EmailSortantAdmin(admin.ModelAdmin):
+    list_display = ('objet', 'statut', 'tentatives', 'prochaine_tentative', 'date_creation', 'date_envoi')
+    list_filter = ('statut',)
+    search_fields = ('objet', 'derniere_erreur')
+    ordering = ('-date_creation',)
+
 admin.site.register(User, UserAdmin)
 admin.site.register(SmsOrangeToken, SmsOrangeTokenAdmin)
-admin.site.register(UserOtp, UserOtpAdmin)
\ No newline at end of file
+admin.site.register(UserOtp, UserOtpAdmin)
+admin.site.register(EmailSortant, EmailSortantAdmin)
\ No newline at end of file
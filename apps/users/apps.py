@@ -5,3 +5,14 @@ class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.users'
     verbose_name = 'Utilisateurs'
+
+    def ready(self):
+        from django.conf import settings
+        from helpers import planificateur
+
+        if settings.PURGE_INTERVALLE > 0:
+            from helpers.purge import purge_planifiee
+
+            # thread lancé par les points d'entrée serveur (wsgi/asgi), pas par les commandes de gestion
+            planificateur.planifier('purge_expires', settings.PURGE_INTERVALLE, purge_planifiee)
+
@@ -19,7 +19,6 @@ from datetime import timedelta, datetime
 import random
 import string
 import os
-import traceback
 from uuid import uuid4
 from dotenv import load_dotenv
 
@@ -28,6 +27,7 @@ from apps.users.models import User, UserOtp
 from helpers.services.google.authentication import get_google_auth_url, handle_google_callback
 from helpers.services.emails import envoyer_email
 from helpers.helper import generate_jwt_token, enc_dec, decode_jwt_token
+from helpers.reponses import erreur_serveur
 
 load_dotenv()
 
@@ -87,7 +87,7 @@ class LoginView(APIView):
             print(e)
             return Response({'erreur': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            return Response({'erreur': f"{str(e)}: {str(traceback.format_exc())}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
 class RegisterView(APIView):
     permission_classes = [AllowAny]
@@ -151,7 +151,7 @@ class RegisterView(APIView):
                 envoyer_email([user.email], 'verify_email', email_data)
             except Exception as e:
                 user.delete()
-                return Response({'erreur': f"Erreur lors de l'envoi de l'email de vérification: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+                return erreur_serveur(e)
             return Response({
                 'email': user.email,
                 'message': 'Inscription réussie.'
@@ -161,7 +161,7 @@ class RegisterView(APIView):
         except IntegrityError:
             return Response({'erreur': "Cet email est déjà utilisé."}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            return Response({'erreur': f"{str(e)}: {str(traceback.format_exc())}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
 class GoogleCallbackUserView(APIView):
     permission_classes = [AllowAny]
@@ -274,7 +274,7 @@ class GoogleCallbackUserView(APIView):
                 envoyer_email([user.email], 'verify_email', email_data)
             except Exception as e:
                 user.delete()
-                return Response({"detail": f"Erreur lors de la création de l'adresse, des paramètres ou de l'envoi de l'email: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+                return erreur_serveur(e)
             refresh = RefreshToken.for_user(user)
             return Response({
                 "message": f"Inscription d'utilisateur réussie via Google. Veuillez vérifier votre email pour activer votre compte.",
@@ -284,7 +284,7 @@ class GoogleCallbackUserView(APIView):
                 "access": str(refresh.access_token)
             }, status=status.HTTP_201_CREATED)
         except Exception as e:
-            return Response({"detail": f"{str(e)}: {str(traceback.format_exc())}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
 class GoogleAuthUrlView(APIView):
     permission_classes = [AllowAny]
@@ -323,7 +323,7 @@ class GoogleAuthUrlView(APIView):
                 "state": state
             }, status=status.HTTP_200_OK)
         except Exception as e:
-            return Response({"detail": f"{str(e)}: {str(traceback.format_exc())}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
 class VerifyOtpView(APIView):
     permission_classes = [AllowAny]
@@ -397,4 +397,4 @@ class VerifyOtpView(APIView):
                 'refresh': str(refresh)
             }, status=status.HTTP_200_OK)
         except Exception as e:
-            return Response({'erreur': f"{str(e)}: {str(traceback.format_exc())}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            return erreur_serveur(e)
\ No newline at end of file
@@ -0,0 +1,116 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.employe.models import Employe
+from helpers.benchmark import (
+    SCENARIOS, base_benchmark, clients_benchmark, comparer, contexte_benchmark, executer, meta_benchmark, tenant_benchmark
+)
+from helpers.generateur import GenerateurTenant, ecriture_rapide
+
+ACCES_BENCHMARK = {
+    'Stocks': {'read': True, 'write': True, 'delete': False},
+    'Factures': {'read': True, 'write': True, 'delete': False},
+}
+
+
+class Command(BaseCommand):
+    help = ("Benchmark des endpoints sur une entreprise générée (tailles configurables) : "
+            "latence p50/p95/p99, requêtes SQL et pic mémoire par scénario, en JSON")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stocks', type=int, default=100_000)
+        parser.add_argument('--factures', type=int, default=1_000_000)
+        parser.add_argument('--employes', type=int, default=5_000)
+        parser.add_argument('--graine', type=int, default=0, help='Graine du générateur (données reproductibles)')
+        parser.add_argument('--iterations', type=int, default=30)
+        parser.add_argument('--echauffement', type=int, default=3)
+        parser.add_argument('--scenarios', nargs='*', help=f"Sous-ensemble parmi : {', '.join(s.nom for s in SCENARIOS)}")
+        parser.add_argument('--sortie', help='Fichier JSON des résultats')
+        parser.add_argument('--comparer', help='JSON de référence (commit précédent) à comparer')
+        parser.add_argument('--seuil', type=float, default=10.0, help='Régression au-delà de ce pourcentage (p50/p95)')
+        parser.add_argument('--strict', action='store_true', help='Échoue en cas de régression')
+        parser.add_argument('--supprimer', action='store_true', help="Supprime l'entreprise de benchmark à la fin")
+        parser.add_argument('--base', help="Base jetable où générer l'entreprise (défaut : la base de test, créée au besoin)")
+        parser.add_argument('--base-courante', action='store_true',
+                            help="Génère dans la base configurée (développement) au lieu d'une base jetable")
+
+    def handle(self, *args, **options):
+        if not options['base_courante']:
+            try:
+                self.stdout.write(f"Base de benchmark : {base_benchmark(options['base'])}")
+            except ValueError as e:
+                raise CommandError(f"{e} (--base-courante pour l'utiliser)")
+        tailles = {cle: options[cle] for cle in ('stocks', 'factures', 'employes', 'graine')}
+        entreprise = self.preparer(tailles)
+
+        scenarios = SCENARIOS
+        if options['scenarios']:
+            scenarios = [scenario for scenario in SCENARIOS if scenario.nom in options['scenarios']]
+        employe = Employe.objects.filter(entreprise=entreprise, compte__isnull=False).order_by('id').first()
+
+        try:
+            resultats = {
+                'meta': meta_benchmark(tailles),
+                'scenarios': executer(
+                    scenarios, clients_benchmark(entreprise, employe), contexte_benchmark(entreprise),
+                    iterations=options['iterations'], echauffement=options['echauffement']
+                ),
+            }
+        finally:
+            if options['supprimer']:
+                entreprise.delete()
+
+        self.afficher(resultats)
+        if options['sortie']:
+            with open(options['sortie'], 'w', encoding='utf-8') as fichier:
+                json.dump(resultats, fichier, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f"✅ Résultats enregistrés dans {options['sortie']}"))
+        if options['comparer']:
+            self.comparer(options['comparer'], resultats, options['seuil'], options['strict'])
+
+    def preparer(self, tailles):
+        """Entreprise de benchmark identifiée par ses tailles : générée une fois (jusqu'au bout) puis réutilisée."""
+        email = 'benchmark-{stocks}-{factures}-{employes}-{graine}@benchmark.local'.format(**tailles)
+
+        def generer(email, nom):
+            generateur = GenerateurTenant(graine=tailles['graine'])
+            entreprise = generateur.entreprise(email, nom)
+            profession = generateur.profession('Benchmark', ACCES_BENCHMARK)
+            with ecriture_rapide():
+                for cle, remplir in (
+                    ('stocks', lambda: generateur.stocks(entreprise, tailles['stocks'])),
+                    ('employes', lambda: generateur.employes(entreprise, tailles['employes'], profession)),
+                    ('factures', lambda: generateur.factures(entreprise, tailles['factures'])),
+                ):
+                    self.stdout.write(f"Génération de {tailles[cle]} {cle}...")
+                    remplir()
+            return entreprise
+
+        entreprise, reutilisee = tenant_benchmark(email, 'Entreprise benchmark', generer)
+        if reutilisee:
+            self.stdout.write(f"Entreprise de benchmark existante réutilisée ({email})")
+        return entreprise
+
+    def afficher(self, resultats):
+        self.stdout.write(f"{'scénario':<22}{'p50':>10}{'p95':>10}{'p99':>10}{'SQL':>6}{'mémoire':>12}  statut")
+        for nom, mesure in resultats['scenarios'].items():
+            self.stdout.write(
+                f"{nom:<22}{mesure['p50_ms']:>8.1f}ms{mesure['p95_ms']:>8.1f}ms{mesure['p99_ms']:>8.1f}ms"
+                f"{mesure['requetes']:>6}{mesure['memoire_pic_ko']:>10.0f}Ko  {mesure['statut']}"
+            )
+
+    def comparer(self, chemin, resultats, seuil, strict):
+        with open(chemin, encoding='utf-8') as fichier:
+            reference = json.load(fichier)
+        lignes, regressions = comparer(reference, resultats, seuil)
+        self.stdout.write(f"\nComparaison avec {chemin} (commit {reference['meta'].get('commit')})")
+        for nom, metrique, avant, apres, ecart in lignes:
+            self.stdout.write(f"{nom:<22}{metrique:<16}{avant:>12}{apres:>12}{ecart:>+9.1f}%")
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS('✅ Aucune régression'))
+            return
+        message = f"Régressions (> {seuil}% ou requêtes SQL en hausse) : {', '.join(regressions)}"
+        if strict:
+            raise CommandError(message)
+        self.stdout.write(self.style.WARNING(message))
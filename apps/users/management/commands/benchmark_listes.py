@@ -0,0 +1,79 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.finance.models import Facture
+from apps.finance.serializers import FactureListSerializer
+from apps.stock.models import Stock
+from apps.stock.serializers import StockListSerializer
+from helpers.benchmark import base_benchmark, mesurer, tenant_benchmark
+from helpers.generateur import GenerateurTenant, ecriture_rapide
+from helpers.renderers import JSONRapideRenderer
+
+LISTES = [('stocks', Stock, StockListSerializer), ('factures', Facture, FactureListSerializer)]
+
+
+class Command(BaseCommand):
+    help = ("Compare, sur N lignes, le serializer de liste (instances + ModelSerializer) et la lecture rapide "
+            "(.values() + representer) : latence, requêtes, mémoire et identité du JSON")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lignes', type=int, default=10_000)
+        parser.add_argument('--iterations', type=int, default=10)
+        parser.add_argument('--echauffement', type=int, default=1)
+        parser.add_argument('--sortie', help='Fichier JSON des résultats')
+        parser.add_argument('--supprimer', action='store_true', help="Supprime l'entreprise générée à la fin")
+        parser.add_argument('--base', help="Base jetable où générer l'entreprise (défaut : la base de test, créée au besoin)")
+        parser.add_argument('--base-courante', action='store_true',
+                            help="Génère dans la base configurée (développement) au lieu d'une base jetable")
+
+    def handle(self, *args, **options):
+        if not options['base_courante']:
+            try:
+                self.stdout.write(f"Base de benchmark : {base_benchmark(options['base'])}")
+            except ValueError as e:
+                raise CommandError(f"{e} (--base-courante pour l'utiliser)")
+        entreprise = self.preparer(options['lignes'])
+        resultats = {}
+        try:
+            for nom, modele, serializer in LISTES:
+                queryset = modele.objects.filter(entreprise=entreprise).order_by('-date_creation', '-id')
+                chemins = {
+                    'serializer': lambda: serializer(list(serializer.charger(queryset)), many=True).data,
+                    'rapide': lambda: serializer.representer(list(serializer.lignes(queryset))),
+                }
+                rendus = {cle: JSONRapideRenderer().render(chemin()) for cle, chemin in chemins.items()}
+                if rendus['serializer'] != rendus['rapide']:
+                    raise CommandError(f"{nom} : sorties différentes")
+                mesures = {}
+                for cle, chemin in chemins.items():
+                    mesures[cle] = mesurer(chemin, options['iterations'], options['echauffement'])
+                    mesures[cle].pop('resultat')
+                resultats[nom] = {
+                    'lignes': options['lignes'], 'octets': len(rendus['rapide']), **mesures,
+                    'acceleration_p50': round(mesures['serializer']['p50_ms'] / mesures['rapide']['p50_ms'], 2),
+                }
+                self.stdout.write(
+                    f"{nom:<10}{options['lignes']:>8} lignes  serializer {mesures['serializer']['p50_ms']:>8.1f}ms "
+                    f"{mesures['serializer']['memoire_pic_ko']:>8.0f}Ko  rapide {mesures['rapide']['p50_ms']:>8.1f}ms "
+                    f"{mesures['rapide']['memoire_pic_ko']:>8.0f}Ko  x{resultats[nom]['acceleration_p50']}  (JSON identique)"
+                )
+        finally:
+            if options['supprimer']:
+                entreprise.delete()
+
+        if options['sortie']:
+            with open(options['sortie'], 'w', encoding='utf-8') as fichier:
+                json.dump(resultats, fichier, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f"✅ Résultats enregistrés dans {options['sortie']}"))
+
+    def preparer(self, lignes):
+        def generer(email, nom):
+            generateur = GenerateurTenant()
+            entreprise = generateur.entreprise(email, nom)
+            with ecriture_rapide():
+                generateur.stocks(entreprise, lignes)
+                generateur.factures(entreprise, lignes)
+            return entreprise
+
+        return tenant_benchmark(f'benchmark-listes-{lignes}@benchmark.local', 'Entreprise benchmark listes', generer)[0]
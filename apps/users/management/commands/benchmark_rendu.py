@@ -0,0 +1,90 @@
+import json
+import random
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from apps.entreprise.models import PrefixTelephone
+from apps.finance.models import Facture
+from apps.finance.serializers import FactureListSerializer
+from helpers.benchmark import mesurer
+from helpers.generateur import CLIENTS
+from helpers.renderers import JSONRapideRenderer, orjson
+from helpers.reponses import enveloppe
+
+
+def factures_en_memoire(nombre, graine=0):
+    """Factures non enregistrées (aucune requête SQL) : seul le rendu est mesuré."""
+    hasard = random.Random(graine)
+    prefix = PrefixTelephone(id=1, prefix='+261', pays='Madagascar')
+    maintenant = datetime(2025, 6, 1, 8, 30, tzinfo=timezone.utc)
+    factures = []
+    for i in range(nombre):
+        date_facture = date(2025, 1, 1) + timedelta(days=hasard.randint(0, 365))
+        factures.append(Facture(
+            id=i + 1, numero=f'FAC-2025-0001-{i + 1:06d}', client=hasard.choice(CLIENTS),
+            montant=Decimal(hasard.randint(1000, 5000000)) / 100, prefix_telephone=prefix,
+            date_facture=date_facture, date_echeance=date_facture + timedelta(days=30),
+            statut=hasard.choice(['brouillon', 'envoyee', 'payee']), motif='Livraison « hebdomadaire »',
+            date_creation=maintenant - timedelta(minutes=i), date_modification=maintenant,
+        ))
+    return factures
+
+
+def charges(nombre):
+    """Corps de liste : sortie du serializer (chaînes) et lignes brutes (Decimal, date, datetime)."""
+    factures = factures_en_memoire(nombre)
+    pagination = {'limit': nombre, 'next': 'WyIyMDI1LTA2LTAxVDA4OjMwOjAwKzAwOjAwIiwgMV0'}
+    brutes = [
+        {champ: getattr(facture, champ) for champ in (
+            'id', 'numero', 'client', 'montant', 'date_facture', 'date_echeance', 'statut', 'motif',
+            'date_creation', 'date_modification',
+        )}
+        for facture in factures
+    ]
+    return {
+        'serializer': enveloppe("Factures récupérées avec succès.", True, FactureListSerializer(factures, many=True).data,
+                                pagination=pagination),
+        'brut': enveloppe("Factures récupérées avec succès.", True, brutes, pagination=pagination),
+    }
+
+
+class Command(BaseCommand):
+    help = "Compare le rendu JSON de DRF et JSONRapideRenderer (orjson) sur des listes de factures : latence et identité"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--elements', type=int, default=500, help='Éléments par liste')
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--echauffement', type=int, default=3)
+        parser.add_argument('--sortie', help='Fichier JSON des résultats')
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING("orjson absent : JSONRapideRenderer se replie sur le rendu de DRF"))
+        renderers = {'drf': JSONRenderer(), 'rapide': JSONRapideRenderer()}
+        resultats = {}
+        for nom, donnees in charges(options['elements']).items():
+            corps = {cle: renderer.render(donnees) for cle, renderer in renderers.items()}
+            if corps['drf'] != corps['rapide']:
+                raise CommandError(f"{nom} : rendus différents")
+            mesures = {
+                cle: mesurer(lambda renderer=renderer: renderer.render(donnees), options['iterations'], options['echauffement'])
+                for cle, renderer in renderers.items()
+            }
+            for mesure in mesures.values():
+                mesure.pop('resultat')
+            resultats[nom] = {
+                'octets': len(corps['drf']),
+                **mesures,
+                'acceleration_p50': round(mesures['drf']['p50_ms'] / mesures['rapide']['p50_ms'], 2),
+            }
+            self.stdout.write(
+                f"{nom:<12}{len(corps['drf']):>10} octets  drf {mesures['drf']['p50_ms']:>8.2f}ms  "
+                f"rapide {mesures['rapide']['p50_ms']:>8.2f}ms  x{resultats[nom]['acceleration_p50']}  (rendus identiques)"
+            )
+        if options['sortie']:
+            with open(options['sortie'], 'w', encoding='utf-8') as fichier:
+                json.dump(resultats, fichier, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f"✅ Résultats enregistrés dans {options['sortie']}"))
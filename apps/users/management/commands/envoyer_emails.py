@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from helpers.services.emails import traiter_file
+
+
+class Command(BaseCommand):
+    help = "Envoie les emails en attente dans la file (emailsortant) en réutilisant une connexion SMTP par lot"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--taille-lot', type=int, default=None, help='Nombre d\'emails réclamés par lot')
+
+    def handle(self, *args, **options):
+        envoyes, echecs = traiter_file(options['taille_lot'])
+        self.stdout.write(self.style.SUCCESS(f'✅ {envoyes} emails envoyés, {echecs} en échec (replanifiés ou abandonnés)'))
@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apps.entreprise.models import Entreprise
+from helpers.generateur import GenerateurTenant, generer_tenants
+
+ACCES_GENERES = {
+    'Stocks': {'read': True, 'write': True, 'delete': False},
+    'Factures': {'read': True, 'write': True, 'delete': False},
+}
+
+
+class Command(BaseCommand):
+    help = ("Génère des entreprises de charge (stocks, factures, employés) par INSERT en masse, "
+            "reproductibles par graine et réparties sur plusieurs processus")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entreprises', type=int, default=1)
+        parser.add_argument('--stocks', type=int, default=10_000, help='Par entreprise')
+        parser.add_argument('--factures', type=int, default=100_000, help='Par entreprise')
+        parser.add_argument('--employes', type=int, default=1_000, help='Par entreprise (chacun avec un compte)')
+        parser.add_argument('--graine', type=int, default=0, help='Graine du générateur (données reproductibles)')
+        parser.add_argument('--processus', type=int, default=1,
+                            help="Processus générant les entreprises en parallèle (SQLite : un seul écrivain à la fois)")
+        parser.add_argument('--taille-lot', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        generateur = GenerateurTenant(graine=options['graine'], taille_lot=options['taille_lot'])
+        profession = generateur.profession('Générée', ACCES_GENERES) if options['employes'] else None
+
+        taches = []
+        for i in range(options['entreprises']):
+            email = f"donnees-{options['graine']}-{i}@generateur.local"
+            if Entreprise.objects.filter(email=email).exists():
+                self.stdout.write(self.style.WARNING(f"{email} existe déjà : ignorée"))
+                continue
+            taches.append({
+                'graine': options['graine'] * 100_003 + i,
+                'email': email,
+                'nom_complet': f'Entreprise générée {i}',
+                'stocks': options['stocks'],
+                'factures': options['factures'],
+                'employes': options['employes'],
+                'profession_id': profession.id if profession else None,
+                'taille_lot': options['taille_lot'],
+                'mot_de_passe_hache': generateur.mot_de_passe_hache,
+            })
+        if not taches:
+            return
+        if options['processus'] > 1 and connection.vendor == 'sqlite':
+            self.stdout.write(self.style.WARNING(
+                "SQLite sérialise les écritures : les processus ne parallélisent que la préparation des lignes"
+            ))
+
+        debut = time.perf_counter()
+        resultats = generer_tenants(taches, options['processus'])
+        duree = time.perf_counter() - debut
+        lignes = sum(nombre for _, nombre in resultats)
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {len(resultats)} entreprise(s), {lignes} lignes en {duree:.1f}s ({lignes / duree:,.0f} lignes/s)"
+        ))
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from helpers.purge import purger_expires
+
+
+class Command(BaseCommand):
+    help = 'Purge les tokens et OTP expirés ou utilisés par lots (tokens entreprise/employé, OTP entreprise/employé/utilisateur)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--taille-lot', type=int, default=settings.PURGE_TAILLE_LOT,
+                            help='Nombre de lignes supprimées par transaction')
+        parser.add_argument('--pause', type=float, default=0,
+                            help='Pause (secondes) entre deux lots')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('Purge des tokens et OTP expirés...'))
+
+        total, duree_totale = 0, 0
+        for table, supprimes, duree in purger_expires(options['taille_lot'], options['pause']):
+            debit = supprimes / duree if duree > 0 else 0
+            self.stdout.write(f'{table}: {supprimes} lignes supprimées en {duree:.2f}s ({debit:.0f} lignes/s)')
+            total += supprimes
+            duree_totale += duree
+
+        debit = total / duree_totale if duree_totale > 0 else 0
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} lignes supprimées en {duree_totale:.2f}s ({debit:.0f} lignes/s)'))
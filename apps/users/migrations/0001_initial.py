@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:53
+
+import apps.users.models
+import datetime
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SmsOrangeToken',
+            fields=[
+                ('id_sms_orange_token', models.AutoField(primary_key=True, serialize=False)),
+                ('token_access', models.CharField(max_length=255)),
+                ('token_type', models.CharField(max_length=50)),
+                ('token_validity', models.PositiveIntegerField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'smsorangetoken',
+            },
+        ),
+        migrations.CreateModel(
+            name='User',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_login', models.DateTimeField(blank=True, null=True, verbose_name='last login')),
+                ('nom_complet', models.CharField(max_length=100)),
+                ('email', models.EmailField(max_length=254, unique=True)),
+                ('sexe', models.CharField(choices=[('M', 'Masculin'), ('F', 'Feminin'), ('I', 'Inconnu')], default='F', max_length=1)),
+                ('password', models.CharField(max_length=250)),
+                ('date_naissance', models.DateField(blank=True, null=True)),
+                ('profile', models.ImageField(default='users/profiles/default.png', upload_to='users/profiles')),
+                ('numero_phone', models.CharField(max_length=100)),
+                ('is_staff', models.BooleanField(default=False)),
+                ('is_verified', models.BooleanField(default=False)),
+                ('is_active', models.BooleanField(default=False)),
+                ('is_superuser', models.BooleanField(default=False)),
+                ('date_joined', models.DateTimeField(default=datetime.datetime(2026, 10, 18, 19, 53, 29, 918184, tzinfo=datetime.timezone.utc))),
+                ('groups', models.ManyToManyField(blank=True, help_text='The groups this user belongs to. A user will get all permissions granted to each of their groups.', related_name='user_set', related_query_name='user', to='auth.group', verbose_name='groups')),
+                ('user_permissions', models.ManyToManyField(blank=True, help_text='Specific permissions for this user.', related_name='user_set', related_query_name='user', to='auth.permission', verbose_name='user permissions')),
+            ],
+            options={
+                'db_table': 'users',
+            },
+        ),
+        migrations.CreateModel(
+            name='UserOtp',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code_otp', models.CharField(max_length=100)),
+                ('expirer_le', models.DateTimeField()),
+                ('date_creation', models.DateTimeField(default=apps.users.models.default_created_at)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='otps', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'userotp',
+            },
+        ),
+    ]
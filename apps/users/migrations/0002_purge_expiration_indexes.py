@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userotp',
+            index=models.Index(fields=['expirer_le'], name='userotp_expiration_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userotp',
+            index=models.Index(fields=['user', 'code_otp'], name='userotp_code_idx'),
+        ),
+    ]
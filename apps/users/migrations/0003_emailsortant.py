@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:55
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_purge_expiration_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailSortant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('destinataires', models.JSONField(default=list)),
+                ('objet', models.CharField(max_length=255)),
+                ('html', models.TextField()),
+                ('statut', models.CharField(choices=[('en_attente', 'En attente'), ('en_cours', 'En cours'), ('envoye', 'Envoyé'), ('echoue', 'Échoué')], default='en_attente', max_length=20)),
+                ('tentatives', models.PositiveIntegerField(default=0)),
+                ('prochaine_tentative', models.DateTimeField(default=django.utils.timezone.now)),
+                ('verrou', models.CharField(blank=True, max_length=36, null=True)),
+                ('verrouille_le', models.DateTimeField(blank=True, null=True)),
+                ('derniere_erreur', models.TextField(blank=True, null=True)),
+                ('date_creation', models.DateTimeField(auto_now_add=True)),
+                ('date_envoi', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'emailsortant',
+                'indexes': [models.Index(fields=['statut', 'prochaine_tentative'], name='emailsortant_file_idx')],
+            },
+        ),
+    ]
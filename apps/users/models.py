@@ -73,4 +73,37 @@ class UserOtp(models.Model):
         return self.is_active
     
     class Meta:
-        db_table = "userotp"
\ No newline at end of file
+        db_table = "userotp"
+        indexes = [
+            models.Index(fields=['expirer_le'], name='userotp_expiration_idx'),
+            models.Index(fields=['user', 'code_otp'], name='userotp_code_idx'),
+        ]
+
+STATUT_EMAIL_CHOICES = [
+    ('en_attente', 'En attente'),
+    ('en_cours', 'En cours'),
+    ('envoye', 'Envoyé'),
+    ('echoue', 'Échoué'),
+]
+
+class EmailSortant(models.Model):
+    destinataires = models.JSONField(default=list)
+    objet = models.CharField(max_length=255)
+    html = models.TextField()
+    statut = models.CharField(max_length=20, choices=STATUT_EMAIL_CHOICES, default='en_attente')
+    tentatives = models.PositiveIntegerField(default=0)
+    prochaine_tentative = models.DateTimeField(default=django_timezone.now)
+    verrou = models.CharField(max_length=36, null=True, blank=True)
+    verrouille_le = models.DateTimeField(null=True, blank=True)
+    derniere_erreur = models.TextField(null=True, blank=True)
+    date_creation = models.DateTimeField(auto_now_add=True)
+    date_envoi = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.objet} ({self.statut})"
+
+    class Meta:
+        db_table = "emailsortant"
+        indexes = [
+            models.Index(fields=['statut', 'prochaine_tentative'], name='emailsortant_file_idx'),
+        ]
@@ -1,3 +1,597 @@
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.core import mail
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from smtplib import SMTPException
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import datetime, json, socketserver, threading, time
+from decimal import Decimal
+from io import StringIO
+
+from django.db.models import Q
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from apps.employe.models import Employe, EmployeCompte, EmployeOtp, EmployeOutstandingToken, Profession
+from apps.entreprise.models import Devise, Entreprise, EntrepriseOtp, EntrepriseOutstandingToken, Service
+from apps.finance.analytique import recalculer_resumes
+from apps.finance.models import Facture, ResumeFactureMensuel
+from apps.stock.models import Stock
+from apps.stock.serializers import StockListSerializer
+from apps.users.models import EmailSortant, SmsOrangeToken, User, UserOtp
+from helpers.benchmark import SUFFIXE_EN_COURS, comparer, tenant_benchmark
+from helpers.generateur import DATE_REFERENCE, GenerateurTenant
+from helpers.metriques import centile, metriques
+from helpers.purge import purger_expires, purger_par_lots
+from helpers.renderers import JSONRapideRenderer
+from helpers.reference import invalider_reference
+from helpers import planificateur
+from helpers.services import emails
+from helpers.services.emails import demarrer_workers, envoyer_email, reveiller_workers, traiter_file
+from helpers.services.sms.orange import OrangeSmsClient, envoyer_sms_en_masse
 
 # Create your tests here.
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend', EMAIL_FILE_WORKERS=0)
+class EmailSortantTests(TestCase):
+    def envoyer(self, email):
+        envoyer_email([email], 'verify_email', {'subject': 'Vérification', 'nom_complet': 'Test', 'code_otp': '123456'})
+
+    def test_envoyer_email_met_en_file_sans_envoyer(self):
+        self.envoyer('a@exemple.com')
+
+        self.assertEqual(len(mail.outbox), 0)
+        email = EmailSortant.objects.get()
+        self.assertEqual(email.statut, 'en_attente')
+        self.assertEqual(email.destinataires, ['a@exemple.com'])
+        self.assertIn('123456', email.html)
+
+    def test_envoyer_email_journalise_et_propage_les_erreurs(self):
+        with self.assertLogs('helpers.services.emails', 'ERROR'), self.assertRaises(KeyError):
+            envoyer_email(['a@exemple.com'], 'gabarit_inconnu', {})
+
+        self.assertFalse(EmailSortant.objects.exists())
+
+    def test_traiter_file_envoie_par_lots(self):
+        for i in range(5):
+            self.envoyer(f'{i}@exemple.com')
+
+        self.assertEqual(traiter_file(taille_lot=2), (5, 0))
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(mail.outbox[0].alternatives[0][1], 'text/html')
+        self.assertFalse(EmailSortant.objects.exclude(statut='envoye').exists())
+
+    def test_echec_replanifie_avec_backoff(self):
+        self.envoyer('a@exemple.com')
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=SMTPException('indisponible')):
+            self.assertEqual(traiter_file(), (0, 1))
+
+        email = EmailSortant.objects.get()
+        self.assertEqual(email.statut, 'en_attente')
+        self.assertEqual(email.tentatives, 1)
+        self.assertGreater(email.prochaine_tentative, timezone.now())
+        # pas encore à réessayer
+        self.assertEqual(traiter_file(), (0, 0))
+
+    @override_settings(EMAIL_FILE_MAX_TENTATIVES=1)
+    def test_abandon_apres_max_tentatives(self):
+        self.envoyer('a@exemple.com')
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=SMTPException('indisponible')):
+            traiter_file()
+
+        self.assertEqual(EmailSortant.objects.get().statut, 'echoue')
+
+
+class _FauxSmtp(socketserver.StreamRequestHandler):
+    """Serveur SMTP minimal : garde les messages reçus, refuse les destinataires refuse@…"""
+    messages = []
+    connexions = 0
+
+    def repondre(self, ligne):
+        self.wfile.write(f'{ligne}\r\n'.encode())
+
+    def handle(self):
+        type(self).connexions += 1
+        self.repondre('220 faux-smtp')
+        destinataires = []
+        while ligne := self.rfile.readline():
+            commande = ligne.decode().strip()
+            verbe = commande[:4].upper()
+            if verbe in ('EHLO', 'HELO'):
+                self.repondre('250 faux-smtp')
+            elif verbe == 'MAIL':
+                destinataires = []
+                self.repondre('250 OK')
+            elif verbe == 'RCPT':
+                adresse = commande.split(':', 1)[1].strip(' <>')
+                if adresse.startswith('refuse@'):
+                    self.repondre('550 Destinataire inconnu')
+                else:
+                    destinataires.append(adresse)
+                    self.repondre('250 OK')
+            elif verbe == 'DATA':
+                self.repondre('354 Fin par .')
+                lignes = []
+                while (ligne := self.rfile.readline()) not in (b'.\r\n', b''):
+                    lignes.append(ligne)
+                self.messages.append((destinataires, b''.join(lignes)))
+                self.repondre('250 OK')
+            elif verbe == 'QUIT':
+                self.repondre('221 Au revoir')
+                return
+            else:
+                self.repondre('250 OK')
+
+
+class EmailSmtpTests(TransactionTestCase):
+    def setUp(self):
+        _FauxSmtp.messages, _FauxSmtp.connexions = [], 0
+        self.serveur = socketserver.ThreadingTCPServer(('127.0.0.1', 0), _FauxSmtp)
+        self.serveur.daemon_threads = True
+        threading.Thread(target=self.serveur.serve_forever, daemon=True).start()
+        parametres = override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend', EMAIL_HOST='127.0.0.1',
+            EMAIL_PORT=self.serveur.server_address[1], EMAIL_USE_SSL=False, EMAIL_USE_TLS=False,
+            EMAIL_HOST_USER='noreply@exemple.com', EMAIL_HOST_PASSWORD='', EMAIL_TIMEOUT=5,
+            EMAIL_FILE_WORKERS=2, EMAIL_FILE_ATTENTE=0.05,
+        )
+        parametres.enable()
+        self.addCleanup(parametres.disable)
+        # pool propre au test, arrêté avant la fermeture du serveur
+        self.pool = emails._PoolWorkers()
+        patch = mock.patch.object(emails, '_POOL', self.pool)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.addCleanup(self.pool.arreter, 5)
+        # la tâche de réveil est enregistrée, le thread du planificateur n'est pas lancé
+        patch_demarrer = mock.patch.object(planificateur, 'demarrer')
+        patch_demarrer.start()
+        self.addCleanup(patch_demarrer.stop)
+        self.addCleanup(planificateur._TACHES.pop, 'emails', None)
+
+    def tearDown(self):
+        self.serveur.shutdown()
+        self.serveur.server_close()
+
+    def attendre_traitement(self, nombre):
+        limite = time.monotonic() + 5
+        while time.monotonic() < limite:
+            if EmailSortant.objects.filter(Q(statut='envoye') | Q(tentatives__gt=0)).count() >= nombre:
+                return
+            time.sleep(0.02)
+        self.fail('File non traitée par les workers')
+
+    def test_workers_non_demarres_au_chargement(self):
+        envoyer_email(['a@exemple.com'], 'verify_email', {'subject': 'Vérification', 'nom_complet': 'Test', 'code_otp': '123456'})
+        time.sleep(0.2)
+
+        self.assertEqual(self.pool._threads, [])
+        self.assertNotIn('emails', planificateur._TACHES)
+        self.assertEqual(EmailSortant.objects.get().statut, 'en_attente')
+        self.assertEqual(_FauxSmtp.connexions, 0)
+
+    def test_workers_envoient_par_smtp(self):
+        demarrer_workers()
+        for adresse in ('a@exemple.com', 'refuse@exemple.com', 'b@exemple.com', 'c@exemple.com'):
+            # hors transaction : la mise en file réveille les workers immédiatement
+            envoyer_email([adresse], 'verify_email', {'subject': 'Vérification', 'nom_complet': 'Test', 'code_otp': '123456'})
+        self.attendre_traitement(4)
+
+        self.assertEqual(sorted(destinataires for destinataires, _ in _FauxSmtp.messages), [['a@exemple.com'], ['b@exemple.com'], ['c@exemple.com']])
+        self.assertTrue(all(b'text/html' in message and b'From: noreply@exemple.com' in message for _, message in _FauxSmtp.messages))
+        self.assertEqual(EmailSortant.objects.filter(statut='envoye').count(), 3)
+        refuse = EmailSortant.objects.get(destinataires=['refuse@exemple.com'])
+        self.assertEqual((refuse.statut, refuse.tentatives), ('en_attente', 1))
+        self.assertIn('550', refuse.derniere_erreur)
+        self.assertTrue(all(thread.name.startswith('email-worker-') for thread in self.pool._threads))
+
+    def test_emails_en_attente_repris_par_le_planificateur(self):
+        demarrer_workers()
+        # laissé en file par un processus précédent : aucune mise en file ne réveillera les workers
+        EmailSortant.objects.create(destinataires=['a@exemple.com'], objet='Ancien', html='<p>ancien</p>')
+        self.assertIs(planificateur._TACHES['emails']['fonction'], reveiller_workers)
+        planificateur._TACHES['emails']['fonction']()
+        self.attendre_traitement(1)
+
+        self.assertEqual(EmailSortant.objects.get().statut, 'envoye')
+        self.assertEqual([destinataires for destinataires, _ in _FauxSmtp.messages], [['a@exemple.com']])
+
+
+class _FauxOrange(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    appels = {'token': 0, 'sms': 0}
+    validite = 3600
+    revoques = set()
+
+    @classmethod
+    def reinitialiser(cls):
+        cls.appels, cls.validite, cls.revoques = {'token': 0, 'sms': 0}, 3600, set()
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        corps = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.path.startswith('/oauth'):
+            self.appels['token'] += 1
+            statut, reponse = 200, {'access_token': f"jeton-{self.appels['token']}", 'token_type': 'Bearer', 'expires_in': self.validite}
+        elif self.headers['Authorization'].split()[-1] in self.revoques:
+            statut, reponse = 401, {}
+        else:
+            self.appels['sms'] += 1
+            adresse = json.loads(corps)['outboundSMSMessageRequest']['address']
+            statut, reponse = (400, {}) if adresse.endswith('999') else (201, {'adresse': adresse})
+        donnees = json.dumps(reponse).encode()
+        self.send_response(statut)
+        self.send_header('Content-Length', str(len(donnees)))
+        self.end_headers()
+        self.wfile.write(donnees)
+
+
+class EnvoiSmsEnMasseTests(TestCase):
+    def setUp(self):
+        _FauxOrange.reinitialiser()
+        self.serveur = ThreadingHTTPServer(('127.0.0.1', 0), _FauxOrange)
+        threading.Thread(target=self.serveur.serve_forever, daemon=True).start()
+        self.client_sms = OrangeSmsClient(hote='127.0.0.1', port=self.serveur.server_address[1], https=False)
+
+    def tearDown(self):
+        self.client_sms.fermer()
+        self.serveur.shutdown()
+        self.serveur.server_close()
+
+    def test_resultats_par_destinataire(self):
+        numeros = [f'+26134000{i:04d}' for i in range(20)] + ['+261340000999']
+
+        resultat = envoyer_sms_en_masse(numeros, 'Rappel', concurrence=4, debit=1000, rafale=1000, client=self.client_sms)
+
+        self.assertEqual([r['numero'] for r in resultat['resultats']], numeros)
+        self.assertEqual(resultat['stats']['envoyes'], 20)
+        self.assertEqual(resultat['stats']['echecs'], 1)
+        self.assertFalse(resultat['resultats'][-1]['succes'])
+        self.assertEqual(_FauxOrange.appels, {'token': 1, 'sms': 21})
+
+    def test_debit_limite(self):
+        debut = time.monotonic()
+
+        resultat = envoyer_sms_en_masse([f'+2613400000{i:02d}' for i in range(11)], 'OTP', concurrence=8, debit=50, rafale=1, client=self.client_sms)
+
+        # 1 envoi immédiat puis 10 envois à 50/s
+        self.assertGreaterEqual(time.monotonic() - debut, 0.19)
+        self.assertEqual(resultat['stats']['envoyes'], 11)
+
+
+class OrangeTokenTests(TestCase):
+    def setUp(self):
+        _FauxOrange.reinitialiser()
+        self.serveur = ThreadingHTTPServer(('127.0.0.1', 0), _FauxOrange)
+        threading.Thread(target=self.serveur.serve_forever, daemon=True).start()
+        self.clients = []
+
+    def tearDown(self):
+        for client in self.clients:
+            client.fermer()
+        self.serveur.shutdown()
+        self.serveur.server_close()
+        _FauxOrange.reinitialiser()
+
+    def nouveau_client(self):
+        client = OrangeSmsClient(hote='127.0.0.1', port=self.serveur.server_address[1], https=False)
+        self.clients.append(client)
+        return client
+
+    def test_token_reutilise(self):
+        client = self.nouveau_client()
+        for i in range(3):
+            self.assertIn('adresse', client.send_sms(f'+26134000000{i}', 'OTP'))
+        self.assertEqual(_FauxOrange.appels, {'token': 1, 'sms': 3})
+
+        # token persisté : repris par un autre client (nouveau processus) sans appel OAuth
+        self.assertEqual(SmsOrangeToken.objects.get().token_access, 'jeton-1')
+        self.assertEqual(self.nouveau_client().token(), 'jeton-1')
+        self.assertEqual(_FauxOrange.appels['token'], 1)
+
+    def test_renouvele_a_expiration(self):
+        client = self.nouveau_client()
+        self.assertEqual(client.token(), 'jeton-1')
+        # expiration atteinte (marge comprise) : nouveau token, sans repasser par la base
+        client._token_expire_a = time.monotonic()
+        self.assertEqual(client.token(), 'jeton-2')
+        self.assertEqual(SmsOrangeToken.objects.get().token_access, 'jeton-2')
+
+        # token en base trop proche de son expiration : ignoré
+        SmsOrangeToken.objects.update(updated_at=timezone.now() - datetime.timedelta(seconds=3600 - 30))
+        self.assertEqual(self.nouveau_client().token(), 'jeton-3')
+
+    def test_validite_plus_courte_que_la_marge(self):
+        _FauxOrange.validite = 30
+        client = self.nouveau_client()
+        self.assertEqual(client.token(), 'jeton-1')
+        self.assertEqual(client.token(), 'jeton-2')
+
+    def test_token_revoque_renouvele_une_fois(self):
+        client = self.nouveau_client()
+        self.assertEqual(client.token(), 'jeton-1')
+        _FauxOrange.revoques = {'jeton-1'}
+
+        self.assertIn('adresse', client.send_sms('+261340000001', 'OTP'))
+        self.assertEqual((client.token(), _FauxOrange.appels), ('jeton-2', {'token': 2, 'sms': 1}))
+
+        # toujours refusé après renouvellement : pas de boucle
+        _FauxOrange.revoques = {'jeton-2', 'jeton-3'}
+        self.assertEqual(client.send_sms('+261340000001', 'OTP'), {'error': 401, 'message': 'Unauthorized'})
+        self.assertEqual(_FauxOrange.appels['token'], 3)
+
+
+@override_settings(INSTRUMENTATION_ECHANTILLON=1)
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        metriques.vider()
+        invalider_reference('services')
+        Service.objects.create(titre='Comptabilité')
+
+    def client_admin(self, is_staff):
+        user = User.objects.create_vendeur('admin@exemple.com', 'x') if is_staff else User.objects.create_user('U', 'u@exemple.com', 'x')
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+        return client
+
+    def test_server_timing_et_metriques(self):
+        premiere = self.client.get('/api/entreprises/services/liste/')
+        self.client.get('/api/entreprises/services/liste/')
+
+        self.assertIn('db;dur=', premiere['Server-Timing'])
+        self.assertIn('desc="1 requetes"', premiere['Server-Timing'])
+
+        reponse = self.client_admin(is_staff=True).get('/api/admin/metriques/')
+        self.assertEqual(reponse.status_code, 200)
+        services = reponse.json()['donnees']['service-list']
+        self.assertEqual(services['total'], 2)
+        self.assertEqual(services['requetes'], 0.5)
+        self.assertEqual(sum(classe['nombre'] for classe in services['histogramme']), 2)
+
+    def test_temps_de_representation_mesure(self):
+        Devise.objects.get_or_create(id=125, defaults={'nom_court': 'MGA', 'nom_long': 'Ariary', 'pays': 'MG'})
+        entreprise = Entreprise.objects.create(
+            nom_complet='E', email='e@exemple.com', mot_de_passe='x', numero_telephone='1', est_verifie=True, est_actif=True
+        )
+        token = AccessToken()
+        token['entreprise_id'] = entreprise.id
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        # chemin .values() + representer : aucun serializer.data n'est lu
+        with mock.patch.object(StockListSerializer, 'representer', side_effect=lambda *args: time.sleep(0.02) or []):
+            reponse = client.get('/api/stockes/stocks/')
+
+        self.assertEqual(reponse.status_code, 200)
+        duree = float(reponse['Server-Timing'].split('serializer;dur=')[1])
+        self.assertGreaterEqual(duree, 20)
+
+    def test_metriques_reservees_aux_administrateurs(self):
+        self.assertEqual(self.client_admin(is_staff=False).get('/api/admin/metriques/').status_code, 403)
+
+    @override_settings(INSTRUMENTATION_ECHANTILLON=0)
+    def test_sans_echantillonnage(self):
+        from django.test import Client
+
+        reponse = Client().get('/api/entreprises/services/liste/')
+        self.assertNotIn('Server-Timing', reponse)
+        self.assertEqual(metriques.exporter(), {})
+
+
+class RenduJSONTests(TestCase):
+    def test_rendu_identique_a_drf(self):
+        donnees = {
+            'message': 'Ligne\u2028suivante « ok »', 'success': True, 'pagination': {'limit': 2, 'next': None},
+            'donnees': [{
+                'montant': Decimal('1500.50'), 'quantite': Decimal('-3'), 'date_facture': datetime.date(2025, 1, 31),
+                'date_creation': datetime.datetime(2025, 1, 31, 8, 0, 0, 123456, tzinfo=datetime.timezone.utc),
+                'date_modification': datetime.datetime(2025, 1, 31, 8, 0), 'libelle': gettext_lazy('Oui'), 'ids': (1, 2),
+            }],
+            'grand': 2 ** 70,  # hors orjson : repli sur DRF
+        }
+        self.assertEqual(JSONRapideRenderer().render(donnees), JSONRenderer().render(donnees))
+        del donnees['grand']
+        self.assertEqual(JSONRapideRenderer().render(donnees), JSONRenderer().render(donnees))
+
+    def test_html_seulement_sur_demande(self):
+        url = reverse('stock-list')
+        self.assertEqual(self.client.get(url, HTTP_ACCEPT='text/html')['Content-Type'], 'application/json')
+        self.assertTrue(self.client.get(url, {'format': 'api'}, HTTP_ACCEPT='text/html')['Content-Type'].startswith('text/html'))
+
+    def test_erreurs_drf_dans_l_enveloppe(self):
+        reponse = self.client.get(reverse('stock-list'))
+
+        self.assertEqual(reponse.status_code, 403)
+        self.assertEqual(set(reponse.json()), {'message', 'success', 'donnees'})
+        self.assertIs(reponse.json()['success'], False)
+
+    def test_inscription_annulee_si_l_email_echoue(self):
+        donnees = {'email': 'nouveau@exemple.com', 'password': 'Motdepasse#2026', 'nom_complet': 'Nouveau'}
+        with mock.patch('apps.users.auth.envoyer_email', side_effect=SMTPException('indisponible')), \
+                self.assertLogs('helpers.reponses', 'ERROR'):
+            reponse = self.client.post(reverse('register-client'), donnees, format='json')
+
+        self.assertEqual(reponse.status_code, 500)
+        self.assertIs(reponse.json()['success'], False)
+        self.assertFalse(User.objects.filter(email='nouveau@exemple.com').exists())
+
+
+class GenerateurTenantTests(TestCase):
+    def generer(self, email):
+        generateur = GenerateurTenant(graine=4, taille_lot=7)
+        entreprise = generateur.entreprise(email, 'E')
+        profession = generateur.profession('P', {'Stocks': {'read': True}})
+        generateur.stocks(entreprise, 30)
+        generateur.employes(entreprise, 20, profession, part_comptes=0.5)
+        generateur.factures(entreprise, 40)
+        return entreprise
+
+    def contenu(self, entreprise):
+        return (
+            list(Stock.objects.filter(entreprise=entreprise).order_by('id').values_list('nom', 'quantite', 'unite', 'fournisseur', 'date_creation')),
+            list(Employe.objects.filter(entreprise=entreprise).order_by('id').values_list('renumeration', 'date_embauche', 'est_un_compte', 'date_creation')),
+            list(Facture.objects.filter(entreprise=entreprise).order_by('id').values_list('client', 'montant', 'date_facture', 'statut', 'date_creation')),
+        )
+
+    def test_insertion_en_masse_reproductible(self):
+        Devise.objects.get_or_create(id=125, defaults={'nom_court': 'MGA', 'nom_long': 'Ariary', 'pays': 'MG'})
+        premiere = self.generer('a@exemple.com')
+        stocks, employes, factures = self.contenu(premiere)
+
+        self.assertEqual((len(stocks), len(employes), len(factures)), (30, 20, 40))
+        comptes = EmployeCompte.objects.filter(employe__entreprise=premiere)
+        self.assertEqual(comptes.count(), sum(est_un_compte for _, _, est_un_compte, _ in employes))
+        self.assertTrue(all(compte.check_password('motdepasse') for compte in comptes[:2]))
+        self.assertTrue(all(comptes.values_list('est_actif', flat=True)))
+
+        # comptes actifs tirés au hasard, comme le seed d'origine
+        autre = GenerateurTenant(graine=5).entreprise('actifs@exemple.com', 'A')
+        GenerateurTenant(graine=5).employes(autre, 60, Profession.objects.get(nom='P'), part_comptes_actifs=0.5)
+        self.assertEqual(set(EmployeCompte.objects.filter(employe__entreprise=autre).values_list('est_actif', flat=True)), {True, False})
+        # champs absents des lignes : défauts du modèle, auto_now_add compris
+        facture = Facture.objects.filter(entreprise=premiere).first()
+        self.assertEqual((facture.motif, facture.cree_par_id), (None, None))
+        self.assertIsNotNone(facture.date_creation)
+        # date_creation étalée (tri et pagination réalistes), facture créée le jour de sa date
+        for lignes in (stocks, employes, factures):
+            self.assertGreater(len({ligne[-1] for ligne in lignes}), len(lignes) // 2)
+        self.assertTrue(all(date_creation.date() == date_facture for _, _, date_facture, _, date_creation in factures))
+        self.assertTrue(all(date_facture <= DATE_REFERENCE for _, _, date_facture, _, _ in factures))
+
+        # résumés reconstruits après l'insertion (pas de signaux)
+        resumes = set(ResumeFactureMensuel.objects.filter(entreprise=premiere).values_list('mois', 'statut', 'nombre'))
+        recalculer_resumes(premiere.id)
+        self.assertEqual(resumes, set(ResumeFactureMensuel.objects.filter(entreprise=premiere).values_list('mois', 'statut', 'nombre')))
+
+        # même graine, mêmes données
+        self.assertEqual(self.contenu(self.generer('b@exemple.com')), (stocks, employes, factures))
+
+
+class BenchmarkTests(TestCase):
+    def test_centile(self):
+        valeurs = list(range(1, 101))
+        self.assertEqual((centile(valeurs, 0), centile(valeurs, 50), centile(valeurs, 95), centile(valeurs, 100)), (1, 51, 95, 100))
+        self.assertEqual((centile([7], 50), centile([7], 99)), (7, 7))
+        self.assertEqual(centile([1, 2, 3], 50), 2)
+
+    def test_base_configuree_refusee(self):
+        base = str(connection.settings_dict['NAME'])
+        with self.assertRaisesMessage(CommandError, '--base-courante'):
+            call_command('benchmark_api', base=base, stdout=StringIO())
+        self.assertFalse(Entreprise.objects.filter(email__endswith='@benchmark.local').exists())
+
+    def test_comparer(self):
+        reference = {'scenarios': {
+            'a': {'p50_ms': 10.0, 'p95_ms': 20.0, 'requetes': 3},
+            'b': {'p50_ms': 10.0, 'p95_ms': 20.0, 'requetes': 3},
+            'c': {'p50_ms': 10.0, 'p95_ms': 20.0, 'requetes': 0},
+            'retire': {'p50_ms': 1.0},
+        }}
+        actuel = {'scenarios': {
+            'a': {'p50_ms': 10.5, 'p95_ms': 21.0, 'requetes': 3},  # dans le seuil
+            'b': {'p50_ms': 9.0, 'p95_ms': 30.0, 'requetes': 2},   # p95 +50 %
+            'c': {'p50_ms': 10.0, 'p95_ms': 20.0, 'requetes': 1},  # une requête de plus
+            'nouveau': {'p50_ms': 1.0},
+        }}
+        lignes, regressions = comparer(reference, actuel, seuil=10.0)
+
+        self.assertEqual(regressions, ['b', 'c'])
+        self.assertEqual({nom for nom, *_ in lignes}, {'a', 'b', 'c'})
+        self.assertIn(('a', 'p50_ms', 10.0, 10.5, 5.0), lignes)
+        self.assertIn(('b', 'requetes', 3, 2, -33.3), lignes)
+        # référence à 0 : pas de division par zéro
+        self.assertIn(('c', 'requetes', 0, 1, 100.0), lignes)
+        self.assertEqual(comparer(reference, actuel, seuil=60.0)[1], ['c'])
+
+    def test_tenant_benchmark_regenere_une_generation_interrompue(self):
+        Devise.objects.get_or_create(id=125, defaults={'nom_court': 'MGA', 'nom_long': 'Ariary', 'pays': 'MG'})
+        appels = []
+
+        def generer(email, nom):
+            appels.append(nom)
+            generateur = GenerateurTenant(graine=1)
+            entreprise = generateur.entreprise(email, nom)
+            if len(appels) == 1:
+                generateur.stocks(entreprise, 3)
+                raise RuntimeError('interruption')
+            generateur.stocks(entreprise, 5)
+            return entreprise
+
+        with self.assertRaises(RuntimeError):
+            tenant_benchmark('bench@exemple.com', 'Bench', generer)
+        partielle = Entreprise.objects.get(email='bench@exemple.com')
+        self.assertEqual(partielle.nom_complet, f'Bench{SUFFIXE_EN_COURS}')
+
+        entreprise, reutilisee = tenant_benchmark('bench@exemple.com', 'Bench', generer)
+        self.assertFalse(reutilisee)
+        self.assertFalse(Entreprise.objects.filter(id=partielle.id).exists())
+        self.assertEqual(Entreprise.objects.get(id=entreprise.id).nom_complet, 'Bench')
+        self.assertEqual(Stock.objects.filter(entreprise=entreprise).count(), 5)
+
+        self.assertEqual(tenant_benchmark('bench@exemple.com', 'Bench', generer), (entreprise, True))
+        self.assertEqual(len(appels), 2)
+
+
+class PurgeExpiresTests(TestCase):
+    def setUp(self):
+        Devise.objects.get_or_create(id=125, defaults={'nom_court': 'MGA', 'nom_long': 'Ariary', 'pays': 'MG'})
+        entreprise = Entreprise.objects.create(nom_complet='E', email='e@exemple.com', mot_de_passe='x', numero_telephone='1')
+        employe = Employe.objects.create(entreprise=entreprise, nom_complet='Rabe', email='rabe@exemple.com')
+        user = User.objects.create(nom_complet='U', email='u@exemple.com', password='x', numero_phone='1')
+        passe, futur = timezone.now() - datetime.timedelta(minutes=1), timezone.now() + datetime.timedelta(hours=1)
+        for i, expiration in enumerate([passe] * 7 + [futur] * 2):
+            EntrepriseOutstandingToken.objects.create(entreprise=entreprise, jti=f'e{i}', token='t', date_expiration=expiration)
+        for i, expiration in enumerate([passe] * 3 + [futur]):
+            EmployeOutstandingToken.objects.create(employe=employe, jti=f'm{i}', token='t', date_expiration=expiration)
+        for expiration in (passe, passe, futur):
+            EntrepriseOtp.objects.create(entreprise=entreprise, code_otp='123456', date_expiration=expiration)
+        for expiration, utilise in ((passe, False), (futur, True), (futur, False)):
+            EmployeOtp.objects.create(employe=employe, code_otp='123456', date_expiration=expiration, utilise=utilise)
+        for expiration in (passe, futur):
+            UserOtp.objects.create(user=user, code_otp='123456', expirer_le=expiration)
+
+    def restants(self):
+        return [
+            EntrepriseOutstandingToken.objects.count(), EmployeOutstandingToken.objects.count(),
+            EntrepriseOtp.objects.count(), EmployeOtp.objects.count(), UserOtp.objects.count(),
+        ]
+
+    def test_suppression_par_lots_bornes(self):
+        expires = EntrepriseOutstandingToken.objects.filter(date_expiration__lte=timezone.now())
+        with CaptureQueriesContext(connection) as requetes, mock.patch('helpers.purge.time.sleep') as pause:
+            self.assertEqual(purger_par_lots(expires, taille_lot=3, pause=0.5), 7)
+
+        suppressions = [requete['sql'] for requete in requetes if requete['sql'].startswith('DELETE')]
+        # 3 + 3 + 1 lignes, chacune dans sa transaction ; pause entre deux lots pleins seulement
+        self.assertEqual([sql.count(',') + 1 for sql in suppressions], [3, 3, 1])
+        self.assertEqual(pause.call_count, 2)
+        self.assertEqual(EntrepriseOutstandingToken.objects.count(), 2)
+        self.assertEqual(purger_par_lots(expires, taille_lot=3), 0)
+
+    def test_purger_expires(self):
+        rapport = purger_expires(taille_lot=2)
+
+        self.assertEqual([(table, supprimes) for table, supprimes, _ in rapport], [
+            ('entrepriseoutstandingtoken', 7), (EmployeOutstandingToken._meta.db_table, 3), ('entrepriseotp', 2),
+            (EmployeOtp._meta.db_table, 2), ('userotp', 1),
+        ])
+        self.assertEqual(self.restants(), [2, 1, 1, 1, 1])
+        # OTP employé encore valide mais déjà utilisé : purgé
+        self.assertFalse(EmployeOtp.objects.filter(utilise=True).exists())
+
+    def test_commande(self):
+        sortie = StringIO()
+        call_command('purge_expired', '--taille-lot', '4', stdout=sortie)
+
+        self.assertIn('✅ 15 lignes supprimées', sortie.getvalue())
+        self.assertEqual(self.restants(), [2, 1, 1, 1, 1])
@@ -1,7 +1,7 @@
 from django.urls import path
 from apps.users.views import (
     ProfileView, LogoutView, ProfileUpdateView, UserVerifyOtpView, UserMotDePasseOublieView,
-    UserResetPasswordView, ContactSupportView, ResendOTPVerificationView,
+    UserResetPasswordView, ContactSupportView, ResendOTPVerificationView, MetriquesView,
 )
 from apps.users.auth import (
     RegisterView, LoginView, GoogleCallbackUserView, GoogleAuthUrlView
@@ -20,4 +20,5 @@ urlpatterns = [
     path('user/mot-de-passe/oublier/', UserMotDePasseOublieView.as_view(), name='user-mot-de-passe-oublier'),  # POST
     path('user/mot-de-passe/reset/', UserResetPasswordView.as_view(), name='user-reset-password'),  # POST
     path('contact-support/', ContactSupportView.as_view(), name='contact-support'),  # POST
+    path('metriques/', MetriquesView.as_view(), name='metriques'),  # GET, DELETE
 ]
\ No newline at end of file
@@ -2,7 +2,7 @@ from rest_framework import status
 from rest_framework.permissions import AllowAny
 from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework_simplejwt.tokens import TokenError
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.request import Request
@@ -17,7 +17,6 @@ from datetime import timedelta, datetime
 from bleach.sanitizer import Cleaner
 from dotenv import load_dotenv
 import os
-import traceback
 import random
 import string
 from uuid import uuid4
@@ -26,6 +25,8 @@ from apps.users.serializers import UserSerializer
 from apps.users.models import User, UserOtp
 from helpers.services.emails import envoyer_email
 from helpers.helper import generate_jwt_token, enc_dec, decode_jwt_token
+from helpers.metriques import metriques
+from helpers.reponses import erreur_serveur
 
 load_dotenv()
 
@@ -65,7 +66,7 @@ class ProfileView(APIView):
                 )
             return Response(user, status=status.HTTP_200_OK)
         except Exception as e:
-            return Response({"error": f"{str(e)}: {str(traceback.format_exc())}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
 class ProfileUpdateView(APIView):
     permission_classes = [IsAuthenticated]
@@ -102,7 +103,7 @@ class ProfileUpdateView(APIView):
                 return Response(UserSerializer(user, context={'request': request}).data, status=status.HTTP_200_OK)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            return Response({"error": f"{str(e)}: {str(traceback.format_exc())}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
 class LogoutView(APIView):
     permission_classes = [IsAuthenticated]
@@ -144,7 +145,7 @@ class LogoutView(APIView):
         except User.DoesNotExist:
             return Response({'erreur': 'Utilisateur non trouvé'}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
-            return Response({'erreur': f"{str(e)}: {str(traceback.format_exc())}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
 class ResendOTPVerificationView(APIView):
     permission_classes = [AllowAny]
@@ -236,7 +237,7 @@ class ResendOTPVerificationView(APIView):
 
             return Response({"email": user.email, 'message': f"Un code OTP de vérification a été envoyé à {user.email}"}, status=status.HTTP_200_OK)
         except Exception as e:
-            return Response({"erreur": f"{str(e)}: {str(traceback.format_exc())}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
 class UserVerifyOtpView(APIView):
     permission_classes = [AllowAny]
@@ -335,7 +336,7 @@ class UserVerifyOtpView(APIView):
                 "access": str(refresh.access_token)
             }, status=status.HTTP_200_OK)
         except Exception as e:
-            return Response({"erreur": f"{str(e)}: {str(traceback.format_exc())}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
 class UserMotDePasseOublieView(APIView):
     permission_classes = [AllowAny]
@@ -400,7 +401,7 @@ class UserMotDePasseOublieView(APIView):
 
             return Response({"message": "Email de réinitialisation envoyé"}, status=status.HTTP_200_OK)
         except Exception as e:
-            return Response({"erreur": f"{str(e)}: {str(traceback.format_exc())}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
 class UserResetPasswordView(APIView):
     permission_classes = [AllowAny]
@@ -465,7 +466,7 @@ class UserResetPasswordView(APIView):
         except User.DoesNotExist:
             return Response({"erreur": "Utilisateur introuvable"}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
-            return Response({"erreur": f"{str(e)}: {str(traceback.format_exc())}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return erreur_serveur(e)
 
 class ContactSupportView(APIView):
     permission_classes = [AllowAny]
@@ -560,4 +561,38 @@ class ContactSupportView(APIView):
 
             return Response({'message': 'Votre message a été envoyé avec succès au support.'}, status=status.HTTP_200_OK)
         except Exception as e:
-            return Response({'erreur': f"{str(e)}: {str(traceback.format_exc())}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            return erreur_serveur(e)
+
+class MetriquesView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        tags=['Admin'],
+        responses={
+            200: openapi.Response('Métriques par URL', openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'message': openapi.Schema(type=openapi.TYPE_STRING),
+                    'success': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                    'donnees': openapi.Schema(type=openapi.TYPE_OBJECT, description="Par nom d'URL : total, centiles, SQL, histogramme")
+                }
+            )),
+            403: 'Réservé aux administrateurs'
+        },
+        operation_description="Durées (p50/p95/p99, histogramme), temps SQL et sérialisation des requêtes échantillonnées, par nom d'URL."
+    )
+    def get(self, request):
+        return Response({
+            'message': 'Métriques récupérées avec succès.',
+            'success': True,
+            'donnees': metriques.exporter()
+        }, status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(tags=['Admin'], operation_description="Remettre les métriques à zéro.")
+    def delete(self, request):
+        metriques.vider()
+        return Response({
+            'message': 'Métriques réinitialisées.',
+            'success': True,
+            'donnees': {}
+        }, status=status.HTTP_200_OK)
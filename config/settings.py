@@ -49,6 +49,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'helpers.middleware.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -84,6 +85,9 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # base de test sur fichier : les écritures concurrentes attendent le verrou au lieu d'échouer
+        # (la base en mémoire partagée lève "table is locked" dès qu'un second thread écrit)
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
@@ -139,15 +143,23 @@ AUTHENTICATION_BACKENDS = ['apps.users.backends.EmailBackend']
 
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'helpers.renderers.JSONRapideRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer',
     ],
+    # API navigable uniquement avec ?format=api
+    'DEFAULT_CONTENT_NEGOTIATION_CLASS': 'helpers.renderers.NegociationExplicite',
+    # erreurs DRF (401/403/404/405/validation) dans l'enveloppe {"message", "success", "donnees"}
+    'EXCEPTION_HANDLER': 'helpers.reponses.gestionnaire_exceptions',
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
+    'PAGE_SIZE': int(os.getenv('PAGE_SIZE', 50)),
 }
 
+# Taille de page maximale acceptée pour ?limit= sur les listes paginées
+PAGINATION_LIMITE_MAX = 500
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 SIMPLE_JWT = {
@@ -163,6 +175,33 @@ SIMPLE_JWT = {
     'JTI_CLAIM': 'jti',
 }
 
+# Durée (secondes) de mise en cache des principaux résolus (entreprise/employé) par jti
+PRINCIPAL_CACHE_TTL = int(os.getenv('PRINCIPAL_CACHE_TTL', 300))
+
+# Durée (secondes) de mise en cache des droits compilés (Acces.permissions) par profession
+ACCES_CACHE_TTL = int(os.getenv('ACCES_CACHE_TTL', 300))
+
+# Listes de référence (devises, préfixes, services, plans, professions) : JSON pré-rendu
+# en mémoire (secondes) et Cache-Control max-age envoyé aux clients
+REFERENCE_CACHE_TTL = int(os.getenv('REFERENCE_CACHE_TTL', 3600))
+REFERENCE_CACHE_MAX_AGE = int(os.getenv('REFERENCE_CACHE_MAX_AGE', 300))
+
+# Instrumentation des requêtes (SQL, vue, serializer, Server-Timing) : fraction échantillonnée
+# (0 = désactivée, 1 = toutes) et nombre de mesures gardées par nom d'URL
+INSTRUMENTATION_ECHANTILLON = float(os.getenv('INSTRUMENTATION_ECHANTILLON', 0))
+INSTRUMENTATION_FENETRE = int(os.getenv('INSTRUMENTATION_FENETRE', 1000))
+
+# Index des tokens révoqués : resynchronisation depuis la base par le planificateur des processus serveur
+# (secondes, 0 = désactivée : l'index est chargé au premier contrôle puis alimenté par les seuls signaux
+# du processus, à activer dès que plusieurs processus servent l'API) et dimension du filtre de Bloom
+REVOCATION_RESYNC = int(os.getenv('REVOCATION_RESYNC', 0))
+REVOCATION_BLOOM_BITS = 1 << 20
+REVOCATION_BLOOM_HACHAGES = 7
+
+# Purge des tokens/OTP expirés : taille des lots et intervalle (secondes) du planificateur en processus (0 = désactivé)
+PURGE_TAILLE_LOT = int(os.getenv('PURGE_TAILLE_LOT', 1000))
+PURGE_INTERVALLE = int(os.getenv('PURGE_INTERVALLE', 0))
+
 
 CORS_ALLOWED_ORIGINS = [
     "http://*",
@@ -206,12 +245,60 @@ CSRF_TRUSTED_ORIGINS = [
 
 CORS_ALLOW_PRIVATE_NETWORK = True
 
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
-EMAIL_HOST = 'smtp.gmail.com'
-EMAIL_PORT = 465
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = os.getenv('EMAIL_HOST', 'smtp.gmail.com')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', 465))
 EMAIL_USE_TLS = False
-EMAIL_USE_SSL = True
+EMAIL_USE_SSL = os.getenv('EMAIL_USE_SSL', 'True') == 'True'
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 
+# File d'envoi des emails (table emailsortant) : workers en processus, démarrés par le serveur (wsgi/asgi)
+# et réveillés par le planificateur toutes les EMAIL_FILE_ATTENTE secondes (0 = uniquement via la commande
+# envoyer_emails), taille des lots par connexion SMTP, tentatives et délai de base (secondes) du backoff exponentiel
+EMAIL_FILE_WORKERS = int(os.getenv('EMAIL_FILE_WORKERS', 0))
+EMAIL_FILE_TAILLE_LOT = 50
+EMAIL_FILE_MAX_TENTATIVES = 5
+EMAIL_FILE_DELAI_BASE = 30
+EMAIL_FILE_ATTENTE = 10
+EMAIL_FILE_DELAI_VERROU = 600
+
+# Envoi SMS en masse (Orange) : requêtes simultanées et débit autorisé par le contrat (SMS/seconde, rafale)
+ORANGE_SMS_CONCURRENCE = int(os.getenv('ORANGE_SMS_CONCURRENCE', 8))
+ORANGE_SMS_DEBIT = float(os.getenv('ORANGE_SMS_DEBIT', 5))
+ORANGE_SMS_RAFALE = int(os.getenv('ORANGE_SMS_RAFALE', 5))
+
+# Journal des mouvements de stock : taille des lots d'insertion et intervalle (secondes) d'écriture en tâche de fond.
+# 0 = écrits dans la transaction de la mise à jour du stock (aucune perte possible). > 0 = tampon en mémoire
+# écrit par lots, moins d'écritures par requête mais les mouvements en tampon sont perdus si le processus est tué
+MOUVEMENTS_TAILLE_LOT = int(os.getenv('MOUVEMENTS_TAILLE_LOT', 200))
+MOUVEMENTS_INTERVALLE = float(os.getenv('MOUVEMENTS_INTERVALLE', 0))
+
+# Durée (secondes) de validité du compteur de stocks en rupture par entreprise
+STOCK_ALERTES_CACHE_TTL = int(os.getenv('STOCK_ALERTES_CACHE_TTL', 60))
+
+# Import CSV/XLSX des stocks : nombre de lignes écrites par bulk_create/bulk_update
+STOCK_IMPORT_TAILLE_LOT = int(os.getenv('STOCK_IMPORT_TAILLE_LOT', 500))
+
+# Exports CSV/XLSX : lignes lues par aller-retour du curseur serveur
+EXPORT_TAILLE_LOT = int(os.getenv('EXPORT_TAILLE_LOT', 2000))
+
+# Numérotation automatique des factures : 'continue' (sans trou, réservée dans la transaction de création)
+# ou 'bloc' (trous possibles, FACTURE_NUMEROTATION_BLOC numéros réservés d'un coup par processus)
+FACTURE_NUMEROTATION = os.getenv('FACTURE_NUMEROTATION', 'continue')
+FACTURE_NUMEROTATION_BLOC = int(os.getenv('FACTURE_NUMEROTATION_BLOC', 20))
+
+# Passage des factures 'envoyee' échues au statut 'echue' : taille des lots et intervalle (secondes)
+# du planificateur en processus (0 = désactivé, utiliser la commande basculer_factures_echues)
+FACTURES_ECHUES_TAILLE_LOT = int(os.getenv('FACTURES_ECHUES_TAILLE_LOT', 500))
+FACTURES_ECHUES_INTERVALLE = int(os.getenv('FACTURES_ECHUES_INTERVALLE', 0))
+
+# Rendu PDF dans un pool de processus ; PDF des factures en cache disque, nommés par le sha256
+# de leur contenu (facture, entreprise, gabarit). Dépendance optionnelle : weasyprint>=60
+# (pip install weasyprint, plus pango côté système) ; sans elle, les vues PDF répondent 503.
+PDF_PROCESSUS = int(os.getenv('PDF_PROCESSUS', 2))
+FACTURE_PDF_DOSSIER = os.getenv('FACTURE_PDF_DOSSIER', os.path.join(MEDIA_ROOT, 'factures', 'pdf'))
+FACTURE_PDF_LOT = int(os.getenv('FACTURE_PDF_LOT', 20))
+FACTURE_PDF_TIMEOUT = int(os.getenv('FACTURE_PDF_TIMEOUT', 60))
+
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
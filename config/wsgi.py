@@ -14,3 +14,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+# tâches de fond (planificateur, workers d'envoi des emails) : uniquement dans les processus qui servent les requêtes
+from helpers import planificateur
+from helpers.services.emails import demarrer_workers
+
+demarrer_workers()
+planificateur.demarrer()
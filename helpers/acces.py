@@ -0,0 +1,77 @@
+import threading
+import unicodedata
+from types import MappingProxyType
+
+from django.conf import settings
+
+from helpers.cache import TTLCache
+
+# Acces.permissions = {"read": true, "write": true, "delete": false} : une action = un bit
+LECTURE, ECRITURE, SUPPRESSION = 1, 2, 4
+ACTIONS = {
+    'read': LECTURE, 'lecture': LECTURE,
+    'write': ECRITURE, 'ecriture': ECRITURE,
+    'delete': SUPPRESSION, 'suppression': SUPPRESSION,
+}
+ACTIONS_METHODES = {
+    'GET': LECTURE, 'HEAD': LECTURE, 'OPTIONS': LECTURE,
+    'POST': ECRITURE, 'PUT': ECRITURE, 'PATCH': ECRITURE,
+    'DELETE': SUPPRESSION,
+}
+
+AUCUN_ACCES = MappingProxyType({})
+
+# Droits compilés par profession (ressource -> masque). Les signaux vident le cache du
+# processus ; le TTL borne l'écart avec les autres workers.
+_CACHE = TTLCache(ttl=settings.ACCES_CACHE_TTL)
+_generation = 0
+_VERROU = threading.Lock()
+
+
+def ressource(titre):
+    """'Employés' -> 'employes' : le titre de l'Acces sert de nom de ressource."""
+    sans_accents = unicodedata.normalize('NFKD', titre).encode('ascii', 'ignore').decode()
+    return sans_accents.strip().lower()
+
+
+def compiler(acces):
+    """Fusionne (OU) les permissions d'une liste d'Acces en {ressource: masque} figé."""
+    droits = {}
+    for un_acces in acces:
+        masque = 0
+        for action, autorise in (un_acces.permissions or {}).items():
+            if autorise is True:
+                masque |= ACTIONS.get(action, 0)
+        cle = ressource(un_acces.titre)
+        droits[cle] = droits.get(cle, 0) | masque
+    return MappingProxyType(droits)
+
+
+def droits_profession(profession_id):
+    if profession_id is None:
+        return AUCUN_ACCES
+    droits = _CACHE.get(profession_id)
+    if droits is None:
+        from apps.employe.models import Acces
+
+        generation = _generation
+        droits = compiler(Acces.objects.filter(professions=profession_id).only('titre', 'permissions'))
+        with _VERROU:
+            # pas de mise en cache d'un résultat lu avant une invalidation concurrente
+            if generation == _generation:
+                _CACHE.set(profession_id, droits)
+    return droits
+
+
+def est_autorise(profession_id, nom_ressource, action):
+    return bool(droits_profession(profession_id).get(nom_ressource, 0) & action)
+
+
+def invalider_acces(profession_id=None):
+    global _generation
+    with _VERROU:
+        _generation += 1
+        if profession_id is None:
+            _CACHE.clear()
+        else:
+            _CACHE.delete(profession_id)
@@ -0,0 +1,224 @@
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+
+import django
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone as django_timezone
+
+from apps.employe.tokens import EmployeRefreshToken
+from apps.entreprise.models import Entreprise
+from apps.entreprise.tokens import EntrepriseRefreshToken
+from apps.finance.models import Facture
+from apps.stock.models import Stock
+from helpers.metriques import centile
+
+
+@dataclass
+class Scenario:
+    nom: str
+    url: str  # nom d'URL Django
+    principal: str = 'entreprise'  # 'entreprise', 'employe' ou 'anonyme'
+    parametres: dict = field(default_factory=dict)
+    arguments: tuple = ()  # clés du contexte passées à reverse() (ex. ('facture_id',))
+    iterations: int = None  # défaut : --iterations de la commande
+
+
+SCENARIOS = [
+    Scenario('stocks', 'stock-list'),
+    Scenario('stocks-employe', 'stock-list', principal='employe'),
+    Scenario('stocks-rupture', 'stock-list', parametres={'rupture': 1}),
+    Scenario('stocks-recherche', 'stock-list', parametres={'q': 'Article 00042'}),
+    Scenario('stocks-alertes', 'stock-alertes'),
+    Scenario('stock-detail', 'stock-detail', arguments=('stock_id',)),
+    Scenario('stock-historique', 'stock-historique', arguments=('stock_id',)),
+    Scenario('stocks-export', 'stock-export', iterations=3),
+    Scenario('factures', 'facture-list'),
+    Scenario('factures-employe', 'facture-list', principal='employe'),
+    Scenario('factures-statut', 'facture-list', parametres={'statut': 'payee'}),
+    Scenario('factures-echues', 'facture-list', parametres={'echue': 1}),
+    Scenario('factures-recherche', 'facture-list', parametres={'q': 'Shoprite'}),
+    Scenario('factures-analytique', 'facture-analytique'),
+    Scenario('facture-detail', 'facture-detail', arguments=('facture_id',)),
+    Scenario('employes', 'employe:employe_list_by_entreprise'),
+    Scenario('professions', 'employe:profession_list', principal='anonyme'),
+    Scenario('devises', 'entreprise:devises_list', principal='anonyme'),
+    Scenario('prefixes', 'entreprise:prefix_telephones_list', principal='anonyme'),
+]
+
+
+# nom provisoire d'une entreprise de benchmark tant que sa génération n'est pas terminée
+SUFFIXE_EN_COURS = ' (génération en cours)'
+
+
+def tenant_benchmark(email, nom, generer):
+    """
+    Entreprise de benchmark générée une fois puis réutilisée. `generer(email, nom)` la crée et la
+    remplit sous un nom provisoire, remplacé par `nom` à la fin seulement : une génération
+    interrompue est détectée, supprimée puis refaite. Renvoie (entreprise, réutilisée).
+    """
+    existante = Entreprise.objects.filter(email=email).first()
+    if existante is not None:
+        if existante.nom_complet == nom:
+            return existante, True
+        existante.delete()
+    entreprise = generer(email, f"{nom}{SUFFIXE_EN_COURS}")
+    Entreprise.objects.filter(id=entreprise.id).update(nom_complet=nom)
+    entreprise.nom_complet = nom
+    return entreprise, False
+
+
+def base_benchmark(nom=None):
+    """
+    Bascule la connexion par défaut sur une base jetable : `nom`, sinon la base de test
+    (DATABASES['default']['TEST']['NAME']). Créée et migrée au besoin, conservée d'une exécution
+    à l'autre (keepdb) pour réutiliser les entreprises déjà générées. Renvoie son nom.
+    La base configurée (développement) est refusée : ValueError.
+    """
+    connexion = connections[DEFAULT_DB_ALIAS]
+    if nom is not None:
+        if str(nom) == str(connexion.settings_dict['NAME']):
+            raise ValueError(f"{nom} est la base configurée, pas une base jetable")
+        connexion.settings_dict['TEST']['NAME'] = nom
+    return connexion.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False, keepdb=True)
+
+
+class CompteurRequetes:
+    """execute_wrapper : nombre de requêtes SQL, sans le coût de CaptureQueriesContext."""
+
+    def __init__(self):
+        self.nombre = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.nombre += 1
+        return execute(sql, params, many, context)
+
+
+def mesurer(appel, iterations=30, echauffement=3):
+    """
+    Mesure `appel()` comme pytest-benchmark : échauffement, puis `iterations` exécutions chronométrées
+    (latence en ms, requêtes SQL), puis une exécution sous tracemalloc pour le pic mémoire.
+    """
+    for _ in range(echauffement):
+        appel()
+
+    durees, requetes = [], []
+    for _ in range(iterations):
+        compteur = CompteurRequetes()
+        with ExitStack() as pile:
+            for connexion in connections.all():
+                pile.enter_context(connexion.execute_wrapper(compteur))
+            debut = time.perf_counter()
+            resultat = appel()
+            durees.append((time.perf_counter() - debut) * 1000)
+        requetes.append(compteur.nombre)
+
+    tracemalloc.start()
+    try:
+        appel()
+        _, pic = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    durees.sort()
+    return {
+        'iterations': iterations,
+        'p50_ms': round(centile(durees, 50), 3),
+        'p95_ms': round(centile(durees, 95), 3),
+        'p99_ms': round(centile(durees, 99), 3),
+        'moyenne_ms': round(statistics.fmean(durees), 3),
+        'min_ms': round(durees[0], 3),
+        'max_ms': round(durees[-1], 3),
+        'requetes': max(requetes),
+        'memoire_pic_ko': round(pic / 1024, 1),
+        'resultat': resultat,
+    }
+
+
+def clients_benchmark(entreprise, employe=None):
+    """Clients de test authentifiés par de vrais JWT (EntrepriseRefreshToken / EmployeRefreshToken)."""
+    clients = {'anonyme': Client(HTTP_HOST='localhost')}
+    jeton = EntrepriseRefreshToken.for_entreprise(entreprise).access_token
+    clients['entreprise'] = Client(HTTP_HOST='localhost', HTTP_AUTHORIZATION=f'Bearer {jeton}')
+    if employe is not None:
+        jeton = EmployeRefreshToken.for_employe(employe).access_token
+        clients['employe'] = Client(HTTP_HOST='localhost', HTTP_AUTHORIZATION=f'Bearer {jeton}')
+    return clients
+
+
+def contexte_benchmark(entreprise):
+    return {
+        'stock_id': Stock.objects.filter(entreprise=entreprise).order_by('id').values_list('id', flat=True).first(),
+        'facture_id': Facture.objects.filter(entreprise=entreprise).order_by('id').values_list('id', flat=True).first(),
+    }
+
+
+def _appel(client, url, parametres):
+    def appel():
+        reponse = client.get(url, parametres)
+        if reponse.streaming:
+            for _ in reponse.streaming_content:
+                pass
+        return reponse.status_code
+    return appel
+
+
+def executer(scenarios, clients, contexte, iterations=30, echauffement=3):
+    resultats = {}
+    for scenario in scenarios:
+        if scenario.principal not in clients or any(contexte.get(cle) is None for cle in scenario.arguments):
+            continue
+        url = reverse(scenario.url, args=[contexte[cle] for cle in scenario.arguments])
+        mesure = mesurer(
+            _appel(clients[scenario.principal], url, scenario.parametres),
+            iterations=scenario.iterations or iterations, echauffement=echauffement
+        )
+        mesure['statut'] = mesure.pop('resultat')
+        mesure['url'] = url
+        resultats[scenario.nom] = mesure
+    return resultats
+
+
+def _commit_git():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def meta_benchmark(tailles):
+    return {
+        'date': django_timezone.now().isoformat(),
+        'commit': _commit_git(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'base': connection.vendor,
+        'tailles': tailles,
+    }
+
+
+def comparer(reference, actuel, seuil=10.0):
+    """Lignes (scénario, métrique, avant, après, écart %) et scénarios en régression au-delà de `seuil` %."""
+    lignes, regressions = [], set()
+    for nom, mesure in actuel['scenarios'].items():
+        avant = reference['scenarios'].get(nom)
+        if avant is None:
+            continue
+        for metrique in ('p50_ms', 'p95_ms', 'p99_ms', 'requetes', 'memoire_pic_ko'):
+            ancien, nouveau = avant.get(metrique), mesure.get(metrique)
+            if ancien is None or nouveau is None:
+                continue
+            ecart = (nouveau - ancien) / ancien * 100 if ancien else (0.0 if nouveau == ancien else 100.0)
+            lignes.append((nom, metrique, ancien, nouveau, round(ecart, 1)))
+            # les requêtes SQL sont déterministes : toute hausse est une régression
+            if (metrique == 'requetes' and nouveau > ancien) or (metrique in ('p50_ms', 'p95_ms') and ecart > seuil):
+                regressions.add(nom)
+    return lignes, sorted(regressions)
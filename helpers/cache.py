@@ -0,0 +1,44 @@
+from collections import OrderedDict
+import threading
+import time
+
+
+class TTLCache:
+    """Cache en mémoire (par processus) avec expiration et éviction LRU."""
+
+    def __init__(self, ttl: float, taille_max: int = 10000):
+        self.ttl = ttl
+        self.taille_max = taille_max
+        self._donnees = OrderedDict()
+        self._verrou = threading.Lock()
+
+    def get(self, cle, defaut=None):
+        with self._verrou:
+            entree = self._donnees.get(cle)
+            if entree is None:
+                return defaut
+            valeur, expire_a = entree
+            if expire_a <= time.monotonic():
+                del self._donnees[cle]
+                return defaut
+            self._donnees.move_to_end(cle)
+            return valeur
+
+    def set(self, cle, valeur, ttl: float = None):
+        duree = self.ttl if ttl is None else ttl
+        with self._verrou:
+            self._donnees[cle] = (valeur, time.monotonic() + duree)
+            self._donnees.move_to_end(cle)
+            while len(self._donnees) > self.taille_max:
+                self._donnees.popitem(last=False)
+
+    def delete(self, cle):
+        with self._verrou:
+            self._donnees.pop(cle, None)
+
+    def clear(self):
+        with self._verrou:
+            self._donnees.clear()
+
+    def __len__(self):
+        return len(self._donnees)
@@ -0,0 +1,31 @@
+from drf_yasg import openapi
+
+
+class ChampsInvalides(ValueError):
+    pass
+
+
+PARAMETRE_CHAMPS = openapi.Parameter(
+    'fields', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False,
+    description="Champs à renvoyer, séparés par des virgules (ex. id,nom,quantite) ; tous par défaut",
+)
+
+
+def champs_demandes(request, serializer):
+    """
+    Champs de `?fields=` validés contre ceux du serializer (liste blanche) ;
+    None sans paramètre : tous les champs.
+    """
+    valeur = request.GET.get('fields')
+    if valeur is None:
+        return None
+    champs = [champ.strip() for champ in valeur.split(',') if champ.strip()]
+    if not champs:
+        raise ChampsInvalides("Paramètre 'fields' invalide.")
+    autorises = serializer.champs_autorises()
+    inconnus = [champ for champ in champs if champ not in autorises]
+    if inconnus:
+        raise ChampsInvalides(
+            f"Champs inconnus : {', '.join(inconnus)}. Champs disponibles : {', '.join(autorises)}."
+        )
+    return tuple(dict.fromkeys(champs))
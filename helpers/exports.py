@@ -0,0 +1,96 @@
+import csv
+import tempfile
+from datetime import datetime
+
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone as django_timezone
+from drf_yasg import openapi
+
+try:
+    from openpyxl import Workbook
+except ImportError:  # XLSX optionnel
+    Workbook = None
+
+FORMATS_EXPORT = ('csv', 'xlsx')
+
+PARAMETRE_FORMAT_EXPORT = openapi.Parameter(
+    'type', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=list(FORMATS_EXPORT), required=False,
+    description="Format du fichier (défaut: csv)"
+)
+
+
+class ExportInvalide(ValueError):
+    pass
+
+
+class _Tampon:
+    """Pseudo-fichier pour csv.writer : chaque écriture est renvoyée telle quelle, rien n'est gardé."""
+
+    def write(self, valeur):
+        return valeur
+
+
+def _est_formule(valeur):
+    if valeur[:1] in ('=', '@'):
+        return True
+    # '+261', '-5' : numéros et nombres laissés tels quels
+    return valeur[:1] in ('+', '-') and not valeur[1:].replace(' ', '').isdigit()
+
+
+def _texte(valeur):
+    if valeur is None:
+        return ''
+    if isinstance(valeur, datetime):
+        return django_timezone.localtime(valeur).isoformat() if django_timezone.is_aware(valeur) else valeur.isoformat()
+    if isinstance(valeur, str) and _est_formule(valeur):
+        # évite l'interprétation en formule par les tableurs
+        return "'" + valeur
+    return valeur
+
+
+def _cellule(valeur):
+    if isinstance(valeur, datetime) and django_timezone.is_aware(valeur):
+        # Excel ne gère pas les fuseaux horaires
+        return django_timezone.make_naive(valeur)
+    return _texte(valeur) if isinstance(valeur, str) else valeur
+
+
+def _flux_csv(entetes, lignes):
+    ecrivain = csv.writer(_Tampon(), delimiter=';')
+    yield '﻿' + ecrivain.writerow(entetes)  # BOM : accents lisibles sous Excel
+    for ligne in lignes:
+        yield ecrivain.writerow([_texte(valeur) for valeur in ligne])
+
+
+def reponse_csv(nom_fichier, entetes, lignes):
+    reponse = StreamingHttpResponse(_flux_csv(entetes, lignes), content_type='text/csv; charset=utf-8')
+    reponse['Content-Disposition'] = f'attachment; filename="{nom_fichier}.csv"'
+    return reponse
+
+
+def reponse_xlsx(nom_fichier, entetes, lignes):
+    """Classeur en mode write_only écrit dans un fichier temporaire puis envoyé par blocs."""
+    if Workbook is None:
+        raise ExportInvalide("Export XLSX indisponible (openpyxl non installé), utilisez le format CSV.")
+    classeur = Workbook(write_only=True)
+    feuille = classeur.create_sheet(nom_fichier[:31])
+    feuille.append(entetes)
+    for ligne in lignes:
+        feuille.append([_cellule(valeur) for valeur in ligne])
+    fichier = tempfile.TemporaryFile()
+    classeur.save(fichier)
+    fichier.seek(0)
+    return FileResponse(
+        fichier, as_attachment=True, filename=f"{nom_fichier}.xlsx",
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+
+
+def reponse_export(request, nom_fichier, entetes, lignes):
+    """`lignes` est un itérable paresseux (queryset.iterator()) : jamais matérialisé en mémoire."""
+    format_export = request.GET.get('type', 'csv').lower()
+    if format_export not in FORMATS_EXPORT:
+        raise ExportInvalide(f"Format d'export invalide (valeurs possibles: {', '.join(FORMATS_EXPORT)}).")
+    if format_export == 'xlsx':
+        return reponse_xlsx(nom_fichier, entetes, lignes)
+    return reponse_csv(nom_fichier, entetes, lignes)
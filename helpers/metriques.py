@@ -0,0 +1,76 @@
+import threading
+from collections import deque
+
+from django.conf import settings
+
+# bornes supérieures (ms) des classes de l'histogramme des durées
+BORNES_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+
+class _Serie:
+    """Dernières mesures d'une URL (fenêtre glissante) et total depuis le démarrage."""
+
+    def __init__(self, fenetre):
+        self.mesures = deque(maxlen=fenetre)
+        self.total = 0
+
+
+class Metriques:
+    def __init__(self):
+        self._series = {}
+        self._verrou = threading.Lock()
+
+    def enregistrer(self, nom_url, mesure):
+        with self._verrou:
+            serie = self._series.get(nom_url)
+            if serie is None:
+                serie = self._series[nom_url] = _Serie(settings.INSTRUMENTATION_FENETRE)
+            serie.mesures.append((mesure.total, mesure.vue, mesure.db, mesure.requetes, mesure.serializer, mesure.statut))
+            serie.total += 1
+
+    def vider(self):
+        with self._verrou:
+            self._series.clear()
+
+    def exporter(self):
+        with self._verrou:
+            instantanes = {nom: (list(serie.mesures), serie.total) for nom, serie in self._series.items()}
+        return {nom: _resumer(mesures, total) for nom, (mesures, total) in sorted(instantanes.items())}
+
+
+def centile(valeurs_triees, pourcentage):
+    index = min(int(round(pourcentage / 100 * (len(valeurs_triees) - 1))), len(valeurs_triees) - 1)
+    return valeurs_triees[index]
+
+
+def _moyenne(valeurs):
+    return round(sum(valeurs) / len(valeurs), 2)
+
+
+def _resumer(mesures, total):
+    durees = sorted(mesure[0] for mesure in mesures)
+    classes = [0] * (len(BORNES_MS) + 1)
+    for duree in durees:
+        classes[next((i for i, borne in enumerate(BORNES_MS) if duree <= borne), len(BORNES_MS))] += 1
+    return {
+        'total': total,
+        'fenetre': len(mesures),
+        'erreurs': sum(1 for mesure in mesures if mesure[5] >= 500),
+        'duree_ms': {
+            'p50': round(centile(durees, 50), 2),
+            'p95': round(centile(durees, 95), 2),
+            'p99': round(centile(durees, 99), 2),
+            'max': round(durees[-1], 2),
+            'moyenne': _moyenne(durees),
+        },
+        'vue_ms': _moyenne([mesure[1] for mesure in mesures]),
+        'db_ms': _moyenne([mesure[2] for mesure in mesures]),
+        'requetes': _moyenne([mesure[3] for mesure in mesures]),
+        'serializer_ms': _moyenne([mesure[4] for mesure in mesures]),
+        'histogramme': [
+            {'le': borne, 'nombre': nombre} for borne, nombre in zip([*BORNES_MS, '+Inf'], classes)
+        ],
+    }
+
+
+metriques = Metriques()
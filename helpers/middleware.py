@@ -0,0 +1,101 @@
+import random
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+from helpers.metriques import metriques
+
+_MESURE = ContextVar('mesure', default=None)
+
+
+class Mesure:
+    """Temps (ms) et nombre de requêtes SQL d'une requête HTTP échantillonnée."""
+
+    def __init__(self):
+        self.debut = time.perf_counter()
+        self.debut_vue = None
+        self.total = self.vue = self.db = self.serializer = 0.0
+        self.requetes = 0
+        self.statut = 0
+        self._profondeur_serializer = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # execute_wrapper : chaque requête SQL passe ici
+        debut = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += (time.perf_counter() - debut) * 1000
+            self.requetes += 1
+
+    def server_timing(self):
+        return (
+            f'total;dur={self.total:.1f}, vue;dur={self.vue:.1f}, '
+            f'db;dur={self.db:.1f};desc="{self.requetes} requetes", serializer;dur={self.serializer:.1f}'
+        )
+
+
+@contextmanager
+def chronometre_serializer():
+    """
+    Compte le bloc dans `serializer;dur` de la requête échantillonnée en cours : à placer autour de
+    `serializer.data` ou de `representer()` dans les vues. Sans effet hors échantillon ; un bloc
+    imbriqué n'est compté qu'une fois.
+    """
+    mesure = _MESURE.get()
+    if mesure is None or mesure._profondeur_serializer:
+        yield
+        return
+    mesure._profondeur_serializer += 1
+    debut = time.perf_counter()
+    try:
+        yield
+    finally:
+        mesure.serializer += (time.perf_counter() - debut) * 1000
+        mesure._profondeur_serializer -= 1
+
+
+class InstrumentationMiddleware:
+    """
+    Sur une fraction INSTRUMENTATION_ECHANTILLON des requêtes : nombre et durée des requêtes SQL,
+    temps de vue et de sérialisation, en-tête Server-Timing et histogramme par nom d'URL
+    (helpers.metriques). Hors échantillon, la requête passe sans aucun travail supplémentaire.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.echantillon = settings.INSTRUMENTATION_ECHANTILLON
+
+    def __call__(self, request):
+        if self.echantillon <= 0 or random.random() >= self.echantillon:
+            return self.get_response(request)
+
+        mesure = Mesure()
+        request.mesure = mesure
+        jeton = _MESURE.set(mesure)
+        try:
+            with ExitStack() as pile:
+                for connexion in connections.all():
+                    pile.enter_context(connexion.execute_wrapper(mesure))
+                reponse = self.get_response(request)
+        finally:
+            _MESURE.reset(jeton)
+
+        fin = time.perf_counter()
+        mesure.total = (fin - mesure.debut) * 1000
+        mesure.vue = (fin - mesure.debut_vue) * 1000 if mesure.debut_vue else 0.0
+        mesure.statut = reponse.status_code
+        reponse['Server-Timing'] = mesure.server_timing()
+
+        correspondance = getattr(request, 'resolver_match', None)
+        metriques.enregistrer(correspondance.url_name if correspondance and correspondance.url_name else 'inconnue', mesure)
+        return reponse
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        mesure = getattr(request, 'mesure', None)
+        if mesure is not None:
+            mesure.debut_vue = time.perf_counter()
+        return None
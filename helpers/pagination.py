@@ -0,0 +1,100 @@
+import base64
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+from drf_yasg import openapi
+
+
+class PaginationInvalide(ValueError):
+    pass
+
+
+PARAMETRES_PAGINATION = [
+    openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=False,
+                      description="Nombre d'éléments par page"),
+    openapi.Parameter('cursor', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False,
+                      description="Curseur 'next' de la page précédente"),
+    openapi.Parameter('offset', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=False,
+                      description="Mode limit/offset (ignoré si cursor est fourni)"),
+]
+
+SCHEMA_PAGINATION = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        'limit': openapi.Schema(type=openapi.TYPE_INTEGER),
+        'next': openapi.Schema(type=openapi.TYPE_STRING, nullable=True,
+                               description="Curseur de la page suivante (entier : offset suivant en mode offset)"),
+        'offset': openapi.Schema(type=openapi.TYPE_INTEGER, nullable=True),
+    }
+)
+
+
+def encoder_curseur(date_creation, identifiant):
+    brut = json.dumps([date_creation.isoformat(), identifiant]).encode()
+    return base64.urlsafe_b64encode(brut).decode().rstrip('=')
+
+
+def decoder_curseur(curseur):
+    try:
+        brut = base64.urlsafe_b64decode(curseur + '=' * (-len(curseur) % 4))
+        date_creation, identifiant = json.loads(brut)
+        return datetime.fromisoformat(date_creation), int(identifiant)
+    except (ValueError, TypeError):
+        raise PaginationInvalide("Curseur de pagination invalide.")
+
+
+def _entier(request, nom, defaut, minimum):
+    valeur = request.GET.get(nom)
+    if valeur in (None, ''):
+        return defaut
+    try:
+        valeur = int(valeur)
+    except ValueError:
+        raise PaginationInvalide(f"Paramètre '{nom}' invalide.")
+    if valeur < minimum:
+        raise PaginationInvalide(f"Paramètre '{nom}' invalide.")
+    return valeur
+
+
+def paginer(request, queryset):
+    """
+    Pagine un queryset par ordre (date_creation, id) décroissant.
+    Par défaut, pagination par curseur (keyset) : le coût d'une page ne dépend pas
+    de sa position. `offset` active le mode limit/offset classique : `next` est alors
+    l'offset de la page suivante.
+    Renvoie (objets, pagination) ; pagination va au niveau de l'enveloppe de réponse.
+    Accepte aussi un queryset `.values()` (lignes avec 'date_creation' et 'id').
+    """
+    limite = min(
+        _entier(request, 'limit', settings.REST_FRAMEWORK['PAGE_SIZE'], 1),
+        settings.PAGINATION_LIMITE_MAX,
+    )
+    curseur = request.GET.get('cursor')
+    offset = None if curseur else _entier(request, 'offset', None, 0)
+
+    queryset = queryset.order_by('-date_creation', '-id')
+    if curseur:
+        date_creation, identifiant = decoder_curseur(curseur)
+        queryset = queryset.filter(
+            Q(date_creation__lt=date_creation) | Q(date_creation=date_creation, id__lt=identifiant)
+        )
+    debut = offset or 0
+    objets = list(queryset[debut:debut + limite + 1])
+
+    suivant = None
+    if len(objets) > limite:
+        objets = objets[:limite]
+        dernier = objets[-1]
+        if offset is not None:
+            suivant = offset + limite
+        elif isinstance(dernier, dict):
+            suivant = encoder_curseur(dernier['date_creation'], dernier['id'])
+        else:
+            suivant = encoder_curseur(dernier.date_creation, dernier.id)
+
+    pagination = {'limit': limite, 'next': suivant}
+    if offset is not None:
+        pagination['offset'] = offset
+    return objets, pagination
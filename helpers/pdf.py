@@ -0,0 +1,46 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+try:
+    from weasyprint import HTML
+except (ImportError, OSError):  # weasyprint et ses bibliothèques système (pango) optionnels
+    HTML = None
+
+
+class RenduPdfIndisponible(RuntimeError):
+    pass
+
+
+def html_vers_pdf(html, url_base=None):
+    """Exécuté dans un processus du pool : le rendu ne prend pas le GIL des workers de requêtes."""
+    return HTML(string=html, base_url=url_base).write_pdf()
+
+
+_POOL = None
+_VERROU = threading.Lock()
+
+
+def _pool(recreer=False):
+    global _POOL
+    with _VERROU:
+        if _POOL is None or recreer:
+            # 'spawn' : pas de fork d'un processus qui a déjà des threads (planificateur, journal...)
+            _POOL = ProcessPoolExecutor(
+                max_workers=settings.PDF_PROCESSUS, mp_context=multiprocessing.get_context('spawn')
+            )
+        return _POOL
+
+
+def soumettre_rendu(html, url_base=None):
+    """Renvoie un Future dont le résultat est le PDF (bytes)."""
+    if HTML is None:
+        raise RenduPdfIndisponible("Génération PDF indisponible (weasyprint non installé).")
+    try:
+        return _pool().submit(html_vers_pdf, html, url_base)
+    except BrokenProcessPool:
+        # un processus du pool est mort (mémoire, signal) : on repart d'un pool neuf
+        return _pool(recreer=True).submit(html_vers_pdf, html, url_base)
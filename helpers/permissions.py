@@ -1,8 +1,7 @@
 from rest_framework.permissions import BasePermission
-from helpers.helper import get_token_from_request, get_entreprise, get_employe
-from django.contrib.auth.models import AnonymousUser
-from django.utils import timezone as django_timezone
-from apps.employe.models import EmployeCompte
+from helpers.helper import get_token_from_request
+from helpers.principal import resoudre_principal
+from helpers.acces import ACTIONS_METHODES, est_autorise
 
 class IsAuthenticatedEntrepriseOrEmploye(BasePermission):
     def has_permission(self, request, view):
@@ -10,27 +9,30 @@ class IsAuthenticatedEntrepriseOrEmploye(BasePermission):
         if not token:
             return False
 
-        entreprise = get_entreprise(token)
-        if entreprise is not None and not isinstance(entreprise, AnonymousUser):
-        
-            if not entreprise.est_actif or not entreprise.est_verifie:
-                return False
-        
-            request.entreprise = entreprise
-            return True
-        employe = get_employe(token)
-        if employe is None or isinstance(employe, AnonymousUser):
+        principal = resoudre_principal(token)
+        if principal is None or not principal.est_autorise():
             return False
 
-        try:
-            compte = EmployeCompte.objects.get(employe=employe, est_actif=True)
-            if compte.nombre_tentatives >= 5 and compte.bloque_jusqua and compte.bloque_jusqua > django_timezone.now():
-                return False
-        except EmployeCompte.DoesNotExist:
-            return False
+        request.principal = principal
+        if principal.est_employe:
+            request.employe = principal.employe
+        else:
+            request.entreprise = principal.entreprise
+        return True
 
-        if not employe.est_actif or not employe.entreprise.est_verifie:
-            return False
 
-        request.employe = employe
-        return True
+class AccesRessource(BasePermission):
+    """
+    Droits des employés sur `view.ressource_acces` (titre normalisé d'un Acces), action déduite
+    de la méthode HTTP. L'entreprise a tous les droits. À placer après l'authentification.
+    """
+    message = "Vous n'avez pas accès à cette ressource."
+
+    def has_permission(self, request, view):
+        principal = getattr(request, 'principal', None)
+        if principal is None:
+            return False
+        if not principal.est_employe:
+            return True
+        profession_id = principal.compte.profession_id if principal.compte else None
+        return est_autorise(profession_id, view.ressource_acces, ACTIONS_METHODES.get(request.method, 0))
@@ -0,0 +1,51 @@
+import logging
+import threading
+import time
+
+from django.db import close_old_connections
+
+LOGGER = logging.getLogger(__name__)
+
+_TACHES = {}
+_VERROU = threading.Lock()
+_THREAD = None
+
+
+def planifier(nom: str, intervalle: float, fonction):
+    """Enregistre une tâche périodique exécutée dans le thread du planificateur."""
+    with _VERROU:
+        _TACHES[nom] = {
+            'intervalle': intervalle,
+            'fonction': fonction,
+            'prochaine': time.monotonic() + intervalle,
+        }
+
+
+def _boucle():
+    while True:
+        maintenant = time.monotonic()
+        with _VERROU:
+            a_executer = [(nom, tache) for nom, tache in _TACHES.items() if tache['prochaine'] <= maintenant]
+            for _, tache in a_executer:
+                tache['prochaine'] = maintenant + tache['intervalle']
+
+        for nom, tache in a_executer:
+            close_old_connections()
+            try:
+                tache['fonction']()
+            except Exception as e:
+                LOGGER.error(f"Tâche planifiée '{nom}' en échec: {e}")
+            finally:
+                close_old_connections()
+
+        time.sleep(1)
+
+
+def demarrer():
+    """Lance le thread du planificateur s'il a des tâches ; appelé par les points d'entrée serveur."""
+    global _THREAD
+    with _VERROU:
+        if _THREAD is not None or not _TACHES:
+            return
+        _THREAD = threading.Thread(target=_boucle, name='planificateur', daemon=True)
+        _THREAD.start()
@@ -0,0 +1,128 @@
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone as django_timezone
+from rest_framework_simplejwt.tokens import AccessToken, TokenError
+
+from apps.employe.models import EmployeCompte
+from apps.entreprise.models import Entreprise
+from helpers.cache import TTLCache
+from helpers.revocation import est_revoque
+
+# Snapshot Entreprise/Employe/EmployeCompte par jti du token d'accès.
+# Le cache est propre au processus : les signaux l'invalident localement et le TTL
+# borne la durée de vie d'une donnée périmée dans les autres workers.
+_CACHE = TTLCache(ttl=settings.PRINCIPAL_CACHE_TTL)
+# (type, id) -> {jti: expiration (monotonic)} : jti à invalider quand le principal change
+_INDEX = {}
+_VERROU_INDEX = threading.Lock()
+_prochain_nettoyage = 0.0
+
+
+class Principal:
+    def __init__(self, entreprise, employe=None, compte=None):
+        self.entreprise = entreprise
+        self.employe = employe
+        self.compte = compte
+
+    @property
+    def est_employe(self):
+        return self.employe is not None
+
+    def est_autorise(self):
+        if not self.est_employe:
+            return self.entreprise.est_actif and self.entreprise.est_verifie
+
+        compte = self.compte
+        if compte is None or not compte.est_actif:
+            return False
+        if compte.nombre_tentatives >= 5 and compte.bloque_jusqua and compte.bloque_jusqua > django_timezone.now():
+            return False
+        return self.employe.est_actif and self.entreprise.est_verifie
+
+
+def _charger_principal(access_token):
+    if "entreprise_id" in access_token:
+        entreprise = Entreprise.objects.filter(id=access_token['entreprise_id']).first()
+        return Principal(entreprise) if entreprise else None
+
+    if "employe_id" in access_token:
+        compte = EmployeCompte.objects.select_related('employe__entreprise').filter(
+            employe_id=access_token['employe_id']
+        ).first()
+        if compte is None:
+            return None
+        return Principal(compte.employe.entreprise, compte.employe, compte)
+
+    return None
+
+
+def _cles_index(principal):
+    cles = [('entreprise', principal.entreprise.id)]
+    if principal.est_employe:
+        cles.append(('employe', principal.employe.id))
+    return cles
+
+
+def _memoriser(jti, principal, exp):
+    ttl = min(settings.PRINCIPAL_CACHE_TTL, exp - time.time())
+    if ttl <= 0:
+        return
+    _CACHE.set(jti, principal, ttl=ttl)
+    expire_a = time.monotonic() + ttl
+    with _VERROU_INDEX:
+        for cle in _cles_index(principal):
+            _INDEX.setdefault(cle, {})[jti] = expire_a
+        _nettoyer_index()
+
+
+def _nettoyer_index():
+    """Retire les jti expirés (et les principaux sans jti) ; une passe au plus par PRINCIPAL_CACHE_TTL."""
+    global _prochain_nettoyage
+    maintenant = time.monotonic()
+    if maintenant < _prochain_nettoyage:
+        return
+    _prochain_nettoyage = maintenant + settings.PRINCIPAL_CACHE_TTL
+    for cle in list(_INDEX):
+        jtis = {jti: expire_a for jti, expire_a in _INDEX[cle].items() if expire_a > maintenant}
+        if jtis:
+            _INDEX[cle] = jtis
+        else:
+            del _INDEX[cle]
+
+
+def resoudre_principal(token):
+    try:
+        access_token = AccessToken(token)
+    except TokenError:
+        return None
+
+    jti = access_token.get('jti')
+    if est_revoque(jti) or est_revoque(access_token.get('refresh_jti')):
+        return None
+
+    principal = _CACHE.get(jti) if jti else None
+    if principal is None:
+        principal = _charger_principal(access_token)
+        if principal is None:
+            return None
+        if jti:
+            _memoriser(jti, principal, access_token['exp'])
+
+    # Copie par requête : les vues modifient request.employe / request.entreprise
+    return copy.deepcopy(principal)
+
+
+def invalider_principaux(type_principal: str, identifiant: int):
+    with _VERROU_INDEX:
+        jtis = _INDEX.pop((type_principal, identifiant), {})
+    for jti in jtis:
+        _CACHE.delete(jti)
+
+
+def vider_cache_principaux():
+    with _VERROU_INDEX:
+        _INDEX.clear()
+    _CACHE.clear()
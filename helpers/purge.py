@@ -0,0 +1,61 @@
+import logging
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone as django_timezone
+
+LOGGER = logging.getLogger(__name__)
+
+
+def purger_par_lots(queryset, taille_lot: int = 1000, pause: float = 0) -> int:
+    """
+    Supprime les lignes du queryset par lots de `taille_lot` clés primaires,
+    chaque lot dans sa propre transaction courte pour ne pas bloquer les écritures.
+    """
+    modele = queryset.model
+    total = 0
+    while True:
+        ids = list(queryset.order_by().values_list('pk', flat=True)[:taille_lot])
+        if not ids:
+            break
+        with transaction.atomic():
+            modele._base_manager.filter(pk__in=ids).delete()
+        total += len(ids)
+        if len(ids) < taille_lot:
+            break
+        if pause:
+            time.sleep(pause)
+    return total
+
+
+def querysets_expires():
+    from apps.employe.models import EmployeOtp, EmployeOutstandingToken
+    from apps.entreprise.models import EntrepriseOtp, EntrepriseOutstandingToken
+    from apps.users.models import UserOtp
+
+    maintenant = django_timezone.now()
+    return [
+        EntrepriseOutstandingToken.objects.filter(date_expiration__lte=maintenant),
+        EmployeOutstandingToken.objects.filter(date_expiration__lte=maintenant),
+        EntrepriseOtp.objects.filter(date_expiration__lte=maintenant),
+        EmployeOtp.objects.filter(Q(date_expiration__lte=maintenant) | Q(utilise=True)),
+        UserOtp.objects.filter(expirer_le__lte=maintenant),
+    ]
+
+
+def purger_expires(taille_lot: int = 1000, pause: float = 0) -> list:
+    """Purge les tokens et OTP expirés/utilisés ; renvoie (table, lignes, durée) par modèle."""
+    rapport = []
+    for queryset in querysets_expires():
+        debut = time.perf_counter()
+        supprimes = purger_par_lots(queryset, taille_lot=taille_lot, pause=pause)
+        rapport.append((queryset.model._meta.db_table, supprimes, time.perf_counter() - debut))
+    return rapport
+
+
+def purge_planifiee():
+    for table, supprimes, duree in purger_expires(settings.PURGE_TAILLE_LOT):
+        if supprimes:
+            LOGGER.info(f"Purge {table}: {supprimes} lignes en {duree:.2f}s ({supprimes / duree:.0f} lignes/s)")
@@ -0,0 +1,53 @@
+import hashlib
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+from helpers.cache import TTLCache
+from helpers.renderers import JSONRapideRenderer
+from helpers.reponses import enveloppe
+
+# Listes de référence (devises, préfixes...) : corps JSON déjà rendu et son ETag, par nom.
+# Les signaux incrémentent la version au commit ; le TTL borne l'écart avec les autres workers.
+_CACHE = TTLCache(ttl=settings.REFERENCE_CACHE_TTL)
+_VERSIONS = {}
+_VERROU = threading.Lock()
+
+
+def invalider_reference(*noms):
+    with _VERROU:
+        for nom in noms:
+            _VERSIONS[nom] = _VERSIONS.get(nom, 0) + 1
+            _CACHE.delete(nom)
+
+
+def _entree(nom, message, construire):
+    entree = _CACHE.get(nom)
+    version = _VERSIONS.get(nom, 0)
+    if entree is not None and entree[0] == version:
+        return entree
+
+    corps = JSONRapideRenderer().render(enveloppe(message, True, construire()))
+    entree = (version, corps, f'"{hashlib.sha256(corps).hexdigest()[:32]}"')
+    with _VERROU:
+        # pas de mise en cache d'un rendu lu avant une invalidation concurrente
+        if _VERSIONS.get(nom, 0) == version:
+            _CACHE.set(nom, entree)
+    return entree
+
+
+def reponse_reference(request, nom, message, construire):
+    """
+    Réponse enveloppe {message, success, donnees} servie depuis le cache : ni requête SQL ni
+    serializer tant que la version ne change pas, 304 si le client a déjà cet ETag.
+    `construire()` renvoie les données sérialisées (appelé seulement à la reconstruction).
+    """
+    _, corps, etag = _entree(nom, message, construire)
+    reponse = get_conditional_response(request, etag=etag)
+    if reponse is None:
+        reponse = HttpResponse(corps, content_type='application/json')
+    reponse['ETag'] = etag
+    patch_cache_control(reponse, public=True, max_age=settings.REFERENCE_CACHE_MAX_AGE)
+    return reponse
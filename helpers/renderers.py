@@ -0,0 +1,52 @@
+from rest_framework.exceptions import NotAcceptable
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # repli : JSONRenderer de DRF
+    orjson = None
+
+_ENCODEUR = JSONEncoder()
+_SEPARATEURS_JS = (b'\xe2\x80\xa8', b'\xe2\x80\xa9')  # U+2028 / U+2029, échappés par DRF
+
+
+class JSONRapideRenderer(JSONRenderer):
+    """
+    JSONRenderer sérialisé par orjson : même sortie que DRF (UTF-8 compact). date/datetime en natif
+    (ISO 8601, UTC en « Z » comme DRF) ; les types hors JSON (Decimal, chaînes paresseuses...) passent
+    par l'encodeur de DRF. Écarts sans effet ici : `time` garde ses microsecondes (aucun TimeField),
+    flottants en exposant écrits 1e16 au lieu de 1e+16, NaN rendu null au lieu d'une erreur.
+    Repli sur DRF sans orjson, avec indentation demandée ou pour ce qu'orjson refuse (entier > 64 bits...).
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            corps = orjson.dumps(data, default=_ENCODEUR.default, option=orjson.OPT_UTC_Z)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if _SEPARATEURS_JS[0] in corps or _SEPARATEURS_JS[1] in corps:
+            corps = corps.replace(_SEPARATEURS_JS[0], b'\\u2028').replace(_SEPARATEURS_JS[1], b'\\u2029')
+        return corps
+
+
+class NegociationExplicite(DefaultContentNegotiation):
+    """
+    L'API navigable n'est servie que sur demande explicite (?format=api), jamais via Accept.
+    Les autres rendus HTML (interfaces Swagger/ReDoc de drf_yasg) restent négociés normalement.
+    """
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        if format_suffix or request.query_params.get(self.settings.URL_FORMAT_OVERRIDE):
+            return super().select_renderer(request, renderers, format_suffix)
+        implicites = [renderer for renderer in renderers if not isinstance(renderer, BrowsableAPIRenderer)]
+        try:
+            return super().select_renderer(request, implicites or renderers, format_suffix)
+        except NotAcceptable:
+            if len(implicites) == len(renderers):
+                raise
+            # Accept: text/html seul : JSON plutôt qu'un 406
+            return implicites[0], implicites[0].media_type
@@ -0,0 +1,40 @@
+import logging
+
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import exception_handler, set_rollback
+
+LOGGER = logging.getLogger(__name__)
+
+
+def enveloppe(message, success=True, donnees=None, **extra):
+    """Corps commun à toute l'API : {"message", "success", "donnees"} (+ ex. "pagination")."""
+    return {'message': message, 'success': success, 'donnees': {} if donnees is None else donnees, **extra}
+
+
+def erreur(message, statut=status.HTTP_400_BAD_REQUEST, donnees=None):
+    return Response(enveloppe(message, False, donnees), status=statut)
+
+
+def erreur_serveur(exception):
+    """500 : la trace part dans les logs, pas dans la réponse."""
+    LOGGER.error("Erreur serveur", exc_info=exception)
+    return erreur(f"Erreur serveur: {exception}", status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def gestionnaire_exceptions(exc, context):
+    """
+    EXCEPTION_HANDLER de DRF : erreurs levées hors des try/except des vues (authentification,
+    permissions, 404, 405, validation...) rendues dans l'enveloppe commune ; le reste en 500.
+    """
+    reponse_drf = exception_handler(exc, context)
+    if reponse_drf is None:
+        set_rollback()
+        return erreur_serveur(exc)
+    donnees = reponse_drf.data
+    if isinstance(donnees, dict) and set(donnees) == {'detail'}:
+        reponse_drf.data = enveloppe(str(donnees['detail']), False)
+    else:
+        # erreurs de validation : détail par champ dans "donnees"
+        reponse_drf.data = enveloppe("Données invalides.", False, donnees)
+    return reponse_drf
@@ -0,0 +1,120 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone as django_timezone
+
+
+class FiltreBloom:
+    """Pré-filtre probabiliste : pas de faux négatifs, faux positifs rares."""
+
+    def __init__(self, taille_bits: int, nb_hachages: int):
+        self.taille_bits = taille_bits
+        self.nb_hachages = nb_hachages
+        self.bits = bytearray((taille_bits + 7) // 8)
+
+    def _positions(self, cle: str):
+        empreinte = hashlib.blake2b(cle.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(empreinte[:8], 'little')
+        h2 = int.from_bytes(empreinte[8:], 'little') | 1
+        return [(h1 + i * h2) % self.taille_bits for i in range(self.nb_hachages)]
+
+    def ajouter(self, cle: str):
+        for position in self._positions(cle):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, cle: str):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(cle))
+
+
+class IndexRevocation:
+    """
+    Index en mémoire des jti blacklistés (refresh tokens entreprise et employé).
+    Chargé depuis la base au premier contrôle, puis resynchronisé toutes les REVOCATION_RESYNC
+    secondes par le planificateur (hors du chemin des requêtes) ; les signaux l'alimentent entre
+    deux chargements. Un ajout reçu pendant un chargement est reporté dans l'index chargé.
+    """
+
+    def __init__(self):
+        self._jtis = {}
+        self._bloom = FiltreBloom(settings.REVOCATION_BLOOM_BITS, settings.REVOCATION_BLOOM_HACHAGES)
+        self._ajouts = None  # ajouts reçus pendant un chargement
+        self._charge_le = None
+        self._verrou = threading.Lock()
+        self._verrou_chargement = threading.Lock()
+
+    def _lire_base(self):
+        from apps.employe.models import EmployeOutstandingToken
+        from apps.entreprise.models import EntrepriseOutstandingToken
+
+        maintenant = django_timezone.now()
+        jtis = {}
+        for modele in (EntrepriseOutstandingToken, EmployeOutstandingToken):
+            lignes = modele.objects.filter(
+                est_blackliste=True, date_expiration__gt=maintenant
+            ).values_list('jti', 'date_expiration')
+            for jti, date_expiration in lignes.iterator(chunk_size=2000):
+                jtis[jti] = date_expiration.timestamp()
+        return jtis
+
+    def _charger(self):
+        with self._verrou:
+            self._ajouts = {}
+        try:
+            jtis = self._lire_base()
+        except BaseException:
+            with self._verrou:
+                self._ajouts = None
+            raise
+
+        bloom = FiltreBloom(settings.REVOCATION_BLOOM_BITS, settings.REVOCATION_BLOOM_HACHAGES)
+        for jti in jtis:
+            bloom.ajouter(jti)
+
+        with self._verrou:
+            for jti, expire_a in self._ajouts.items():
+                jtis[jti] = expire_a
+                bloom.ajouter(jti)
+            self._ajouts = None
+            self._jtis = jtis
+            self._bloom = bloom
+            self._charge_le = time.monotonic()
+
+    def charger(self):
+        """Rechargement complet (tâche planifiée) : les jti expirés sortent de l'index."""
+        with self._verrou_chargement:
+            self._charger()
+
+    def _charger_si_necessaire(self):
+        if self._charge_le is not None:
+            return
+        with self._verrou_chargement:
+            if self._charge_le is None:
+                self._charger()
+
+    def ajouter(self, jti: str, date_expiration):
+        with self._verrou:
+            self._jtis[jti] = date_expiration.timestamp()
+            self._bloom.ajouter(jti)
+            if self._ajouts is not None:
+                self._ajouts[jti] = self._jtis[jti]
+
+    def est_revoque(self, jti: str) -> bool:
+        if not jti:
+            return False
+        self._charger_si_necessaire()
+        if jti not in self._bloom:
+            return False
+        expire_a = self._jtis.get(jti)
+        return expire_a is not None and expire_a > time.time()
+
+    def __len__(self):
+        return len(self._jtis)
+
+
+revocations = IndexRevocation()
+
+
+def est_revoque(jti: str) -> bool:
+    return revocations.est_revoque(jti)
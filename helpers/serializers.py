@@ -0,0 +1,235 @@
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+
+class PlanChargementMixin:
+    """
+    Plan de chargement déclaré par un serializer de liste, appliqué par la vue avant la pagination :
+
+        class Meta:
+            select_related = ['prefix_telephone']   # FK / OneToOne lus par les SerializerMethodField
+            prefetch_related = ['acces']            # relations multiples
+
+    Les serializers imbriqués qui utilisent aussi ce mixin apportent leur propre plan,
+    préfixé par la source du champ (ex. 'compte.profession' -> 'compte__profession__acces').
+    """
+
+    @classmethod
+    def plan_chargement(cls, champs=None):
+        meta = getattr(cls, 'Meta', None)
+        selects = list(getattr(meta, 'select_related', ()))
+        prefetches = list(getattr(meta, 'prefetch_related', ()))
+
+        for nom, champ in cls._declared_fields.items():
+            if champs is not None and nom not in champs:
+                continue
+            multiple = isinstance(champ, serializers.ListSerializer)
+            enfant = champ.child if multiple else champ
+            if not isinstance(enfant, PlanChargementMixin):
+                continue
+            chemin = (champ.source or nom).replace('.', '__')
+            selects_enfant, prefetches_enfant = enfant.plan_chargement()
+            if multiple:
+                # sous une relation multiple, tout passe par prefetch_related
+                prefetches += [chemin] + [f"{chemin}__{sous}" for sous in selects_enfant + prefetches_enfant]
+            else:
+                selects += [chemin] + [f"{chemin}__{sous}" for sous in selects_enfant]
+                prefetches += [f"{chemin}__{sous}" for sous in prefetches_enfant]
+        return selects, prefetches
+
+    @classmethod
+    def charger(cls, queryset):
+        selects, prefetches = cls.plan_chargement()
+        if selects:
+            queryset = queryset.select_related(*selects)
+        if prefetches:
+            queryset = queryset.prefetch_related(*prefetches)
+        return queryset
+
+
+class ChampsPartielsMixin(PlanChargementMixin):
+    """
+    Champs partiels (`?fields=`, voir helpers.champs) : `Serializer(..., champs=[...])` ne garde que
+    ces champs et `charger(queryset, champs)` ne lit que leurs colonnes (`.only()`, jointures comprises).
+
+        class Meta:
+            colonnes = {'photo_url': ['photo']}   # colonnes lues par les SerializerMethodField
+
+    Les colonnes déclarées dans Meta.lecture_rapide (LectureRapideMixin) valent aussi ici.
+    Un serializer imbriqué doit utiliser ce mixin : ses colonnes sont lues sous la source du champ.
+    """
+
+    def __init__(self, *args, champs=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if champs is not None:
+            for nom in list(self.fields):
+                if nom not in champs:
+                    self.fields.pop(nom)
+
+    @classmethod
+    def _champs_lus(cls):
+        champs = cls.__dict__.get('_champs_lus_cache')
+        if champs is None:
+            champs = {nom: champ for nom, champ in cls().fields.items() if not champ.write_only}
+            cls._champs_lus_cache = champs
+        return champs
+
+    @classmethod
+    def champs_autorises(cls):
+        return list(cls._champs_lus())
+
+    @classmethod
+    def colonnes(cls, champs=None):
+        """Colonnes lues par les champs (tous par défaut), clés du curseur de pagination comprises."""
+        meta, modele = cls.Meta, cls.Meta.model
+        calcules = {nom: colonnes for nom, (colonnes, _) in getattr(meta, 'lecture_rapide', {}).items()}
+        calcules.update(getattr(meta, 'colonnes', {}))
+        colonnes = [modele._meta.pk.name]
+        if any(champ.name == 'date_creation' for champ in modele._meta.concrete_fields):
+            colonnes.append('date_creation')
+        for nom, champ in cls._champs_lus().items():
+            if champs is not None and nom not in champs:
+                continue
+            if nom in calcules:
+                colonnes += calcules[nom]
+                continue
+            if not champ.source_attrs:  # source='*' : SerializerMethodField...
+                raise ImproperlyConfigured(f"{cls.__name__}.{nom} : colonnes à déclarer dans Meta.colonnes")
+            if not hasattr(modele, champ.source_attrs[0]) and not champ.required:
+                continue  # omis par DRF (SkipField)
+            chemin = '__'.join(champ.source_attrs)
+            if isinstance(champ, (serializers.ListSerializer, serializers.ManyRelatedField)):
+                continue  # prefetch_related : requête à part
+            if isinstance(champ, serializers.BaseSerializer):
+                if not isinstance(champ, ChampsPartielsMixin):
+                    raise ImproperlyConfigured(f"{cls.__name__}.{nom} : serializer imbriqué sans ChampsPartielsMixin")
+                colonnes += [chemin] + [f"{chemin}__{colonne}" for colonne in champ.colonnes()]
+                continue
+            try:
+                modele._meta.get_field(champ.source_attrs[0])
+            except FieldDoesNotExist:
+                raise ImproperlyConfigured(f"{cls.__name__}.{nom} : colonnes à déclarer dans Meta.colonnes")
+            colonnes.append(chemin)
+        return list(dict.fromkeys(colonnes))
+
+    @classmethod
+    def charger(cls, queryset, champs=None):
+        if champs is None:
+            return super().charger(queryset)
+        colonnes = cls.colonnes(champs)
+        jointures = {colonne.rsplit('__', 1)[0] for colonne in colonnes if '__' in colonne}
+        prefetches = cls.plan_chargement(champs)[1]
+        if jointures:
+            queryset = queryset.select_related(*sorted(jointures))
+        if prefetches:
+            queryset = queryset.prefetch_related(*prefetches)
+        return queryset.only(*colonnes)
+
+
+# champs dont to_representation rend une valeur déjà lue telle quelle depuis la base
+_CHAMPS_IDENTITE = (serializers.CharField, serializers.IntegerField, serializers.ReadOnlyField)
+
+
+def _datetime_iso(champ):
+    """DateTimeField.to_representation (ISO 8601) avec le fuseau résolu une fois par liste, pas par valeur."""
+    fuseau = champ.timezone if hasattr(champ, 'timezone') else champ.default_timezone()
+
+    def convertir(valeur):
+        if fuseau is None or not timezone.is_aware(valeur):
+            return champ.to_representation(valeur)
+        texte = valeur.astimezone(fuseau).isoformat()
+        return texte[:-6] + 'Z' if texte.endswith('+00:00') else texte
+    return convertir
+
+
+class LectureRapideMixin:
+    """
+    Chemin rapide des listes en lecture seule : lignes `.values()` (jointures comprises) converties
+    en dicts identiques à `Serializer(objets, many=True).data`, sans instancier de modèle.
+
+        class Meta:
+            # champs calculés (SerializerMethodField, propriétés) : colonnes lues et fonction(ligne)
+            lecture_rapide = {'est_en_rupture': (['quantite', 'stock_min'], lambda ligne: ...)}
+
+    Les autres champs sont lus sur leur source ('cree_par.nom_complet' -> 'cree_par__nom_complet')
+    et convertis par leur propre to_representation ; un champ en lecture seule sans source sur le
+    modèle est omis, comme le fait DRF (SkipField). `champs` (?fields=) restreint colonnes et clés.
+    """
+
+    @classmethod
+    def _plan_lecture(cls, champs=None):
+        plans = cls.__dict__.get('_plans_lecture')
+        if plans is None:
+            plans = cls._plans_lecture = {}
+        cle = None if champs is None else frozenset(champs)
+        if cle not in plans:
+            plans[cle] = cls._construire_plan(cle)
+        return plans[cle]
+
+    @classmethod
+    def _construire_plan(cls, champs):
+        modele = cls.Meta.model
+        calcules = getattr(cls.Meta, 'lecture_rapide', {})
+        colonnes, accesseurs = ['id', 'date_creation'], []  # clés du curseur de pagination
+        for nom, champ in cls().fields.items():
+            if champ.write_only or (champs is not None and nom not in champs):
+                continue
+            if nom in calcules:
+                colonnes_calcul, fonction = calcules[nom]
+                colonnes += colonnes_calcul
+                accesseurs.append((nom, None, fonction))
+                continue
+            if not hasattr(modele, champ.source_attrs[0]) and not champ.required:
+                continue
+            try:
+                modele._meta.get_field(champ.source_attrs[0])
+            except FieldDoesNotExist:
+                raise ImproperlyConfigured(f"{cls.__name__}.{nom} : à déclarer dans Meta.lecture_rapide")
+            if isinstance(champ, (serializers.RelatedField, serializers.BaseSerializer)):
+                raise ImproperlyConfigured(f"{cls.__name__}.{nom} : à déclarer dans Meta.lecture_rapide")
+            colonne = '__'.join(champ.source_attrs)
+            colonnes.append(colonne)
+            if isinstance(champ, _CHAMPS_IDENTITE):
+                convertir = None
+            elif isinstance(champ, serializers.DateTimeField) and \
+                    str(getattr(champ, 'format', api_settings.DATETIME_FORMAT)).lower() == ISO_8601:
+                convertir = champ  # fuseau courant résolu dans representer
+            else:
+                convertir = champ.to_representation
+            accesseurs.append((nom, colonne, convertir))
+        return list(dict.fromkeys(colonnes)), accesseurs
+
+    @classmethod
+    def lignes(cls, queryset, champs=None):
+        """Queryset `.values()` des seules colonnes nécessaires ; à paginer puis passer à `representer`."""
+        return queryset.values(*cls._plan_lecture(champs)[0])
+
+    @classmethod
+    def representer(cls, lignes, champs=None):
+        accesseurs = [
+            (nom, colonne, _datetime_iso(convertir) if isinstance(convertir, serializers.DateTimeField) else convertir)
+            for nom, colonne, convertir in cls._plan_lecture(champs)[1]
+        ]
+        donnees = []
+        for ligne in lignes:
+            objet = {}
+            for nom, colonne, convertir in accesseurs:
+                if colonne is None:
+                    objet[nom] = convertir(ligne)
+                    continue
+                valeur = ligne[colonne]
+                objet[nom] = valeur if valeur is None or convertir is None else convertir(valeur)
+            donnees.append(objet)
+        return donnees
+
+
+def _cree_par_ligne(ligne):
+    if ligne['cree_par'] is None:
+        return None
+    return {'id': ligne['cree_par'], 'nom_complet': ligne['cree_par__nom_complet']}
+
+
+# cree_par_data (SerializerMethodField des listes) depuis une ligne .values()
+LECTURE_CREE_PAR = (['cree_par', 'cree_par__nom_complet'], _cree_par_ligne)
@@ -1,11 +1,15 @@
-from django.core.mail import send_mail
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.template.loader import render_to_string
 from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone as django_timezone
 
 from helpers.constantes import TEMPLATES_EMAIL
-from datetime import datetime
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
-import os, logging, traceback
+import os, logging
+import threading, uuid
 import django
 
 # os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
@@ -14,27 +18,182 @@ import django
 load_dotenv()
 LOGGER = logging.getLogger(__name__)
 
+def rendre_email(template_name:str, data:dict):
+    data['current_year'] = datetime.now().year
+    objet = data.get('subject', 'Objet d\'envoie d\'email ici.')
+    data['logo_url'] = os.getenv('LOGO_URL')
+    data['site_url'] = os.getenv('SITE_URL')
+    data['support_email'] = os.getenv('SUPPORT_EMAIL')
+    html_message = render_to_string(TEMPLATES_EMAIL[template_name], data)
+    return objet, html_message
+
 def envoyer_email(list_email_to_send:list, template_name:str, data:dict):
+    """Rend le template et met l'email dans la file d'envoi ; l'envoi SMTP est fait par les workers."""
+    from apps.users.models import EmailSortant
+
     try:
-        data['current_year'] = datetime.now().year
-        objet = data.get('subject', 'Objet d\'envoie d\'email ici.')
-        data['logo_url'] = os.getenv('LOGO_URL')
-        data['site_url'] = os.getenv('SITE_URL')
-        data['support_email'] = os.getenv('SUPPORT_EMAIL')
-        html_message = render_to_string(TEMPLATES_EMAIL[template_name], data)
-        email_config = settings.EMAIL_HOST_USER
-        send_mail(
-            objet,
-            '',
-            email_config,
-            list_email_to_send,
-            html_message=html_message,
-            fail_silently=False,
+        objet, html_message = rendre_email(template_name, data)
+        EmailSortant.objects.create(
+            destinataires=list(list_email_to_send),
+            objet=objet,
+            html=html_message,
+        )
+    except Exception:
+        LOGGER.exception("Erreur lors de la mise en file de l'email")
+        raise
+    transaction.on_commit(reveiller_workers)
+    LOGGER.info("Email mis en file d'attente✅.")
+
+def reclamer_lot(taille_lot:int):
+    """Verrouille un lot d'emails à envoyer pour ce worker (les emails bloqués 'en_cours' trop longtemps sont repris)."""
+    from apps.users.models import EmailSortant
+
+    maintenant = django_timezone.now()
+    verrou = str(uuid.uuid4())
+    a_envoyer = (
+        Q(statut='en_attente', prochaine_tentative__lte=maintenant) |
+        Q(statut='en_cours', verrouille_le__lt=maintenant - timedelta(seconds=settings.EMAIL_FILE_DELAI_VERROU))
+    )
+    ids = list(
+        EmailSortant.objects.filter(a_envoyer).order_by('prochaine_tentative').values_list('id', flat=True)[:taille_lot]
+    )
+    if not ids:
+        return []
+    # la condition est réévaluée par l'UPDATE : un email ne peut être réclamé que par un seul worker
+    EmailSortant.objects.filter(a_envoyer, id__in=ids).update(statut='en_cours', verrou=verrou, verrouille_le=maintenant)
+    return list(EmailSortant.objects.filter(verrou=verrou))
+
+def _echec(email, erreur:str):
+    email.tentatives += 1
+    email.derniere_erreur = erreur
+    email.verrou = None
+    if email.tentatives >= settings.EMAIL_FILE_MAX_TENTATIVES:
+        email.statut = 'echoue'
+    else:
+        delai = min(settings.EMAIL_FILE_DELAI_BASE * 2 ** (email.tentatives - 1), 3600)
+        email.statut = 'en_attente'
+        email.prochaine_tentative = django_timezone.now() + timedelta(seconds=delai)
+    email.save(update_fields=['tentatives', 'derniere_erreur', 'verrou', 'statut', 'prochaine_tentative'])
+    LOGGER.error(f"Erreur lors d'envoie de l'email {email.id} (tentative {email.tentatives}): {erreur}")
+
+def envoyer_lot(connexion, emails:list):
+    envoyes = 0
+    for email in emails:
+        message = EmailMultiAlternatives(
+            email.objet, '', settings.EMAIL_HOST_USER, email.destinataires, connection=connexion
         )
-        
-        print("Email envoié avec succès✅.")
-        LOGGER.info("Email envoié avec succès✅.")
-    except Exception as e:
-        print(f"Erreur lors d'envoie de l'email: {e}")
-        print(traceback.format_exc())
-        LOGGER.error(f"Erreur lors d'envoie de l'email: {e}")
+        message.attach_alternative(email.html, 'text/html')
+        try:
+            connexion.send_messages([message])
+        except Exception as e:
+            _echec(email, str(e))
+            # repartir d'une connexion neuve pour la suite du lot
+            try:
+                connexion.close()
+                connexion.open()
+            except Exception:
+                pass
+            continue
+        email.statut = 'envoye'
+        email.verrou = None
+        email.date_envoi = django_timezone.now()
+        email.save(update_fields=['statut', 'verrou', 'date_envoi'])
+        envoyes += 1
+    return envoyes
+
+def traiter_file(taille_lot:int = None, connexion=None):
+    """
+    Vide la file : réclame des lots et les envoie sur une seule connexion SMTP,
+    ouverte au premier lot et réutilisée jusqu'à ce que la file soit vide.
+    Renvoie (envoyes, echecs).
+    """
+    taille_lot = taille_lot or settings.EMAIL_FILE_TAILLE_LOT
+    connexion_externe = connexion is not None
+    envoyes, total = 0, 0
+    try:
+        while True:
+            emails = reclamer_lot(taille_lot)
+            if not emails:
+                break
+            total += len(emails)
+            if connexion is None:
+                connexion = get_connection(fail_silently=False)
+            try:
+                connexion.open()
+            except Exception as e:
+                for email in emails:
+                    _echec(email, f"Connexion SMTP impossible: {e}")
+                connexion = None
+                break
+            envoyes += envoyer_lot(connexion, emails)
+    finally:
+        if connexion is not None and not connexion_externe:
+            connexion.close()
+    return envoyes, total - envoyes
+
+
+class _PoolWorkers:
+    def __init__(self):
+        self._evenement = threading.Event()
+        self._verrou = threading.Lock()
+        self._threads = []
+        self._arret = threading.Event()
+
+    def _boucle(self, arret):
+        from django.db import close_old_connections
+
+        while not arret.is_set():
+            self._evenement.wait(timeout=settings.EMAIL_FILE_ATTENTE)
+            self._evenement.clear()
+            if arret.is_set():
+                break
+            close_old_connections()
+            try:
+                traiter_file()
+            except Exception as e:
+                LOGGER.error(f"Worker email en échec: {e}")
+            finally:
+                close_old_connections()
+
+    def demarrer(self, nombre:int):
+        with self._verrou:
+            while len(self._threads) < nombre:
+                thread = threading.Thread(
+                    target=self._boucle, args=(self._arret,), name=f'email-worker-{len(self._threads)}', daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+        self._evenement.set()
+
+    def reveiller(self):
+        self._evenement.set()
+
+    def arreter(self, timeout=None):
+        """Arrête les workers après leur lot en cours ; un prochain demarrer() en relance."""
+        with self._verrou:
+            arret, self._arret = self._arret, threading.Event()
+            threads, self._threads = self._threads, []
+        arret.set()
+        self._evenement.set()
+        for thread in threads:
+            thread.join(timeout)
+
+_POOL = _PoolWorkers()
+
+def reveiller_workers():
+    """Signale du travail aux workers du processus (après une mise en file, et par le planificateur) ; sans effet s'ils ne sont pas démarrés."""
+    _POOL.reveiller()
+
+def demarrer_workers():
+    """
+    Démarre EMAIL_FILE_WORKERS workers dans ce processus, et leur réveil périodique pour reprendre
+    les emails laissés en file. Appelé par les points d'entrée serveur (config/wsgi.py, config/asgi.py),
+    jamais au chargement des applications : migrate, shell ou les tests n'ouvrent pas de connexion SMTP.
+    """
+    if settings.EMAIL_FILE_WORKERS <= 0:
+        return
+    from helpers import planificateur
+
+    _POOL.demarrer(settings.EMAIL_FILE_WORKERS)
+    planificateur.planifier('emails', settings.EMAIL_FILE_ATTENTE, reveiller_workers)
+    planificateur.demarrer()
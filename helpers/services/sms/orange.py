@@ -1,8 +1,18 @@
 from apps.users.models import SmsOrangeToken
-import os, base64, urllib, json
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone as django_timezone
+from concurrent.futures import ThreadPoolExecutor
+import os, base64, urllib, json, logging
 import http.client
+import queue, threading, time
 
-def getAuthToken():
+LOGGER = logging.getLogger(__name__)
+
+# marge (secondes) avant l'expiration annoncée pour renouveler le token
+MARGE_EXPIRATION_TOKEN = 60
+
+def getAuthToken(client=None):
     CLIENT_ID = os.getenv('ORANGE_CLIENT_ID')
     CLIENT_SECRET = os.getenv('ORANGE_CLIENT_SECRET')
 
@@ -18,13 +28,10 @@ def getAuthToken():
         "Authorization": "Basic " + authString
     }
 
-    conn = http.client.HTTPSConnection("api.orange.com")
-    conn.request("POST", "/oauth/v3/token", body=params, headers=headersMap)
+    client = client or get_client()
+    status, reason, data = client.requete("POST", "/oauth/v3/token", body=params, headers=headersMap)
 
-    response = conn.getresponse()
-    
-    if response.status == 200:
-        data = response.read()
+    if status == 200:
         result = json.loads(data)
         sms_tokens = SmsOrangeToken.objects.all()
         if len(sms_tokens)>0:
@@ -37,34 +44,121 @@ def getAuthToken():
             SmsOrangeToken.objects.create(token_access=result.get('access_token'), token_type=result.get('token_type'),token_validity=result.get('expires_in'))
         return result
     else:
-        print("Error:", response.status, response.reason)
-        data = response.read()
-        print("Response:", data)
+        LOGGER.error(f"Token Orange refusé: {status} {reason} {data}")
         raise Exception(data)
-    conn.close()
-    return None
 
-def getOrangeToken():
-    sms_tokens = SmsOrangeToken.objects.all()
-    if len(sms_tokens)==0:
-        auth_token = getAuthToken()
-        if auth_token is None:
-            raise Exception('Pas de token disponible')
-        return auth_token.get('access_token')
-    return sms_tokens.last().token_access
 
-def send_sms(recipient_phone, message):
-    try:
-        # print(f'sending message : {message}  To {recipient_phone}')
-        dev_phone = os.getenv('ORANGE_DEV_PHONE_NUMBER')
-        token = getAuthToken().get('access_token')
+class OrangeSmsClient:
+    """
+    Client de l'API Orange partagé par le processus : token OAuth gardé en mémoire jusqu'à
+    son expiration (renouvellement unique sous concurrence) et connexions keep-alive réutilisées.
+    """
 
-        url = f"/smsmessaging/v1/outbound/tel%3A%2B{dev_phone}/requests"
+    def __init__(self, hote=None, port=None, https=True, taille_pool=None, timeout=15):
+        self.hote = hote or os.getenv('ORANGE_API_HOST', 'api.orange.com')
+        self.port = port
+        self.https = https
+        self.timeout = timeout
+        taille_pool = taille_pool or settings.ORANGE_SMS_CONCURRENCE
+        self.taille_pool = taille_pool
+        self._connexions = queue.LifoQueue(maxsize=taille_pool)
+        self._token = None
+        self._token_expire_a = 0
+        self._token_refuse = None
+        self._verrou_token = threading.Lock()
 
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {token}"
-        }
+    # --- connexions ---
+    def _nouvelle_connexion(self):
+        classe = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        return classe(self.hote, self.port, timeout=self.timeout)
+
+    def _prendre_connexion(self):
+        try:
+            return self._connexions.get_nowait()
+        except queue.Empty:
+            return self._nouvelle_connexion()
+
+    def _rendre_connexion(self, conn):
+        try:
+            self._connexions.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def requete(self, methode, url, body=None, headers=None):
+        conn = self._prendre_connexion()
+        for tentative in range(2):
+            try:
+                conn.request(methode, url, body=body, headers=headers or {})
+                response = conn.getresponse()
+                data = response.read()
+            except (http.client.HTTPException, OSError):
+                # connexion keep-alive fermée par le serveur : une seule reprise sur une connexion neuve
+                conn.close()
+                if tentative:
+                    raise
+                conn = self._nouvelle_connexion()
+                continue
+            if response.will_close:
+                conn.close()
+            else:
+                self._rendre_connexion(conn)
+            return response.status, response.reason, data
+
+    def fermer(self):
+        while True:
+            try:
+                self._connexions.get_nowait().close()
+            except queue.Empty:
+                break
+
+    # --- token ---
+    def _token_en_base(self):
+        sms_token = SmsOrangeToken.objects.order_by('-updated_at').first()
+        if sms_token is None:
+            return None
+        restant = (sms_token.updated_at - django_timezone.now()).total_seconds() + sms_token.token_validity
+        if restant <= MARGE_EXPIRATION_TOKEN:
+            return None
+        return sms_token.token_access, restant
+
+    def token(self):
+        if self._token and time.monotonic() < self._token_expire_a:
+            return self._token
+        with self._verrou_token:
+            if self._token and time.monotonic() < self._token_expire_a:
+                return self._token
+            en_base = self._token_en_base() if self._token is None else None
+            # le token en base est celui qu'Orange vient de refuser : pas de reprise
+            if en_base and en_base[0] != self._token_refuse:
+                token, validite = en_base
+            else:
+                result = getAuthToken(self)
+                token, validite = result.get('access_token'), int(result.get('expires_in'))
+            self._token = token
+            self._token_expire_a = time.monotonic() + validite - MARGE_EXPIRATION_TOKEN
+            return self._token
+
+    def invalider_token(self, token):
+        with self._verrou_token:
+            if self._token == token:
+                self._token = None
+                self._token_expire_a = 0
+                self._token_refuse = token
+
+    def requete_authentifiee(self, methode, url, body=None, headers=None):
+        for tentative in range(2):
+            token = self.token()
+            entetes = dict(headers or {}, Authorization=f"Bearer {token}")
+            status, reason, data = self.requete(methode, url, body=body, headers=entetes)
+            if status != 401 or tentative:
+                return status, reason, data
+            # token révoqué côté Orange avant son expiration : renouveler une fois
+            self.invalider_token(token)
+
+    # --- API SMS ---
+    def send_sms(self, recipient_phone, message):
+        dev_phone = os.getenv('ORANGE_DEV_PHONE_NUMBER')
+        url = f"/smsmessaging/v1/outbound/tel%3A%2B{dev_phone}/requests"
 
         body = json.dumps({
             "outboundSMSMessageRequest": {
@@ -76,74 +170,132 @@ def send_sms(recipient_phone, message):
             }
         })
 
-        conn = http.client.HTTPSConnection("api.orange.com")
-        conn.request("POST", url, body=body, headers=headers)
-
-        response = conn.getresponse()
-        data = response.read()
-        conn.close()
-        print("================== CONSOLE LOG ====================")
-        print(json.loads(data), response.reason, response.status)
-        if response.status==201:
-            print('✅ Message envoyé avec succès...')
-        print("================== CONSOLE LOG ====================")
-        return json.loads(data) if response.status == 201 else {"error": response.status, "message": response.reason}
-    except Exception as e:
-        print('imposible d\'envoyer le sms',e)
-        return {}
+        status, reason, data = self.requete_authentifiee("POST", url, body=body, headers={"Content-Type": "application/json"})
+        if status == 201:
+            LOGGER.info(f"✅ Message envoyé avec succès à {recipient_phone}")
+            return json.loads(data)
+        LOGGER.error(f"Envoi SMS à {recipient_phone} en échec: {status} {reason}")
+        return {"error": status, "message": reason}
 
-def sms_balance():
-    token = token = getOrangeToken()
-    url = f"/sms/admin/v1/contracts"
+    def _get(self, url, headers=None):
+        status, reason, data = self.requete_authentifiee("GET", url, headers=headers)
+        return json.loads(data) if status == 200 else {"error": status, "message": reason}
 
-    headers = {
-        "Authorization": f"Bearer {token}"
-    }
-    
-    conn = http.client.HTTPSConnection("api.orange.com")
-    print('before posting....')
-    conn.request("GET", url, headers=headers)
+    def sms_balance(self):
+        return self._get("/sms/admin/v1/contracts")
 
-    response = conn.getresponse()
-    data = response.read()
-    conn.close()
+    def sms_usage(self):
+        return self._get("/sms/admin/v1/statistics")
 
-    return json.loads(data) if response.status == 200 else {"error": response.status, "message": response.reason}
+    def sms_purchase_history(self):
+        return self._get("/sms/admin/v1/purchaseorders", headers={"Content-Type": "application/json"})
 
-def sms_usage():
-    token = token = getOrangeToken()
 
-    url = f"/sms/admin/v1/statistics"
+_CLIENT = None
+_VERROU_CLIENT = threading.Lock()
 
-    headers = {
-        "Authorization": f"Bearer {token}"
-    }
-    
-    conn = http.client.HTTPSConnection("api.orange.com")
-    print('before posting....')
-    conn.request("GET", url, headers=headers)
+def get_client():
+    global _CLIENT
+    if _CLIENT is None:
+        with _VERROU_CLIENT:
+            if _CLIENT is None:
+                _CLIENT = OrangeSmsClient()
+    return _CLIENT
+
+def getOrangeToken():
+    return get_client().token()
+
+def send_sms(recipient_phone, message):
+    try:
+        return get_client().send_sms(recipient_phone, message)
+    except Exception:
+        LOGGER.exception(f"Impossible d'envoyer le SMS à {recipient_phone}")
+        return {}
 
-    response = conn.getresponse()
-    data = response.read()
-    conn.close()
+def sms_balance():
+    return get_client().sms_balance()
 
-    return json.loads(data) if response.status == 200 else {"error": response.status, "message": response.reason}
+def sms_usage():
+    return get_client().sms_usage()
 
 def sms_purchase_history():
-    token = token = getOrangeToken()
+    return get_client().sms_purchase_history()
 
-    url = f"/sms/admin/v1/purchaseorders"
 
-    headers = {
-        "Content-Type":"application/json",
-        "Authorization": f"Bearer {token}"
-    }
-    
-    conn = http.client.HTTPSConnection("api.orange.com")
-    conn.request("GET", url, headers=headers)
+class LimiteurDebit:
+    """Seau à jetons : `debit` envois par seconde, avec au plus `rafale` envois d'avance."""
+
+    def __init__(self, debit, rafale=None):
+        self.debit = debit
+        self.capacite = max(1, rafale or debit)
+        self._jetons = self.capacite
+        self._dernier = time.monotonic()
+        self._verrou = threading.Lock()
+
+    def acquerir(self):
+        while True:
+            with self._verrou:
+                maintenant = time.monotonic()
+                self._jetons = min(self.capacite, self._jetons + (maintenant - self._dernier) * self.debit)
+                self._dernier = maintenant
+                if self._jetons >= 1:
+                    self._jetons -= 1
+                    return
+                attente = (1 - self._jetons) / self.debit
+            time.sleep(attente)
 
-    response = conn.getresponse()
-    data = response.read()
-    conn.close()
 
-    return json.loads(data) if response.status == 200 else {"error": response.status, "message": response.reason}
+def envoyer_sms_en_masse(destinataires, message=None, concurrence=None, debit=None, rafale=None, client=None):
+    """
+    Envoie un SMS à chaque destinataire (numéros avec `message` commun, ou couples (numero, message)).
+    Au plus `concurrence` requêtes en vol, débit borné par le seau à jetons.
+    Renvoie {'resultats': [...] dans l'ordre des destinataires, 'stats': {...}}.
+    """
+    client = client or get_client()
+    envois = [(d, message) if isinstance(d, str) else tuple(d) for d in destinataires]
+    limiteur = LimiteurDebit(debit or settings.ORANGE_SMS_DEBIT, rafale or settings.ORANGE_SMS_RAFALE)
+
+    def envoyer(envoi):
+        numero, texte = envoi
+        limiteur.acquerir()
+        debut = time.monotonic()
+        try:
+            reponse = client.send_sms(numero, texte)
+            erreur = f"{reponse['error']} {reponse['message']}" if 'error' in reponse else None
+        except Exception as e:
+            reponse, erreur = None, str(e)
+        finally:
+            # un renouvellement du token peut avoir ouvert une connexion base dans ce thread
+            connection.close()
+        return {
+            'numero': numero,
+            'succes': erreur is None,
+            'erreur': erreur,
+            'reponse': reponse,
+            'duree': time.monotonic() - debut,
+        }
+
+    debut = time.monotonic()
+    resultats = []
+    if envois:
+        try:
+            # token obtenu une fois avant de lancer les threads
+            client.token()
+        except Exception as e:
+            LOGGER.error(f"Token Orange indisponible: {e}")
+        concurrence = min(concurrence or settings.ORANGE_SMS_CONCURRENCE, len(envois))
+        with ThreadPoolExecutor(max_workers=concurrence, thread_name_prefix='sms-masse') as executor:
+            resultats = list(executor.map(envoyer, envois))
+    duree = time.monotonic() - debut
+
+    envoyes = sum(1 for resultat in resultats if resultat['succes'])
+    stats = {
+        'total': len(resultats),
+        'envoyes': envoyes,
+        'echecs': len(resultats) - envoyes,
+        'duree': round(duree, 3),
+        'debit': round(len(resultats) / duree, 2) if duree else 0,
+        'latence_moyenne': round(sum(r['duree'] for r in resultats) / len(resultats), 4) if resultats else 0,
+    }
+    LOGGER.info(f"SMS en masse: {envoyes}/{len(resultats)} envoyés en {stats['duree']}s ({stats['debit']} SMS/s)")
+    return {'resultats': resultats, 'stats': stats}